@@ -0,0 +1,457 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Encode the videos of many shots with shared conversion threads."""
+
+import os
+import sys
+import glob
+import getopt
+import threading
+import time
+import Queue
+
+from encodeMovieFx import Settings
+from encodeMovieFx import EncodeMovieFx
+from imageSequence import scan_folder
+
+
+class Shot(object):
+    """A shot of the batch and the outcome of its encoding."""
+
+    def __init__(self, name, encode_movie_fx=None):
+        """Initialize the shot.
+
+        Parameters
+        ----------
+        name: str
+            The name the shot is reported with.
+        encode_movie_fx: EncodeMovieFx or None
+            The tool instance holding the shot paths and ui, None if the
+            shot couldn't be loaded.
+
+        """
+        self.name = name
+        self.encode_movie_fx = encode_movie_fx
+        self.in_images = []
+        self.out_images = []
+        self.remaining = 0
+        self.error = None
+        self.elapsed = None
+
+
+class BatchScheduler(object):
+    """Encode the shots as soon as all their images are converted.
+
+    The scheduler is the sink of the conversion threads shared by all the
+    shots, a bounded number of encoder threads run ffmpeg on the shots
+    whose images are all converted while the next shots are converted.
+    """
+
+    # The conversion threads hand over image files and go on after an
+    # image failed, only its shot is given up
+    raw = False
+    keep_going = True
+
+    def __init__(self, shots, encoder_count):
+        """Initialize the scheduler.
+
+        Parameters
+        ----------
+        shots: list of Shot
+            The shots to encode, with their image lists filled.
+        encoder_count: int
+            Number of shots encoded at the same time.
+
+        """
+        self.shots = {}
+        for shot in shots:
+            shot.remaining = len(shot.in_images)
+            for in_image in shot.in_images:
+                self.shots[in_image] = shot
+        self.lock = threading.Lock()
+        self.queue = Queue.Queue()
+        self.encoders = [
+            threading.Thread(target=self.encode)
+            for _ in xrange(encoder_count)
+        ]
+        self.error = None
+        self.start_time = None
+
+    def start(self):
+        """Start the encoder threads."""
+        self.start_time = time.time()
+        for encoder in self.encoders:
+            encoder.start()
+
+    def put(self, in_image, image):
+        """Count a converted image, queue its shot once it is complete.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image that was converted.
+        image: str
+            Path to the converted image.
+
+        """
+        self.done(self.shots[in_image])
+
+    def fail(self, error, in_image=None):
+        """Give up the shot of an image that failed.
+
+        Parameters
+        ----------
+        error: Exception
+            The error that occurred, only the first one of a shot is kept.
+        in_image: str or None
+            Path to the image that failed, None if the error isn't tied to
+            an image (reported to the shots left unconverted).
+
+        """
+        if in_image is None:
+            with self.lock:
+                if self.error is None:
+                    self.error = error
+            return
+        shot = self.shots[in_image]
+        with self.lock:
+            if shot.error is None:
+                shot.error = error
+        self.done(shot)
+
+    def done(self, shot):
+        """Count an image of a shot as processed.
+
+        Parameters
+        ----------
+        shot: Shot
+            The shot of the image.
+
+        """
+        with self.lock:
+            shot.remaining -= 1
+            complete = shot.remaining == 0
+        if complete:
+            self.queue.put(shot)
+
+    def encode(self):
+        """Encode the queued shots until the queue hands out None."""
+        while True:
+            shot = self.queue.get()
+            if shot is None:
+                break
+            try:
+                if shot.error is None:
+                    shot.encode_movie_fx.generate_video()
+            except Exception as error:
+                shot.error = error
+            finally:
+                shot.encode_movie_fx.remove_out_folder()
+            shot.elapsed = time.time() - self.start_time
+
+    def join(self):
+        """Wait for the queued shots to be encoded.
+
+        The shots whose images weren't all converted are given up.
+        """
+        for _ in self.encoders:
+            self.queue.put(None)
+        for encoder in self.encoders:
+            encoder.join()
+
+        for shot in set(self.shots.values()):
+            if shot.remaining > 0:
+                if shot.error is None:
+                    shot.error = self.error or 'conversion stopped'
+                shot.encode_movie_fx.remove_out_folder()
+
+
+class BatchEncodeMovieFx(object):
+    """Convert the image folders of many shots to color corrected videos."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'batchEncodeMovieFx.py '
+        '[path|folder|glob ...] '
+        '[-m/--manifest manifest] '
+        '[-e/--encoder_count encoder_count] '
+        '[-c/--thread_count thread_count|auto] '
+        '[-p/--production_name production_name] '
+        '[-b/--backend ocio|ocioconvert|lut] '
+        '[-S/--scale 1/2|1/4|factor|widthxheight] '
+        '[-o/--outputs mov,mp4,poster,contact_sheet] '
+        '[-g/--segments segment_count|auto] '
+        '[-t/--scratch folder|network] '
+        '[-f/--image_format png|png0|ppm|tiff] '
+        '[-n/--no_cache] '
+        '[-H/--hash] '
+        '[-x/--store folder] '
+        '[-h]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+        self.paths = []
+        self.encoder_count = Settings.DEFAULT_ENCODER_COUNT
+        # The args handed over to the tool instance of every shot
+        self.shot_args = []
+        self.options = None
+
+    def run(self):
+        """Convert the images of all the shots and encode their videos."""
+        self.parse_args()
+        shots = self.load_shots()
+
+        start = time.time()
+        scheduled = [shot for shot in shots if shot.error is None]
+        if scheduled:
+            in_images = []
+            out_images = []
+            for shot in scheduled:
+                in_images.extend(shot.in_images)
+                out_images.extend(shot.out_images)
+                # Create output folder if it doesn't exist
+                out_folder = shot.encode_movie_fx.out_folder
+                if not os.path.exists(out_folder):
+                    os.makedirs(out_folder)
+
+            scheduler = BatchScheduler(scheduled, self.encoder_count)
+            scheduler.start()
+            try:
+                self.options.run_converters(in_images, out_images, scheduler)
+            finally:
+                scheduler.join()
+
+        self.report(shots, time.time() - start)
+        if any(shot.error is not None for shot in shots):
+            sys.exit(1)
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        Sets the paths, encoder_count, shot_args and options vars.
+        """
+        # Flags followed by an argument and flags used alone, handed over
+        # to the tool instance of every shot
+        shot_arg_flags = [
+            Settings.THREAD_COUNT_FLAG,
+            Settings.PROD_NAME_FLAG,
+            Settings.BACKEND_FLAG,
+            Settings.SCALE_FLAG,
+            Settings.OUTPUTS_FLAG,
+            Settings.SEGMENTS_FLAG,
+            Settings.SCRATCH_FLAG,
+            Settings.IMAGE_FORMAT_FLAG,
+            Settings.STORE_FLAG,
+        ]
+        shot_switch_flags = [
+            Settings.NO_CACHE_FLAG,
+            Settings.HASH_FLAG,
+        ]
+        arg_flags = shot_arg_flags + [
+            Settings.ENCODER_COUNT_FLAG,
+            Settings.MANIFEST_FLAG,
+        ]
+
+        try:
+            options, args = getopt.gnu_getopt(
+                self.args,
+                Settings.HELP_FLAG[1:] + ''.join(
+                    ['{}:'.format(flag[0][1:]) for flag in arg_flags] +
+                    [flag[0][1:] for flag in shot_switch_flags]
+                ),
+                ['{}='.format(flag[1][2:]) for flag in arg_flags] +
+                [flag[1][2:] for flag in shot_switch_flags]
+            )
+        except getopt.GetoptError:
+            print BatchEncodeMovieFx.cli_usage
+            sys.exit(2)
+
+        self.paths = list(args)
+        for flag, argument in options:
+            if flag == Settings.HELP_FLAG:
+                print BatchEncodeMovieFx.cli_usage
+                sys.exit()
+            elif flag in Settings.ENCODER_COUNT_FLAG:
+                try:
+                    self.encoder_count = int(argument)
+                except ValueError:
+                    print BatchEncodeMovieFx.cli_usage
+                    sys.exit(2)
+                if self.encoder_count < 1:
+                    print BatchEncodeMovieFx.cli_usage
+                    sys.exit(2)
+            elif flag in Settings.MANIFEST_FLAG:
+                self.paths.extend(self.read_manifest(argument))
+            elif any(flag in shot_flag for shot_flag in shot_arg_flags):
+                self.shot_args.extend([flag, argument])
+            else:
+                self.shot_args.append(flag)
+
+        if not self.paths:
+            print BatchEncodeMovieFx.cli_usage
+            sys.exit(2)
+
+        # Check the shot args once, the conversion threads are set up from
+        # this instance
+        self.options = EncodeMovieFx([self.paths[0]] + self.shot_args)
+        self.options.parse_args()
+
+    def read_manifest(self, manifest):
+        """Read the paths listed in a manifest file.
+
+        Parameters
+        ----------
+        manifest: str
+            Path to a file listing a path, folder or glob per line,
+            relative paths are relative to the manifest folder.
+
+        Returns
+        -------
+        list of str
+            The paths.
+
+        """
+        try:
+            with open(manifest) as manifest_file:
+                lines = [line.strip() for line in manifest_file]
+        except IOError as error:
+            print 'Cannot read manifest {}: {}'.format(manifest, error)
+            sys.exit(1)
+        folder = os.path.dirname(os.path.abspath(manifest))
+        return [
+            os.path.join(folder, line)
+            for line in lines
+            if line and not line.startswith(Settings.MANIFEST_COMMENT)
+        ]
+
+    def expand_path(self, path):
+        """Return the first image of the sequences a path points to.
+
+        Parameters
+        ----------
+        path: str
+            Path to an image, a folder of images or a glob.
+
+        Returns
+        -------
+        list of str
+            Paths to the first images (of every sequence of the folders),
+            empty if nothing matches.
+
+        """
+        images = []
+        for match in sorted(glob.glob(path)):
+            if os.path.isdir(match):
+                # Every sequence of the folder is a shot
+                sequences = sorted(
+                    (
+                        sequence
+                        for sequence in scan_folder(match).itervalues()
+                        if sequence.extension == Settings.IN_IMAGE_EXTENSION
+                    ),
+                    key=lambda sequence: sequence.basename
+                )
+                images.extend(
+                    os.path.join(match, sequence.frames[0].name)
+                    for sequence in sequences
+                )
+            else:
+                images.append(match)
+        return images
+
+    def load_shots(self):
+        """Build the shots from the paths.
+
+        Titles missing from the file names are asked for here, before the
+        conversion starts.
+
+        Returns
+        -------
+        list of Shot
+            The shots, in the order of the paths. Those which couldn't be
+            loaded have their error set.
+
+        """
+        shots = []
+        sequences = set()
+        for path in self.paths:
+            images = self.expand_path(path)
+            if not images:
+                shot = Shot(path)
+                shot.error = 'no {} image found'.format(
+                    Settings.IN_IMAGE_EXTENSION
+                )
+                shots.append(shot)
+                continue
+
+            for image in images:
+                encode_movie_fx = EncodeMovieFx([image] + self.shot_args)
+                encode_movie_fx.parse_args()
+                try:
+                    encode_movie_fx.parse_filename()
+                except SystemExit:
+                    shot = Shot(image)
+                    shot.error = 'invalid file name'
+                    shots.append(shot)
+                    continue
+
+                sequence = (
+                    encode_movie_fx.in_folder, encode_movie_fx.filename
+                )
+                if sequence in sequences:
+                    print 'Skipping {}, its sequence is batched.'.format(
+                        image
+                    )
+                    continue
+                sequences.add(sequence)
+
+                shot = Shot(encode_movie_fx.filename, encode_movie_fx)
+                shot.in_images, shot.out_images = \
+                    encode_movie_fx.get_image_lists()
+                if not shot.in_images:
+                    shot.error = 'no {} image found'.format(
+                        Settings.IN_IMAGE_EXTENSION
+                    )
+                shots.append(shot)
+        return shots
+
+    def report(self, shots, elapsed):
+        """Print the outcome of every shot.
+
+        Parameters
+        ----------
+        shots: list of Shot
+            The shots of the batch.
+        elapsed: float
+            Duration (in seconds) of the batch.
+
+        """
+        print 'Batch summary:'
+        for shot in shots:
+            if shot.error is not None:
+                print '  {}: failed, {}'.format(shot.name, shot.error)
+            else:
+                print '  {}: {} frames, encoded after {:.1f}s, {}'.format(
+                    shot.name, len(shot.in_images), shot.elapsed,
+                    shot.encode_movie_fx.out_filepath
+                )
+        print '{} of {} shots encoded in {:.1f}s.'.format(
+            len([shot for shot in shots if shot.error is None]),
+            len(shots), elapsed
+        )
+
+
+if __name__ == '__main__':
+    BatchEncodeMovieFx(sys.argv[1:]).run()
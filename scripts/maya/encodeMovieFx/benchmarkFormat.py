@@ -0,0 +1,137 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Measure the encoding time of a sequence with each intermediate format."""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+from encodeMovieFx import Settings
+from benchmarkScale import BenchmarkEncode
+
+
+class BenchmarkFormat(object):
+    """Convert and encode a sequence with each intermediate format."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'benchmarkFormat.py '
+        'path/to/first_file_to_convert '
+        '[encodeMovieFx.py args]'
+    )
+
+    # The formats compared, the first one is the reference. Streaming
+    # writes no intermediate files
+    formats = ['png', 'png0', 'ppm', 'tiff', 'stream']
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+
+    def run(self):
+        """Time the encoding with every format and print the results."""
+        if not self.args:
+            print BenchmarkFormat.cli_usage
+            sys.exit(2)
+
+        results = []
+        for image_format in self.formats:
+            results.append((image_format,) + self.measure(image_format))
+
+        print '{:>8} {:>12} {:>12} {:>12} {:>8} {:>14}'.format(
+            'format', 'convert (s)', 'encode (s)', 'total (s)', 'speedup',
+            'scratch (KB)'
+        )
+        reference = results[0][3]
+        for image_format, convert, encode, total, written in results:
+            print (
+                '{:>8} {:>12.2f} {:>12.2f} {:>12.2f} {:>7.2f}x {:>14}'
+            ).format(
+                image_format, convert, encode, total,
+                reference / max(total, 1e-6), written // 1024
+            )
+
+    def measure(self, image_format):
+        """Convert and encode the sequence with an intermediate format.
+
+        The conversion cache is disabled for every image to be converted.
+        Streamed images are converted and encoded at once, their time is
+        reported as encoding time.
+
+        Parameters
+        ----------
+        image_format: str
+            The format, as passed to the encodeMovieFx cli, or 'stream'.
+
+        Returns
+        -------
+        float, float, float, int
+            The conversion, encoding and total wall-clock times (in
+            seconds) and the size (in bytes) of the images written to the
+            scratch folder.
+
+        """
+        folder = tempfile.mkdtemp(prefix='benchmarkFormat_')
+        try:
+            if image_format == 'stream':
+                args = ['--no_cache', Settings.STREAM_FLAG[1]]
+            else:
+                args = ['--no_cache', '--image_format', image_format]
+            encode = BenchmarkEncode(self.args + args, folder)
+            encode.parse_args()
+            encode.parse_filename()
+
+            start = time.time()
+            if encode.stream:
+                encode.stream_video()
+                return 0.0, time.time() - start, time.time() - start, 0
+
+            encode.convert_images()
+            converted = time.time()
+            written = folder_size(encode.out_folder)
+            encode.generate_video()
+            encoded = time.time()
+            return (
+                converted - start, encoded - converted, encoded - start,
+                written
+            )
+        finally:
+            shutil.rmtree(folder)
+
+
+def folder_size(folder):
+    """Return the size of the files of a folder.
+
+    Parameters
+    ----------
+    folder: str
+        Path to the folder.
+
+    Returns
+    -------
+    int
+        The size (in bytes), 0 if the folder doesn't exist.
+
+    """
+    if not os.path.isdir(folder):
+        return 0
+    return sum(
+        os.path.getsize(os.path.join(folder, name))
+        for name in os.listdir(folder)
+    )
+
+
+if __name__ == '__main__':
+    BenchmarkFormat(sys.argv[1:]).run()
@@ -0,0 +1,171 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Measure the encoding time of a sequence at several scales."""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+from encodeMovieFx import EncodeMovieFx
+
+
+class BenchmarkEncode(EncodeMovieFx):
+    """Encoding writing its images and video in a benchmark folder."""
+
+    def __init__(self, args, folder):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The encodeMovieFx cli args.
+        folder: str
+            The folder the images and video are written to.
+
+        """
+        super(BenchmarkEncode, self).__init__(args)
+        self.folder = folder
+
+    def get_out_folder(self):
+        """Return the folder the converted images are written to.
+
+        The scratch and input folders are left untouched.
+
+        Returns
+        -------
+        str
+            The path, in the folder.
+
+        """
+        return os.path.join(self.folder, 'images')
+
+    def get_title_from_user(self):
+        """Return a fixed title, nothing is asked during the benchmark.
+
+        Returns
+        -------
+        str
+            The title.
+
+        """
+        return 'benchmark'
+
+    def get_out_filepath(self, output=None):
+        """Return the path to a generated output.
+
+        Parameters
+        ----------
+        output: str or None
+            The name of the output, the first output if None.
+
+        Returns
+        -------
+        str
+            The path, in the folder.
+
+        """
+        return os.path.join(
+            self.folder, 'benchmark_{}'.format(
+                os.path.basename(
+                    super(BenchmarkEncode, self).get_out_filepath(output)
+                )
+            )
+        )
+
+
+class BenchmarkScale(object):
+    """Convert and encode a sequence at several scales and time it."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'benchmarkScale.py '
+        'path/to/first_file_to_convert '
+        '[encodeMovieFx.py args]'
+    )
+
+    # The scales compared, the first one is the reference
+    scales = ['1', '1/2', '1/4']
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+
+    def run(self):
+        """Time the encoding at every scale and print the results."""
+        if not self.args:
+            print BenchmarkScale.cli_usage
+            sys.exit(2)
+
+        results = []
+        for scale in self.scales:
+            results.append((scale,) + self.measure(scale))
+
+        print '{:>8} {:>12} {:>12} {:>12} {:>8} {:>12}'.format(
+            'scale', 'convert (s)', 'encode (s)', 'total (s)', 'speedup',
+            'video (KB)'
+        )
+        reference = results[0][3]
+        for scale, convert, encode, total, size in results:
+            print (
+                '{:>8} {:>12.2f} {:>12.2f} {:>12.2f} {:>7.2f}x {:>12}'
+            ).format(
+                scale, convert, encode, total, reference / max(total, 1e-6),
+                size // 1024
+            )
+
+    def measure(self, scale):
+        """Convert and encode the sequence at a scale.
+
+        The conversion cache is disabled for every image to be converted.
+
+        Parameters
+        ----------
+        scale: str
+            The scale, as passed to the encodeMovieFx cli.
+
+        Returns
+        -------
+        float, float, float, int
+            The conversion, encoding and total wall-clock times (in
+            seconds) and the size (in bytes) of the video.
+
+        """
+        folder = tempfile.mkdtemp(prefix='benchmarkScale_')
+        try:
+            encode = BenchmarkEncode(
+                self.args + ['--no_cache', '--scale', scale], folder
+            )
+            encode.parse_args()
+            encode.parse_filename()
+
+            start = time.time()
+            encode.convert_images()
+            converted = time.time()
+            encode.generate_video()
+            encoded = time.time()
+
+            size = 0
+            if os.path.exists(encode.out_filepath):
+                size = os.path.getsize(encode.out_filepath)
+            return (
+                converted - start, encoded - converted, encoded - start,
+                size
+            )
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    BenchmarkScale(sys.argv[1:]).run()
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Measure the encoding time of the slate overlay against drawtext."""
+
+import sys
+import shutil
+import tempfile
+import time
+
+from benchmarkScale import BenchmarkEncode
+
+
+class DrawtextEncode(BenchmarkEncode):
+    """Encoding drawing the whole ui with drawtext on every frame."""
+
+    def ui_input_args(self):
+        """Return no args, no slate is rendered.
+
+        Returns
+        -------
+        list of str
+            The args.
+
+        """
+        return []
+
+    def ffmpeg_filters(self, start_frame=None):
+        """Build the ffmpeg filters drawing the whole ui on every frame.
+
+        Parameters
+        ----------
+        start_frame: str or None
+            The frame number drawn on the first image, the current frame if
+            None.
+
+        Returns
+        -------
+        str
+            The filters, with the video input pad.
+
+        """
+        return '[0:v]{}'.format(', '.join(
+            self.slate_filters() + [self.frame_filter(start_frame)]
+        ))
+
+
+class BenchmarkSlate(object):
+    """Encode converted images with both ui drawing methods and time it."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'benchmarkSlate.py '
+        'path/to/first_file_to_convert '
+        '[encodeMovieFx.py args]'
+    )
+
+    # The ui drawing methods compared, the first one is the reference
+    methods = [('drawtext', DrawtextEncode), ('overlay', BenchmarkEncode)]
+
+    # Encodings per method, the fastest one is kept
+    repeat = 3
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+
+    def run(self):
+        """Convert the images once, time every method and print results."""
+        if not self.args:
+            print BenchmarkSlate.cli_usage
+            sys.exit(2)
+
+        folder = tempfile.mkdtemp(prefix='benchmarkSlate_')
+        try:
+            encodes = []
+            for name, encode_class in self.methods:
+                encode = encode_class(self.args, folder)
+                encode.parse_args()
+                encode.parse_filename()
+                encodes.append((name, encode))
+            # The images are written to the same folder by every method
+            encodes[0][1].convert_images()
+
+            results = [
+                (name, self.measure(method)) for name, method in encodes
+            ]
+        finally:
+            shutil.rmtree(folder)
+
+        print '{:>10} {:>12} {:>8}'.format('ui', 'encode (s)', 'speedup')
+        reference = results[0][1]
+        for name, encode in results:
+            print '{:>10} {:>12.2f} {:>7.2f}x'.format(
+                name, encode, reference / max(encode, 1e-6)
+            )
+
+    def measure(self, encode):
+        """Encode the converted images.
+
+        Parameters
+        ----------
+        encode: BenchmarkEncode
+            The tool instance, set up for the images.
+
+        Returns
+        -------
+        float
+            The fastest encoding wall-clock time (in seconds), slate
+            rendering included.
+
+        """
+        times = []
+        for _ in xrange(self.repeat):
+            # Render the slate again
+            encode.slate_path = None
+            start = time.time()
+            encode.generate_video()
+            times.append(time.time() - start)
+        return min(times)
+
+
+if __name__ == '__main__':
+    BenchmarkSlate(sys.argv[1:]).run()
@@ -0,0 +1,518 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Measure the throughput of encodeMovieFx on synthetic exr sequences."""
+
+import os
+import sys
+import stat
+import json
+import getopt
+import shutil
+import tempfile
+import subprocess
+import time
+
+from encodeMovieFx import Settings
+from encodeMovieFx import numpy
+from encodeMovieFx import oiio
+from benchmarkScale import BenchmarkEncode
+from benchmarkFormat import folder_size
+
+try:
+    import resource
+except ImportError:
+    # Not available on windows, no memory usage is reported
+    resource = None
+
+
+class BenchmarkSettings:
+    """Benchmark suite settings."""
+
+    RESOLUTION_FLAG = ('-x', '--resolution')
+    LENGTH_FLAG = ('-l', '--length')
+    THREAD_COUNTS_FLAG = ('-c', '--thread_counts')
+    IMAGE_FORMATS_FLAG = ('-f', '--image_formats')
+    STUB_FLAG = ('-s', '--stub')
+    OUT_FLAG = ('-o', '--out')
+    COMPARE_FLAG = ('-C', '--compare')
+    HELP_FLAG = '-h'
+    # Hidden flag running a single case, in a process of its own so its
+    # peak memory usage is its own
+    RUN_CASE_FLAG = '--run_case'
+
+    DEFAULT_RESOLUTION = (1920, 1080)
+    DEFAULT_LENGTH = 48
+    DEFAULT_THREAD_COUNTS = [1, 4, 16]
+    DEFAULT_IMAGE_FORMATS = ['png', 'ppm']
+
+    # Name of the synthetic sequence, parsed as a shot by encodeMovieFx
+    SEQUENCE_NAME = '999_0010_benchmark'
+    # Environment variable giving the stub executables the image size
+    STUB_SIZE_VARIABLE = 'ENCODEMOVIEFX_STUB_SIZE'
+    # Drop in frames per second over which a case is a regression
+    REGRESSION_TOLERANCE = 0.1
+
+
+# The executables replacing ocioconvert, oiiotool and ffmpeg in stub mode.
+# They write outputs of the size of 8 bits images without doing any
+# conversion, so only the orchestration and the I/O are measured.
+STUB_CONVERTER = '''import os
+import sys
+
+width, height = [
+    int(size) for size in os.environ['{variable}'].split('x')
+]
+args = sys.argv[1:]
+if os.path.basename(sys.argv[0]).startswith('ocioconvert'):
+    out_image = args[2]
+else:
+    out_image = args[-1]
+with open(out_image, 'wb') as image:
+    if out_image.endswith('.ppm'):
+        image.write('P6 {{}} {{}} 255\\n'.format(width, height).encode())
+    image.write(b'\\x80' * (width * height * 3))
+'''
+STUB_FFMPEG = '''import sys
+
+args = sys.argv[1:]
+if '-' in args:
+    # Drain the piped images
+    stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+    while stdin.read(1024 ** 2):
+        pass
+for index, arg in enumerate(args):
+    if arg == '-y':
+        with open(args[index + 1], 'wb') as output:
+            output.write(b'\\0' * 1024)
+'''
+
+
+def write_exr(path, width, height, frame):
+    """Write a synthetic exr image.
+
+    A gradient moving with the frame number is written with OpenImageIO,
+    uncompressed half float data of the same size is written if it is
+    missing (enough for the stub executables).
+
+    Parameters
+    ----------
+    path: str
+        Path to the image.
+    width: int
+        The width of the image.
+    height: int
+        The height of the image.
+    frame: int
+        The frame number, every frame has its own content.
+
+    """
+    if None in (numpy, oiio):
+        with open(path, 'wb') as exr:
+            exr.write(os.urandom(256))
+            exr.seek(width * height * 4 * 2 - 1)
+            exr.write('\0')
+        return
+
+    x = numpy.linspace(0.0, 4.0, width, dtype=numpy.float32)
+    y = numpy.linspace(0.0, 1.0, height, dtype=numpy.float32)
+    pixels = numpy.empty((height, width, 4), dtype=numpy.float32)
+    pixels[..., 0] = (x[numpy.newaxis, :] + frame * 0.01) % 4.0
+    pixels[..., 1] = y[:, numpy.newaxis]
+    pixels[..., 2] = (frame % 24) / 24.0
+    pixels[..., 3] = 1.0
+    spec = oiio.ImageSpec(width, height, 4, oiio.HALF)
+    output = oiio.ImageOutput.create(path)
+    output.open(path, spec)
+    output.write_image(pixels)
+    output.close()
+
+
+def make_sequence(folder, width, height, length):
+    """Write a synthetic exr sequence.
+
+    Parameters
+    ----------
+    folder: str
+        The folder the images are written to.
+    width: int
+        The width of the images.
+    height: int
+        The height of the images.
+    length: int
+        The number of images.
+
+    Returns
+    -------
+    str
+        Path to the first image.
+
+    """
+    paths = []
+    for frame in xrange(1, length + 1):
+        path = os.path.join(folder, '{}.{:04d}.{}'.format(
+            BenchmarkSettings.SEQUENCE_NAME, frame,
+            Settings.IN_IMAGE_EXTENSION
+        ))
+        write_exr(path, width, height, frame)
+        paths.append(path)
+    return paths[0]
+
+
+def make_stubs(folder):
+    """Write the stub executables.
+
+    Parameters
+    ----------
+    folder: str
+        The folder the executables are written to.
+
+    Returns
+    -------
+    dict
+        Paths to the executables, by Settings attribute name.
+
+    """
+    stubs = {}
+    for name, attribute, script in (
+        ('ocioconvert', 'OCIO_CONVERT', STUB_CONVERTER),
+        ('oiiotool', 'OIIOTOOL', STUB_CONVERTER),
+        ('ffmpeg', 'FFMPEG', STUB_FFMPEG),
+    ):
+        path = os.path.join(folder, name)
+        with open(path, 'w') as stub:
+            stub.write('#!{}\n'.format(sys.executable))
+            stub.write(script.format(
+                variable=BenchmarkSettings.STUB_SIZE_VARIABLE
+            ))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        stubs[attribute] = path
+    return stubs
+
+
+def peak_memory():
+    """Return the peak resident memory of the process and its children.
+
+    Returns
+    -------
+    int or None, int or None
+        The peak resident memory (in KB) of the process and of its biggest
+        child, None if it isn't available.
+
+    """
+    if resource is None:
+        return None, None
+    # Reported in bytes on mac, in KB elsewhere
+    unit = 1024 if sys.platform == 'darwin' else 1
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // unit,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // unit,
+    )
+
+
+def run_case(case):
+    """Convert and encode a sequence and measure it.
+
+    Parameters
+    ----------
+    case: dict
+        The path to the first image, the encodeMovieFx args, the folder
+        the images and video are written to and the stub executables.
+
+    Returns
+    -------
+    dict
+        The measures of the case.
+
+    """
+    for attribute, path in case['stubs'].items():
+        setattr(Settings, attribute, path)
+
+    encode = BenchmarkEncode(
+        [case['path'], '--no_cache'] + case['args'], case['folder']
+    )
+    encode.parse_args()
+    encode.parse_filename()
+
+    start = time.time()
+    encode.convert_images()
+    converted = time.time()
+    written = folder_size(encode.out_folder)
+    encode.generate_video()
+    encoded = time.time()
+
+    in_images, _ = encode.get_image_lists()
+    encode.remove_out_folder()
+    peak_rss, peak_child_rss = peak_memory()
+    return {
+        'frames': len(in_images),
+        'convert': converted - start,
+        'encode': encoded - converted,
+        'total': encoded - start,
+        'frames_per_second': len(in_images) / max(encoded - start, 1e-6),
+        'bytes_written': written + folder_size(case['folder']),
+        'peak_rss_kb': peak_rss,
+        'peak_child_rss_kb': peak_child_rss,
+    }
+
+
+class BenchmarkSuite(object):
+    """Sweep thread counts and intermediate formats on a synthetic sequence.
+
+    Every case runs in a process of its own, the results can be written to
+    a JSON file and compared with the results of a previous version.
+    """
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'benchmarkSuite.py '
+        '[-x/--resolution widthxheight] '
+        '[-l/--length frame_count] '
+        '[-c/--thread_counts count,count...] '
+        '[-f/--image_formats format,format...] '
+        '[-s/--stub] '
+        '[-o/--out results.json] '
+        '[-C/--compare previous_results.json] '
+        '[-h]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+        self.resolution = BenchmarkSettings.DEFAULT_RESOLUTION
+        self.length = BenchmarkSettings.DEFAULT_LENGTH
+        self.thread_counts = list(BenchmarkSettings.DEFAULT_THREAD_COUNTS)
+        self.image_formats = list(BenchmarkSettings.DEFAULT_IMAGE_FORMATS)
+        self.stub = False
+        self.out_path = None
+        self.compare_path = None
+
+    def run(self):
+        """Run every case, print the results and compare them."""
+        self.parse_args()
+        if not self.stub and None in (numpy, oiio):
+            print (
+                'OpenImageIO and numpy are needed to write real exr images, '
+                'use {} to run with stub executables.'
+            ).format('/'.join(BenchmarkSettings.STUB_FLAG))
+            sys.exit(1)
+
+        folder = tempfile.mkdtemp(prefix='benchmarkSuite_')
+        try:
+            sequence_folder = os.path.join(folder, 'exr')
+            os.makedirs(sequence_folder)
+            path = make_sequence(
+                sequence_folder, self.resolution[0], self.resolution[1],
+                self.length
+            )
+            stubs = make_stubs(folder) if self.stub else {}
+
+            results = []
+            for image_format in self.image_formats:
+                for thread_count in self.thread_counts:
+                    case_folder = tempfile.mkdtemp(dir=folder)
+                    result = self.measure({
+                        'path': path,
+                        'args': [
+                            '-c', str(thread_count),
+                            '-f', image_format,
+                        ] + (['-b', Settings.OCIO_CONVERT_BACKEND]
+                             if self.stub else []),
+                        'folder': case_folder,
+                        'stubs': stubs,
+                    })
+                    result.update({
+                        'image_format': image_format,
+                        'thread_count': thread_count,
+                    })
+                    results.append(result)
+                    shutil.rmtree(case_folder)
+        finally:
+            shutil.rmtree(folder)
+
+        report = {
+            'resolution': '{}x{}'.format(*self.resolution),
+            'length': self.length,
+            'stub': self.stub,
+            'results': results,
+        }
+        self.print_results(results)
+        if self.out_path:
+            with open(self.out_path, 'w') as out_file:
+                json.dump(report, out_file, indent=2, sort_keys=True)
+        if self.compare_path and self.compare(report):
+            sys.exit(1)
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        Sets the resolution, length, thread_counts, image_formats, stub,
+        out_path and compare_path vars.
+        """
+        arg_flags = [
+            BenchmarkSettings.RESOLUTION_FLAG,
+            BenchmarkSettings.LENGTH_FLAG,
+            BenchmarkSettings.THREAD_COUNTS_FLAG,
+            BenchmarkSettings.IMAGE_FORMATS_FLAG,
+            BenchmarkSettings.OUT_FLAG,
+            BenchmarkSettings.COMPARE_FLAG,
+        ]
+        switch_flags = [
+            BenchmarkSettings.STUB_FLAG,
+        ]
+        try:
+            options, _ = getopt.getopt(
+                self.args,
+                BenchmarkSettings.HELP_FLAG[1:] + ''.join(
+                    ['{}:'.format(flag[0][1:]) for flag in arg_flags] +
+                    [flag[0][1:] for flag in switch_flags]
+                ),
+                ['{}='.format(flag[1][2:]) for flag in arg_flags] +
+                [flag[1][2:] for flag in switch_flags]
+            )
+        except getopt.GetoptError:
+            print BenchmarkSuite.cli_usage
+            sys.exit(2)
+
+        for flag, argument in options:
+            try:
+                if flag == BenchmarkSettings.HELP_FLAG:
+                    print BenchmarkSuite.cli_usage
+                    sys.exit()
+                elif flag in BenchmarkSettings.RESOLUTION_FLAG:
+                    width, height = argument.lower().split('x')
+                    self.resolution = (int(width), int(height))
+                elif flag in BenchmarkSettings.LENGTH_FLAG:
+                    self.length = int(argument)
+                elif flag in BenchmarkSettings.THREAD_COUNTS_FLAG:
+                    self.thread_counts = [
+                        int(count) for count in argument.split(',')
+                    ]
+                elif flag in BenchmarkSettings.IMAGE_FORMATS_FLAG:
+                    self.image_formats = argument.split(',')
+                    if not set(self.image_formats) <= \
+                            set(Settings.IMAGE_FORMATS):
+                        raise ValueError(argument)
+                elif flag in BenchmarkSettings.STUB_FLAG:
+                    self.stub = True
+                elif flag in BenchmarkSettings.OUT_FLAG:
+                    self.out_path = argument
+                elif flag in BenchmarkSettings.COMPARE_FLAG:
+                    self.compare_path = argument
+            except ValueError:
+                print BenchmarkSuite.cli_usage
+                sys.exit(2)
+
+        if min(self.resolution + (self.length,) +
+               tuple(self.thread_counts)) < 1:
+            print BenchmarkSuite.cli_usage
+            sys.exit(2)
+
+    def measure(self, case):
+        """Run a case in a process of its own.
+
+        Parameters
+        ----------
+        case: dict
+            The case, as taken by run_case.
+
+        Returns
+        -------
+        dict
+            The measures of the case.
+
+        """
+        env = dict(os.environ)
+        env[BenchmarkSettings.STUB_SIZE_VARIABLE] = '{}x{}'.format(
+            *self.resolution
+        )
+        output = subprocess.check_output(
+            [
+                sys.executable, os.path.abspath(__file__),
+                BenchmarkSettings.RUN_CASE_FLAG, json.dumps(case)
+            ],
+            env=env
+        )
+        # The result is the last line, after the conversion messages
+        return json.loads(output.strip().splitlines()[-1])
+
+    def print_results(self, results):
+        """Print the results of the cases.
+
+        Parameters
+        ----------
+        results: list of dict
+            The measures of the cases.
+
+        """
+        print '{:>8} {:>8} {:>10} {:>10} {:>12} {:>12} {:>14}'.format(
+            'format', 'threads', 'total (s)', 'frames/s', 'rss (MB)',
+            'child (MB)', 'written (MB)'
+        )
+        for result in results:
+            print (
+                '{:>8} {:>8} {:>10.2f} {:>10.2f} {:>12} {:>12} {:>14.1f}'
+            ).format(
+                result['image_format'], result['thread_count'],
+                result['total'], result['frames_per_second'],
+                (result['peak_rss_kb'] or 0) // 1024,
+                (result['peak_child_rss_kb'] or 0) // 1024,
+                result['bytes_written'] / 1024.0 ** 2
+            )
+
+    def compare(self, report):
+        """Compare the results with the results of a previous run.
+
+        Parameters
+        ----------
+        report: dict
+            The report of this run.
+
+        Returns
+        -------
+        bool
+            True if a case got slower than the tolerance.
+
+        """
+        with open(self.compare_path) as previous_file:
+            previous = json.load(previous_file)
+        if any(
+            previous.get(key) != report[key]
+            for key in ('resolution', 'length', 'stub')
+        ):
+            print 'The previous results were measured on another sequence.'
+
+        previous_results = dict(
+            ((result['image_format'], result['thread_count']), result)
+            for result in previous['results']
+        )
+        regression = False
+        for result in report['results']:
+            key = (result['image_format'], result['thread_count'])
+            if key not in previous_results:
+                continue
+            ratio = result['frames_per_second'] / max(
+                previous_results[key]['frames_per_second'], 1e-6
+            )
+            slower = ratio < 1 - BenchmarkSettings.REGRESSION_TOLERANCE
+            regression = regression or slower
+            print '{:>8} {:>8} {:>7.2f}x{}'.format(
+                key[0], key[1], ratio, ' REGRESSION' if slower else ''
+            )
+        return regression
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == [BenchmarkSettings.RUN_CASE_FLAG]:
+        print json.dumps(run_case(json.loads(sys.argv[2])))
+    else:
+        BenchmarkSuite(sys.argv[1:]).run()
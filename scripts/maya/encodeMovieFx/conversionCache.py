@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Persistent cache of converted images."""
+
+import os
+import time
+import errno
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+def hash_file(path, chunk_size=2 ** 20):
+    """Hash the content of a file.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+    chunk_size: int
+        Number of bytes read at once.
+
+    Returns
+    -------
+    str
+        The sha1 hex digest of the content.
+
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(chunk_size), ''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def share(path, mode):
+    """Set the permissions of a path, if it belongs to the user.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file or folder.
+    mode: int
+        The permissions.
+
+    """
+    try:
+        os.chmod(path, mode)
+    except OSError:
+        # Belongs to another user
+        pass
+
+
+class ConversionCache(object):
+    """Persistent cache of converted images.
+
+    Entries are keyed by the path, size and modification time of the source
+    image, optionally by a hash of its content, and by the settings the
+    conversion depends on (color transform, output format...). Using an
+    entry refreshes its modification time, the least recently used entries
+    are evicted once the cache grows larger than its maximum size.
+
+    A content addressed cache keys the entries by the content of the source
+    image and the settings only, identical images converted from any folder
+    share their entry. Its entries can be used and evicted by every user of
+    the group, the cache can be shared on a network scratch.
+    """
+
+    # Entries being written start with this, they are renamed once complete
+    TEMP_PREFIX = '.'
+    # Age (in seconds) after which an entry still being written was left by
+    # a killed process, and is evicted
+    STALE_TEMP_AGE = 24 * 3600.0
+    # Permissions of the entries and folders of content addressed caches
+    SHARED_FILE_MODE = 0o664
+    SHARED_FOLDER_MODE = 0o2775
+
+    def __init__(self, folder, max_size, settings, hash_content=False,
+                 content_addressed=False):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        folder: str
+            The folder the entries are stored in.
+        max_size: int
+            The size (in bytes) the cache is brought back to on eviction.
+        settings: tuple
+            The settings the converted images depend on.
+        hash_content: bool
+            Whether the content of the source images is part of the keys,
+            catches images modified without a change of size or time.
+        content_addressed: bool
+            Whether the content of the source images is the only part of
+            the keys coming from them, and the cache is shared.
+
+        """
+        self.folder = folder
+        self.max_size = max_size
+        self.settings = settings
+        self.hash_content = hash_content
+        self.content_addressed = content_addressed
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, in_image, extension):
+        """Return the path to the entry of an image.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the source image.
+        extension: str
+            The extension of the converted image.
+
+        Returns
+        -------
+        str
+            The path, the entry may not exist.
+
+        """
+        if self.content_addressed:
+            fingerprint = [hash_file(in_image), extension, self.settings]
+        else:
+            stat = os.stat(in_image)
+            fingerprint = [
+                os.path.normcase(os.path.abspath(in_image)),
+                stat.st_size, stat.st_mtime,
+                extension, self.settings
+            ]
+            if self.hash_content:
+                fingerprint.append(hash_file(in_image))
+        key = hashlib.sha1(repr(fingerprint)).hexdigest()
+        # Entries are spread in sub folders to keep the folders small
+        return os.path.join(
+            self.folder, key[:2], '{}.{}'.format(key, extension)
+        )
+
+    def fetch(self, entry):
+        """Look an entry up and mark it as used.
+
+        Parameters
+        ----------
+        entry: str
+            Path to the entry.
+
+        Returns
+        -------
+        bool
+            True if the entry exists.
+
+        """
+        try:
+            os.utime(entry, None)
+            hit = True
+        except OSError as error:
+            # The entries of other users can't always be marked as used
+            hit = error.errno in (errno.EPERM, errno.EACCES) and \
+                os.path.exists(entry)
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit
+
+    def store(self, entry, path):
+        """Copy a converted image in the cache.
+
+        Parameters
+        ----------
+        entry: str
+            Path to the entry.
+        path: str
+            Path to the converted image.
+
+        """
+        with open(path, 'rb') as source:
+            self._write(entry, lambda target: shutil.copyfileobj(
+                source, target
+            ))
+
+    def write(self, entry, data):
+        """Write a converted image in the cache.
+
+        Parameters
+        ----------
+        entry: str
+            Path to the entry.
+        data: str
+            The content of the converted image.
+
+        """
+        self._write(entry, lambda target: target.write(data))
+
+    def _write(self, entry, write):
+        """Write an entry aside and rename it once complete.
+
+        Other threads and processes never see partially written entries.
+
+        Parameters
+        ----------
+        entry: str
+            Path to the entry.
+        write: callable
+            Called with the opened file to write the entry content.
+
+        """
+        folder = os.path.dirname(entry)
+        made = [
+            path for path in (self.folder, folder) if not os.path.isdir(path)
+        ]
+        try:
+            os.makedirs(folder)
+        except OSError:
+            if not os.path.isdir(folder):
+                raise
+        if self.content_addressed:
+            for path in made:
+                share(path, ConversionCache.SHARED_FOLDER_MODE)
+        handle, temp_path = tempfile.mkstemp(
+            dir=folder, prefix=ConversionCache.TEMP_PREFIX
+        )
+        try:
+            with os.fdopen(handle, 'wb') as target:
+                write(target)
+            if self.content_addressed:
+                share(temp_path, ConversionCache.SHARED_FILE_MODE)
+            try:
+                os.rename(temp_path, entry)
+            except OSError:
+                # Entry already written by someone else (windows)
+                pass
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def evict(self):
+        """Delete the least recently used entries exceeding the max size.
+
+        Entries left half written by killed processes are deleted too.
+
+        Returns
+        -------
+        int
+            The number of deleted entries.
+
+        """
+        entries = []
+        total_size = 0
+        now = time.time()
+        for folder, _, names in os.walk(self.folder):
+            for name in names:
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.startswith(ConversionCache.TEMP_PREFIX):
+                    # Skip the entries being written, unless left by a
+                    # killed process
+                    if now - stat.st_mtime > ConversionCache.STALE_TEMP_AGE:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        deleted = 0
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError:
+                # Already evicted by another process
+                pass
+            total_size -= size
+        return deleted
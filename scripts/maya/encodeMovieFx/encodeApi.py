@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""Encode movies in process, without the cli.
+
+Render post scripts and farm wrappers describe the encoding with an
+EncodeJob and pass it to encode_movie, which returns an EncodeResult.
+Nothing is asked to the user, errors don't exit the process and the movie
+isn't opened. The color processors loaded by an encoding are reused by the
+next ones in the same process.
+"""
+
+import time
+
+from encodeMovieFx import Settings
+from encodeMovieFx import EncodeMovieFx
+from encodeMovieFx import RunProfile
+from encodeMovieFx import cpu_count
+from encodeMovieFx import parse_scale
+from frameCoordinator import parse_address
+
+
+class EncodeJob(object):
+    """The settings of an encoding, the cli args as attributes.
+
+    The settings left to None take the cli defaults.
+    """
+
+    def __init__(self, path, title=None, thread_count=None,
+                 production_name=None, stream=False, pipeline=False,
+                 scale=None, outputs=None, segment_count=None,
+                 scratch_folder=None, image_format=None, backend=None,
+                 use_cache=True, hash_content=False, store_folder=None,
+                 dedupe=False, profile=False, resume=False,
+                 coordinator_address=None, watch_last=None, username=None):
+        """Initialize the job.
+
+        Parameters
+        ----------
+        path: str
+            Path to the first image to convert.
+        title: str or None
+            The title drawn on the slate, read from the file name if None.
+        thread_count: int or str or None
+            The number of conversion threads, or 'auto'.
+        production_name: str or None
+            The production name drawn on the slate.
+        stream: bool
+            Convert the images and generate the video at once.
+        pipeline: bool
+            Generate the video while converting the images.
+        scale: float or tuple of int, int or str or None
+            The factor or the width and height, or a cli scale (1/2,
+            1920x1080...).
+        outputs: list of str or None
+            The names of the outputs to generate (mov, mp4, poster...).
+        segment_count: int or str or None
+            The number of segments encoded in parallel, or 'auto'.
+        scratch_folder: str or None
+            The folder the images are converted to, or 'network'.
+        image_format: str or None
+            The format of the converted images (png, png0, ppm, tiff).
+        backend: str or None
+            The color conversion backend (ocio, ocioconvert, lut).
+        use_cache: bool
+            Reuse the images converted by previous encodings.
+        hash_content: bool
+            Key the cache with the content of the images, not their stamp.
+        store_folder: str or None
+            The shared store of converted images looked up after the cache.
+        dedupe: bool
+            Convert the images with the same content once.
+        profile: bool
+            Write the profile report of the encoding next to the movie.
+        resume: bool
+            Keep the converted images of a failed encoding for the next one.
+        coordinator_address: tuple of str, int or str or None
+            The address ([host:]port) workers convert the images from.
+        watch_last: int or None
+            The last frame, to convert the images as they are rendered.
+        username: str or None
+            The artist drawn on the slate, the user running the encoding if
+            None.
+
+        """
+        self.path = path
+        self.title = title
+        self.thread_count = thread_count
+        self.production_name = production_name
+        self.stream = stream
+        self.pipeline = pipeline
+        self.scale = scale
+        self.outputs = outputs
+        self.segment_count = segment_count
+        self.scratch_folder = scratch_folder
+        self.image_format = image_format
+        self.backend = backend
+        self.use_cache = use_cache
+        self.hash_content = hash_content
+        self.store_folder = store_folder
+        self.dedupe = dedupe
+        self.profile = profile
+        self.resume = resume
+        self.coordinator_address = coordinator_address
+        self.watch_last = watch_last
+        self.username = username
+
+
+class EncodeResult(object):
+    """The outcome of an encoding."""
+
+    def __init__(self, job):
+        """Initialize the result, nothing is generated yet.
+
+        Parameters
+        ----------
+        job: EncodeJob
+            The encoded job.
+
+        """
+        self.job = job
+        # Path to the first output, and to every output by name
+        self.movie = None
+        self.outputs = {}
+        self.frame_count = None
+        # The number of images linked to another one with the same content
+        self.duplicate_count = 0
+        # The durations (in seconds) of the stages of the encoding (convert,
+        # encode, stream or pipeline) and of the whole encoding (total)
+        self.timings = {}
+        # The error that stopped the encoding, one of Settings.RUN_ERRORS
+        self.error = None
+
+    @property
+    def succeeded(self):
+        """bool: Whether every output was generated."""
+        return self.error is None
+
+
+class JobEncode(EncodeMovieFx):
+    """Encoding of an EncodeJob, the stages are always timed."""
+
+    def __init__(self, job):
+        """Initialize the encoding.
+
+        Parameters
+        ----------
+        job: EncodeJob
+            The job to encode.
+
+        """
+        super(JobEncode, self).__init__([job.path])
+        self.job = job
+        self.path = job.path
+        for name in (
+            'thread_count', 'production_name', 'outputs', 'scratch_folder',
+            'image_format', 'backend', 'store_folder', 'watch_last',
+            'username',
+        ):
+            value = getattr(job, name)
+            if value is not None:
+                setattr(self, name, value)
+        self.stream = job.stream
+        self.pipeline = job.pipeline
+        self.use_cache = job.use_cache
+        self.hash_content = job.hash_content
+        self.dedupe = job.dedupe
+        self.resume = job.resume
+        # Timed whether the profile is written or not
+        self.profile = RunProfile()
+
+    def prepare(self):
+        """Read the settings of the job and its file name.
+
+        Raises
+        ------
+        ValueError
+            If a setting is invalid, the file name is wrongly formatted or
+            the job has no title while the file name has none.
+
+        """
+        job = self.job
+        self.outputs = list(self.outputs)
+        if isinstance(job.scale, basestring):
+            self.scale = parse_scale(job.scale)
+        elif isinstance(job.scale, list):
+            self.scale = tuple(job.scale)
+        else:
+            self.scale = job.scale
+        if job.segment_count == Settings.AUTO_SEGMENT_COUNT:
+            self.segment_count = cpu_count()
+        elif job.segment_count is not None:
+            self.segment_count = job.segment_count
+        if isinstance(job.coordinator_address, basestring):
+            self.coordinator_address = parse_address(job.coordinator_address)
+        else:
+            self.coordinator_address = job.coordinator_address
+        self.check_settings()
+
+        self.read_filename()
+        if job.title:
+            self.title = job.title
+
+    def get_title_from_user(self):
+        """Return the title of the job.
+
+        Returns
+        -------
+        str
+            The title.
+
+        Raises
+        ------
+        ValueError
+            If the job has no title, nobody can be asked for one.
+
+        """
+        if not self.job.title:
+            raise ValueError(
+                'No title in the file name {}, the job needs one.'.format(
+                    self.path
+                )
+            )
+        return self.job.title
+
+    def write_profile(self):
+        """Write the profile report of the run if the job asks for it."""
+        if self.job.profile:
+            super(JobEncode, self).write_profile()
+
+
+def encode_movie(job):
+    """Convert the images of a job and generate its outputs.
+
+    Parameters
+    ----------
+    job: EncodeJob
+        The job to encode.
+
+    Returns
+    -------
+    EncodeResult
+        The outcome, with the error that stopped the encoding if it failed.
+        Errors other than Settings.RUN_ERRORS are raised.
+
+    """
+    result = EncodeResult(job)
+    start = time.time()
+    encode = None
+    try:
+        encode = JobEncode(job)
+        encode.prepare()
+        encode.encode()
+    except Settings.RUN_ERRORS as error:
+        result.error = error
+    else:
+        result.movie = encode.out_filepath
+        result.outputs = dict(
+            (output, encode.get_out_filepath(output))
+            for output in encode.outputs
+        )
+    if encode is not None:
+        result.frame_count = encode.frame_count
+        result.duplicate_count = encode.duplicate_count
+        result.timings = dict(encode.profile.stages)
+    result.timings['total'] = time.time() - start
+    return result
@@ -0,0 +1,327 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Submit encodeMovieFx jobs to the encode daemon.
+
+The client doesn't import encodeMovieFx, it starts without loading the
+color modules.
+"""
+
+import os
+import sys
+import time
+import socket
+import getopt
+import getpass
+import platform
+import tempfile
+import subprocess
+
+from frameCoordinator import send_message
+from frameCoordinator import receive_message
+
+
+def user_name():
+    """Return the name of the user, drawn on the slate of its movies.
+
+    Returns
+    -------
+    str
+        The name, as encodeMovieFx reads it.
+
+    """
+    return os.environ.get('USERNAME') or getpass.getuser()
+
+
+# The UNIX socket the daemon listens on, a daemon per user
+SOCKET_PATH = os.environ.get(
+    'ENCODEMOVIEFX_SOCKET',
+    os.path.join(
+        tempfile.gettempdir(),
+        'encodeMovieFx_daemon_{}.sock'.format(user_name())
+    )
+)
+# Only the user running the daemon can connect to it
+SOCKET_MODE = 0o600
+SOCKET_FLAG = ('-k', '--socket')
+STATUS_FLAG = '--status'
+DETACH_FLAG = '--detach'
+HELP_FLAG = '-h'
+
+# The states of a job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# Delay (in seconds) between two status queries of a submitted job
+STATUS_INTERVAL = 1.0
+
+# Opens the movie once encoded, as encodeMovieFx does
+LINUX_OPEN_FILE = 'xdg-open'
+
+
+def check_owner(socket_path):
+    """Check a socket belongs to the user.
+
+    Parameters
+    ----------
+    socket_path: str
+        Path to the UNIX socket.
+
+    Raises
+    ------
+    IOError
+        If the socket belongs to another user.
+
+    """
+    if not hasattr(os, 'getuid'):
+        return
+    try:
+        owner = os.stat(socket_path).st_uid
+    except OSError:
+        return
+    if owner != os.getuid():
+        raise IOError('{} belongs to another user.'.format(socket_path))
+
+
+def request(socket_path, message):
+    """Send a message to the daemon and return its answer.
+
+    Parameters
+    ----------
+    socket_path: str
+        Path to the UNIX socket of the daemon.
+    message: dict
+        The message.
+
+    Returns
+    -------
+    dict
+        The answer.
+
+    Raises
+    ------
+    IOError
+        If the daemon can't be reached or is run by another user.
+
+    """
+    check_owner(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        reader = sock.makefile('rb')
+        writer = sock.makefile('wb')
+        try:
+            send_message(writer, message)
+            return receive_message(reader)
+        finally:
+            writer.close()
+            reader.close()
+    except socket.error as error:
+        raise IOError(str(error))
+    finally:
+        sock.close()
+
+
+class EncodeClient(object):
+    """Submit a job to the encode daemon and wait for its movie."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'encodeClient.py '
+        '[-k/--socket path] '
+        '[--detach] '
+        'path/to/first_file_to_convert '
+        '[encodeMovieFx.py args]\n'
+        '       '
+        'encodeClient.py '
+        '[-k/--socket path] '
+        '--status '
+        '[job_id ...]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+        self.socket_path = SOCKET_PATH
+        self.status = False
+        self.detach = False
+        # The encodeMovieFx args of the job, or the ids of the jobs queried
+        self.job_args = []
+
+    def run(self):
+        """Submit the job or query the status of jobs."""
+        self.parse_args()
+        try:
+            if self.status:
+                self.print_status()
+            else:
+                self.submit()
+        except IOError as error:
+            print 'Cannot reach the encode daemon on {}: {}'.format(
+                self.socket_path, error
+            )
+            sys.exit(1)
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        The args following the path to the first image are the args of
+        the job, passed as is to encodeMovieFx. Sets the socket_path,
+        status, detach and job_args vars.
+        """
+        try:
+            options, args = getopt.getopt(
+                self.args,
+                HELP_FLAG[1:] + '{}:'.format(SOCKET_FLAG[0][1:]),
+                [
+                    '{}='.format(SOCKET_FLAG[1][2:]),
+                    STATUS_FLAG[2:], DETACH_FLAG[2:],
+                ]
+            )
+        except getopt.GetoptError:
+            print EncodeClient.cli_usage
+            sys.exit(2)
+
+        for flag, argument in options:
+            if flag == HELP_FLAG:
+                print EncodeClient.cli_usage
+                sys.exit()
+            elif flag in SOCKET_FLAG:
+                self.socket_path = argument
+            elif flag == STATUS_FLAG:
+                self.status = True
+            elif flag == DETACH_FLAG:
+                self.detach = True
+
+        self.job_args = list(args)
+        if self.status:
+            if not all(job_id.isdigit() for job_id in self.job_args):
+                print EncodeClient.cli_usage
+                sys.exit(2)
+            return
+        if not self.job_args:
+            print EncodeClient.cli_usage
+            sys.exit(2)
+        # The daemon doesn't run in the folder of the client
+        self.job_args[0] = os.path.abspath(self.job_args[0])
+
+    def submit(self):
+        """Submit the job, then wait for it unless detached.
+
+        The title is asked to the user when the daemon can't get it from
+        the file name. The movie is signed with the name of the user, not
+        the one running the daemon.
+        """
+        title = None
+        while True:
+            answer = request(self.socket_path, {
+                'submit': self.job_args,
+                'title': title,
+                'username': user_name(),
+            })
+            if not answer.get('title_required'):
+                break
+            title = raw_input("Contents : ").strip()
+
+        if 'error' in answer:
+            print answer['error']
+            if answer.get('usage'):
+                print answer['usage']
+            sys.exit(2 if answer.get('usage') else 1)
+
+        job_id = answer['job']
+        print 'Job {} submitted.'.format(job_id)
+        if self.detach:
+            return
+        info = self.wait(job_id)
+        if info['status'] == JOB_FAILED:
+            print 'Encoding failed: {}'.format(info['error'])
+            sys.exit(1)
+
+        print 'Movie written to {}'.format(info['movie'])
+        if 'windows' in platform.system().lower():
+            os.startfile(info['movie'])
+        else:
+            subprocess.check_output([LINUX_OPEN_FILE, info['movie']])
+
+    def wait(self, job_id):
+        """Wait for a job to finish, printing its progress.
+
+        Parameters
+        ----------
+        job_id: int
+            The id of the job.
+
+        Returns
+        -------
+        dict
+            The status of the finished job.
+
+        Raises
+        ------
+        IOError
+            If the daemon stops answering or forgets the job.
+
+        """
+        last = None
+        while True:
+            jobs = request(self.socket_path, {'status': job_id})['jobs']
+            if not jobs:
+                raise IOError('Job {} is unknown.'.format(job_id))
+            info = jobs[0]
+            if info['status'] in (JOB_DONE, JOB_FAILED):
+                return info
+            state = (info['status'], info.get('position'))
+            if state != last:
+                print EncodeClient.describe(info)
+                last = state
+            time.sleep(STATUS_INTERVAL)
+
+    def print_status(self):
+        """Print the status of the jobs known to the daemon."""
+        job_ids = [int(job_id) for job_id in self.job_args] or [None]
+        for job_id in job_ids:
+            jobs = request(self.socket_path, {'status': job_id})['jobs']
+            if job_id is not None and not jobs:
+                print 'Job {} is unknown.'.format(job_id)
+            for info in jobs:
+                print EncodeClient.describe(info)
+
+    @staticmethod
+    def describe(info):
+        """Describe the status of a job.
+
+        Parameters
+        ----------
+        info: dict
+            The status of the job, as sent by the daemon.
+
+        Returns
+        -------
+        str
+            The description, on a line.
+
+        """
+        text = 'Job {} {}'.format(info['id'], info['status'])
+        if info['status'] == JOB_QUEUED:
+            text += ' (position {})'.format(info['position'])
+        elif info['status'] == JOB_DONE:
+            text += ': {}'.format(info['movie'])
+        elif info['status'] == JOB_FAILED:
+            text += ': {}'.format(info['error'])
+        return '{} [{}]'.format(text, info['path'])
+
+
+if __name__ == '__main__':
+    EncodeClient(sys.argv[1:]).run()
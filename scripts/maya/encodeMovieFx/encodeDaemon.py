@@ -0,0 +1,428 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Encode the jobs submitted by encodeClient.py in a long running process."""
+
+import os
+import sys
+import time
+import Queue
+import socket
+import getopt
+import threading
+import collections
+import SocketServer
+
+from encodeMovieFx import Settings
+from encodeMovieFx import EncodeMovieFx
+from encodeClient import SOCKET_PATH
+from encodeClient import SOCKET_MODE
+from encodeClient import SOCKET_FLAG
+from encodeClient import JOB_QUEUED
+from encodeClient import JOB_RUNNING
+from encodeClient import JOB_DONE
+from encodeClient import JOB_FAILED
+from encodeClient import check_owner
+from frameCoordinator import send_message
+from frameCoordinator import receive_message
+
+
+class TitleRequired(ValueError):
+    """The title of a job can't be read from its file name."""
+
+
+class DaemonEncode(EncodeMovieFx):
+    """Encoding of a daemon job, the title is asked by the client."""
+
+    def __init__(self, args, title=None, username=None):
+        """Initialize the encoding.
+
+        Parameters
+        -----------
+        args: list of str
+            The encodeMovieFx cli args of the job.
+        title: str or None
+            The title entered by the user on the client.
+        username: str or None
+            The user of the client, the user running the daemon if None.
+
+        """
+        super(DaemonEncode, self).__init__(args)
+        self.client_title = title
+        if username:
+            self.username = username
+
+    def get_title_from_user(self):
+        """Return the title entered on the client.
+
+        Returns
+        -------
+        str
+            The title.
+
+        Raises
+        ------
+        TitleRequired
+            If no title was entered, the client asks the user for one.
+
+        """
+        if not self.client_title:
+            raise TitleRequired('The title of the job is required.')
+        return self.client_title
+
+
+class DaemonJob(object):
+    """A job submitted to the daemon and its outcome."""
+
+    def __init__(self, job_id, encode):
+        """Initialize the job.
+
+        Parameters
+        ----------
+        job_id: int
+            The id the job is queried with.
+        encode: DaemonEncode
+            The encoding, with its args and filename parsed.
+
+        """
+        self.id = job_id
+        self.encode = encode
+        self.status = JOB_QUEUED
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    def info(self, position=None):
+        """Return the status of the job sent to the clients.
+
+        Parameters
+        ----------
+        position: int or None
+            The position of the job in the queue, 1 for the next one.
+
+        Returns
+        -------
+        dict
+            The status.
+
+        """
+        return {
+            'id': self.id,
+            'path': self.encode.path,
+            'status': self.status,
+            'position': position,
+            'error': self.error,
+            'movie': self.encode.out_filepath,
+            'submitted': self.submitted,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class DaemonServer(SocketServer.ThreadingUnixStreamServer):
+    """Server answering the clients of the daemon, a thread per client."""
+
+    daemon_threads = True
+
+
+class DaemonHandler(SocketServer.StreamRequestHandler):
+    """Answer a message of a client.
+
+    A client sends one of these messages per connection:
+
+    - {"submit": args, "title": title or null, "username": name or null},
+      answered by {"job": id},
+      {"title_required": true} if the title has to be entered on the
+      client, or {"error": message, "usage": text or null}.
+    - {"status": id or null}, answered by {"jobs": [status, ...]} with
+      the status of the job, or of all the jobs if id is null.
+    """
+
+    def handle(self):
+        """Read the message of the client and answer it."""
+        daemon = self.server.encode_daemon
+        try:
+            message = receive_message(self.rfile)
+            if 'submit' in message:
+                answer = daemon.submit(
+                    message['submit'], message.get('title'),
+                    message.get('username')
+                )
+            elif 'status' in message:
+                answer = {'jobs': daemon.status(message['status'])}
+            else:
+                answer = {'error': 'Unknown message.'}
+            send_message(self.wfile, answer)
+        except (IOError, socket.error):
+            pass
+
+
+class EncodeDaemon(object):
+    """Encode the submitted jobs, keeping the process warm between them.
+
+    The color processors and LUTs loaded by a job are reused by the next
+    ones. Jobs wait in a bounded queue, a fixed number of them are encoded
+    at the same time.
+    """
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'encodeDaemon.py '
+        '[-k/--socket path] '
+        '[-q/--queue_size queue_size] '
+        '[-J/--job_count job_count] '
+        '[-h]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+        self.socket_path = SOCKET_PATH
+        self.queue_size = Settings.DAEMON_QUEUE_SIZE
+        self.job_count = Settings.DAEMON_JOB_COUNT
+        self.lock = threading.Lock()
+        self.queue = None
+        # The jobs by id, in submission order
+        self.jobs = collections.OrderedDict()
+        self.next_id = 1
+        self.runners = []
+        self.server = None
+        self.thread = None
+
+    def run(self):
+        """Serve the clients until interrupted."""
+        self.parse_args()
+        if not hasattr(socket, 'AF_UNIX'):
+            print 'The encode daemon needs UNIX sockets.'
+            sys.exit(1)
+        try:
+            self.start()
+        except (IOError, socket.error) as error:
+            print 'Cannot listen on {}: {}'.format(self.socket_path, error)
+            sys.exit(1)
+        print 'Waiting for jobs on {}.'.format(self.socket_path)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        Sets the socket_path, queue_size and job_count vars.
+        """
+        arg_flags = [
+            SOCKET_FLAG,
+            Settings.QUEUE_SIZE_FLAG,
+            Settings.JOB_COUNT_FLAG,
+        ]
+        try:
+            options, args = getopt.getopt(
+                self.args,
+                Settings.HELP_FLAG[1:] + ''.join(
+                    '{}:'.format(flag[0][1:]) for flag in arg_flags
+                ),
+                ['{}='.format(flag[1][2:]) for flag in arg_flags]
+            )
+        except getopt.GetoptError:
+            print EncodeDaemon.cli_usage
+            sys.exit(2)
+        if args:
+            print EncodeDaemon.cli_usage
+            sys.exit(2)
+
+        for flag, argument in options:
+            if flag == Settings.HELP_FLAG:
+                print EncodeDaemon.cli_usage
+                sys.exit()
+            elif flag in SOCKET_FLAG:
+                self.socket_path = argument
+            elif flag in Settings.QUEUE_SIZE_FLAG + Settings.JOB_COUNT_FLAG:
+                try:
+                    count = int(argument)
+                except ValueError:
+                    print EncodeDaemon.cli_usage
+                    sys.exit(2)
+                if count < 1:
+                    print EncodeDaemon.cli_usage
+                    sys.exit(2)
+                if flag in Settings.QUEUE_SIZE_FLAG:
+                    self.queue_size = count
+                else:
+                    self.job_count = count
+
+    def start(self):
+        """Start the job threads and accepting clients.
+
+        Raises
+        ------
+        IOError
+            If another daemon listens on the socket or it belongs to another
+            user.
+
+        """
+        if os.path.exists(self.socket_path):
+            check_owner(self.socket_path)
+            # Left by a daemon that was killed
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except socket.error:
+                os.remove(self.socket_path)
+            else:
+                raise IOError('Another daemon is running.')
+            finally:
+                probe.close()
+
+        self.server = DaemonServer(self.socket_path, DaemonHandler)
+        os.chmod(self.socket_path, SOCKET_MODE)
+        self.server.encode_daemon = self
+        self.queue = Queue.Queue(self.queue_size)
+        for _ in xrange(self.job_count):
+            runner = threading.Thread(target=self.work)
+            runner.daemon = True
+            runner.start()
+            self.runners.append(runner)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop accepting clients and wait for the running jobs.
+
+        The queued jobs are dropped.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        while True:
+            try:
+                self.queue.get_nowait()
+            except Queue.Empty:
+                break
+        for _ in self.runners:
+            self.queue.put(None)
+        for runner in self.runners:
+            runner.join()
+
+    def submit(self, args, title=None, username=None):
+        """Queue a job.
+
+        Parameters
+        ----------
+        args: list of str
+            The encodeMovieFx cli args of the job.
+        title: str or None
+            The title entered by the user on the client.
+        username: str or None
+            The user of the client, drawn on the slate.
+
+        Returns
+        -------
+        dict
+            The answer sent to the client.
+
+        """
+        encode = DaemonEncode(args, title, username)
+        try:
+            encode.parse_args()
+            encode.read_filename()
+        except TitleRequired:
+            return {'title_required': True}
+        except SystemExit:
+            return {
+                'error': 'Invalid arguments.',
+                'usage': EncodeMovieFx.cli_usage,
+            }
+        except ValueError as error:
+            return {'error': str(error), 'usage': None}
+
+        with self.lock:
+            job = DaemonJob(self.next_id, encode)
+            try:
+                self.queue.put_nowait(job)
+            except Queue.Full:
+                return {'error': 'The job queue is full ({} jobs).'.format(
+                    self.queue_size
+                )}
+            self.next_id += 1
+            self.jobs[job.id] = job
+            # Forget the oldest finished jobs
+            finished = [
+                job_id for job_id, other in self.jobs.items()
+                if other.status in (JOB_DONE, JOB_FAILED)
+            ]
+            forgotten = max(0, len(finished) - Settings.DAEMON_HISTORY)
+            for job_id in finished[:forgotten]:
+                del self.jobs[job_id]
+        print 'Job {} queued: {}'.format(job.id, ' '.join(args))
+        return {'job': job.id}
+
+    def status(self, job_id=None):
+        """Return the status of jobs.
+
+        Parameters
+        ----------
+        job_id: int or None
+            The id of the job, None for all the jobs.
+
+        Returns
+        -------
+        list of dict
+            The status of the jobs, in submission order. Empty if the job
+            is unknown.
+
+        """
+        with self.lock:
+            infos = []
+            position = 0
+            for job in self.jobs.values():
+                if job.status == JOB_QUEUED:
+                    position += 1
+                if job_id is None or job.id == job_id:
+                    infos.append(job.info(
+                        position if job.status == JOB_QUEUED else None
+                    ))
+            return infos
+
+    def work(self):
+        """Encode the queued jobs until the queue hands out None."""
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            with self.lock:
+                job.status = JOB_RUNNING
+                job.started = time.time()
+            print 'Job {} started.'.format(job.id)
+            try:
+                job.encode.encode()
+            except Exception as error:
+                # Keep the daemon running whatever happened
+                status = JOB_FAILED
+                job.error = str(error)
+                print 'Job {} failed: {}'.format(job.id, error)
+            else:
+                status = JOB_DONE
+                print 'Job {} done: {}'.format(job.id, job.encode.out_filepath)
+            with self.lock:
+                job.status = status
+                job.finished = time.time()
+
+
+if __name__ == '__main__':
+    EncodeDaemon(sys.argv[1:]).run()
@@ -9,9 +9,42 @@ import sys
 import subprocess
 import re
 import shutil
+import struct
 import threading
-import itertools
 import getopt
+import getpass
+import Queue
+import time
+import math
+import ctypes
+import multiprocessing
+import tempfile
+import hashlib
+import uuid
+import json
+
+from conversionCache import ConversionCache
+from conversionCache import hash_file
+from frameJournal import FrameJournal
+from frameCoordinator import FrameCoordinator
+from frameCoordinator import parse_address
+from folderWatcher import FolderWatcher
+from imageSequence import find_sequence
+
+# Python modules used by the in process conversion, ocioconvert is used
+# when they are missing
+try:
+    import numpy
+except ImportError:
+    numpy = None
+try:
+    import PyOpenColorIO as OCIO
+except ImportError:
+    OCIO = None
+try:
+    import OpenImageIO as oiio
+except ImportError:
+    oiio = None
 
 
 class Settings:
@@ -21,10 +54,27 @@ class Settings:
     #                                  CLI                                    #
     # ####################################################################### #
     DEFAULT_PROD_NAME = "Corgi"
-    DEFAULT_THREAD_COUNT = 50
+    AUTO_THREAD_COUNT = 'auto'
+    DEFAULT_THREAD_COUNT = AUTO_THREAD_COUNT
 
     THREAD_COUNT_FLAG = ('-c', '--thread_count')
     PROD_NAME_FLAG = ('-p', '--production_name')
+    STREAM_FLAG = ('-s', '--stream')
+    BACKEND_FLAG = ('-b', '--backend')
+    NO_CACHE_FLAG = ('-n', '--no_cache')
+    HASH_FLAG = ('-H', '--hash')
+    PIPELINE_FLAG = ('-P', '--pipeline')
+    SCALE_FLAG = ('-S', '--scale')
+    OUTPUTS_FLAG = ('-o', '--outputs')
+    SEGMENTS_FLAG = ('-g', '--segments')
+    SCRATCH_FLAG = ('-t', '--scratch')
+    IMAGE_FORMAT_FLAG = ('-f', '--image_format')
+    PROFILE_FLAG = ('-r', '--profile')
+    RESUME_FLAG = ('-j', '--resume')
+    DISTRIBUTE_FLAG = ('-d', '--distribute')
+    WATCH_FLAG = ('-w', '--watch')
+    DEDUPE_FLAG = ('-D', '--dedupe')
+    STORE_FLAG = ('-x', '--store')
     HELP_FLAG = '-h'
 
     # ####################################################################### #
@@ -40,11 +90,76 @@ class Settings:
     FONT_NORMAL = "//nwave/data/effects/_internal/fonts/arial.ttf"
     FONT_BOLD = "//nwave/data/effects/_internal/fonts/arialbd.ttf"
 
+    # The constant part of the ui is rendered once to a transparent image
+    # as wide as the converted images, overlaid on the top of every frame.
+    # This size is used when the size of the input images can't be read
+    SLATE_SIZE = (1024, 160)
+    SLATE_NAME = 'slate.png'
+
     OUT_VIDEO_EXTENSION = 'mov'
     FRAME_RATE = '24'
     CODEC = 'mjpeg'
     BITRATE = '96000K'
 
+    # ####################################################################### #
+    #                                OUTPUTS                                  #
+    # ####################################################################### #
+    # The outputs generated from a single conversion pass, by name. The
+    # suffix is added to the input filename, the scale (factor of the
+    # converted images size or None) is applied to the output only. Video
+    # outputs get all the frames, poster outputs the middle one and contact
+    # sheet outputs a grid of evenly spaced frames.
+    OUTPUTS = {
+        'mov': {
+            'kind': 'video',
+            'suffix': '',
+            'extension': OUT_VIDEO_EXTENSION,
+            'scale': None,
+            'args': ['-vcodec', CODEC, '-b:v', BITRATE],
+            # Intra frame only codec, can be encoded in segments
+            'intra': True,
+        },
+        'mp4': {
+            'kind': 'video',
+            'suffix': '',
+            'extension': 'mp4',
+            'scale': 0.5,
+            'args': [
+                '-vcodec', 'libx264', '-preset', 'fast', '-crf', '23',
+                '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+            ],
+            'intra': False,
+        },
+        'poster': {
+            'kind': 'poster',
+            'suffix': '_poster',
+            'extension': 'jpg',
+            'scale': None,
+            'args': ['-q:v', '2'],
+        },
+        'contact_sheet': {
+            'kind': 'contact_sheet',
+            'suffix': '_contact_sheet',
+            'extension': 'jpg',
+            'scale': None,
+            'args': ['-q:v', '2'],
+        },
+    }
+    DEFAULT_OUTPUTS = ['mov']
+    # Columns and rows of the contact sheets, and width of their frames
+    CONTACT_SHEET_GRID = (6, 4)
+    CONTACT_SHEET_FRAME_WIDTH = 320
+
+    # ####################################################################### #
+    #                           SEGMENTED ENCODING                            #
+    # ####################################################################### #
+    AUTO_SEGMENT_COUNT = 'auto'
+    DEFAULT_SEGMENT_COUNT = 1
+    # Segments are never shorter than this, the ffmpeg startup would cost
+    # more than the parallel encoding saves
+    MIN_SEGMENT_FRAMES = 48
+    SEGMENTS_FOLDER = 'segments'
+
     # ####################################################################### #
     #                                  OCIO                                   #
     # ####################################################################### #
@@ -67,10 +182,84 @@ class Settings:
         'linux': _UNIX_OCIOCONVERT,
     }[platform.system().lower()]
 
+    _WIN_OIIOTOOL = \
+        "//nwave/software/OpenImageIO/1.5.22/win64/bin/oiiotool.exe"
+    _UNIX_OIIOTOOL = \
+        "//nwave/software/OpenImageIO/1.8.6/linux64/bin/oiiotool"
+    OIIOTOOL = {
+        'windows': _WIN_OIIOTOOL,
+        'linux': _UNIX_OIIOTOOL,
+    }[platform.system().lower()]
+
     OCIO_CONFIG = "//NWAVE/DATA/color/aces_1.0.3-nwave/config.ocio"
     OCIO_IN_PROFILE = "ACES - ACEScg"
     OCIO_OUT_PROFILE = "Output - sRGB (D60 sim.)"
 
+    OCIO_BACKEND = 'ocio'
+    OCIO_CONVERT_BACKEND = 'ocioconvert'
+    LUT_BACKEND = 'lut'
+    DEFAULT_BACKEND = OCIO_BACKEND
+
+    # ####################################################################### #
+    #                                  LUT                                    #
+    # ####################################################################### #
+    # Number of lattice points per axis of the baked 3D LUT
+    LUT_SIZE = 65
+    # 'tetrahedral' or 'trilinear'
+    LUT_INTERPOLATION = 'tetrahedral'
+    LUT_FOLDER = os.path.join(tempfile.gettempdir(), 'encodeMovieFx_luts')
+    # The log2 shaper maps scene linear values from 0 to LUT_SHAPER_MAX on
+    # the LUT input range, the offset keeps the dark values from being
+    # squeezed on the first lattice point
+    LUT_SHAPER_MAX = 16.0
+    LUT_SHAPER_OFFSET = 2.0 ** -10
+    # Number of pixels interpolated at once, bounds the memory used
+    LUT_CHUNK_SIZE = 2 ** 20
+
+    # ####################################################################### #
+    #                            CONVERSION CACHE                             #
+    # ####################################################################### #
+    CACHE_FOLDER = os.path.join(tempfile.gettempdir(), 'encodeMovieFx_cache')
+    # Size (in bytes) above which the least recently used images are evicted
+    CACHE_MAX_SIZE = 20 * 1024 ** 3
+
+    # ####################################################################### #
+    #                              SHARED STORE                               #
+    # ####################################################################### #
+    # Folder of the images converted by every user, keyed by the content of
+    # the source images. Set it on a shared scratch for the encodings of the
+    # same published renders to share their conversions, None disables it
+    STORE_FOLDER = os.environ.get('ENCODEMOVIEFX_STORE')
+    # Size (in bytes) above which the least recently used images are evicted
+    STORE_MAX_SIZE = 200 * 1024 ** 3
+
+    # ####################################################################### #
+    #                               DUPLICATES                                #
+    # ####################################################################### #
+    # Number of threads hashing the input images that may be duplicates,
+    # held frames are converted once and linked
+    DEDUPE_THREAD_COUNT = 8
+    # Number of bytes read at the end of the images of the same size, only
+    # the images with the same end are read whole
+    DEDUPE_SAMPLE_SIZE = 64 * 1024
+
+    # ####################################################################### #
+    #                                SCRATCH                                  #
+    # ####################################################################### #
+    # Local folder the converted images are written to, a unique folder is
+    # made in it for every job
+    SCRATCH_FOLDER = os.environ.get(
+        'ENCODEMOVIEFX_SCRATCH',
+        os.path.join(tempfile.gettempdir(), 'encodeMovieFx_scratch')
+    )
+    # Passed to the cli to write the converted images next to the input
+    # images, in TEMP_FOLDER
+    NETWORK_SCRATCH = 'network'
+    # Estimated size (in bytes) of a full size converted image
+    SCRATCH_IMAGE_SIZE = 16 * 1024 ** 2
+    # Space (in bytes) left free on the scratch disk
+    SCRATCH_MIN_FREE = 1024 ** 3
+
     TEMP_FOLDER = 'TEMP'
     DEFAULT_SEQ_SHOT = '000_0000'
     IN_IMAGE_EXTENSION = 'exr'
@@ -78,406 +267,3729 @@ class Settings:
     TITLES_TO_REPLACE = ['masterlayer']
     LINUX_OPEN_FILE = 'xdg-open'
 
+    # ####################################################################### #
+    #                          INTERMEDIATE FORMATS                           #
+    # ####################################################################### #
+    # The formats the converted images can be written in, by name. The
+    # attributes are set on the OpenImageIO spec of the in process
+    # backends, the oiiotool args are added to the ocioconvert backend
+    # command (None for the default ocioconvert output), the decoder is
+    # used by ffmpeg to read piped images.
+    IMAGE_FORMATS = {
+        # zlib compressed, the smallest files
+        'png': {
+            'extension': OUT_IMAGE_EXTENSION,
+            'attributes': [],
+            'oiiotool_args': None,
+            'decoder': 'png',
+        },
+        # Stored without compression, no zlib work on either side
+        'png0': {
+            'extension': 'png',
+            'attributes': [('png:compressionLevel', 0)],
+            'oiiotool_args': ['--attrib', 'png:compressionLevel', '0'],
+            'decoder': 'png',
+        },
+        'ppm': {
+            'extension': 'ppm',
+            'attributes': [],
+            'oiiotool_args': [],
+            'decoder': 'ppm',
+        },
+        'tiff': {
+            'extension': 'tif',
+            'attributes': [('compression', 'none')],
+            'oiiotool_args': ['--ch', 'R,G,B', '--compression', 'none'],
+            'decoder': 'tiff',
+        },
+    }
+    DEFAULT_IMAGE_FORMAT = 'png'
+
+    # ####################################################################### #
+    #                               STREAMING                                 #
+    # ####################################################################### #
+    STREAM_IMAGE_EXTENSION = 'ppm'
+    # Number of images conversion threads can get ahead of the image piped
+    # to ffmpeg, bounds the memory used by images waiting for their turn
+    STREAM_WINDOW = 16
+    # Same for the image files piped to ffmpeg in pipeline mode, only paths
+    # are kept in memory
+    PIPELINE_WINDOW = 256
+
+    # ####################################################################### #
+    #                                 BATCH                                   #
+    # ####################################################################### #
+    ENCODER_COUNT_FLAG = ('-e', '--encoder_count')
+    MANIFEST_FLAG = ('-m', '--manifest')
+    # Number of ffmpeg processes encoding videos at the same time
+    DEFAULT_ENCODER_COUNT = 2
+    # Lines of the manifest files starting with this are ignored
+    MANIFEST_COMMENT = '#'
+
+    # ####################################################################### #
+    #                           AUTO THREAD COUNT                             #
+    # ####################################################################### #
+    # Never run more conversion threads than this per core
+    MAX_THREADS_PER_CORE = 8
+    # Memory (in bytes) used by an ocioconvert process on a 4K exr
+    THREAD_MEMORY = 512 * 1024 ** 2
+    # Delay (in seconds) between two throughput measures
+    TUNING_INTERVAL = 5.0
+    # Minimum throughput gain for more threads to be added
+    TUNING_MIN_GAIN = 0.05
+
+    # ####################################################################### #
+    #                                FAILURES                                 #
+    # ####################################################################### #
+    # Errors a conversion is retried on, reads and writes on the network
+    # shares fail transiently
+    RETRY_ERRORS = (EnvironmentError, subprocess.CalledProcessError)
+    # Number of retries of a failed conversion, and delay (in seconds)
+    # before the first one, doubled before each of the next ones
+    CONVERT_RETRIES = 2
+    RETRY_DELAY = 1.0
+    # Errors reported without a traceback, they set the exit status
+    RUN_ERRORS = (EnvironmentError, subprocess.CalledProcessError, ValueError)
+
+    # ####################################################################### #
+    #                                 RESUME                                  #
+    # ####################################################################### #
+    # The journal of the converted images, written in the job folder of
+    # the resumable jobs
+    JOURNAL_NAME = 'journal.txt'
+    # Number of hex digits of the settings hash naming their job folder
+    JOB_KEY_LENGTH = 12
+
+    # ####################################################################### #
+    #                              DISTRIBUTION                               #
+    # ####################################################################### #
+    TOKEN_FLAG = ('-k', '--token')
+    # The token the workers of distributed jobs authenticate with, a random
+    # one printed by the coordinator per job if None
+    COORDINATOR_TOKEN = os.environ.get('ENCODEMOVIEFX_TOKEN')
+
+    # ####################################################################### #
+    #                                 DAEMON                                  #
+    # ####################################################################### #
+    QUEUE_SIZE_FLAG = ('-q', '--queue_size')
+    JOB_COUNT_FLAG = ('-J', '--job_count')
+    # Number of jobs waiting to be encoded, submissions are refused beyond
+    DAEMON_QUEUE_SIZE = 16
+    # Number of jobs encoded at the same time
+    DAEMON_JOB_COUNT = 1
+    # Number of finished jobs whose status can still be queried
+    DAEMON_HISTORY = 100
+
+    # ####################################################################### #
+    #                                 WATCH                                   #
+    # ####################################################################### #
+    # Time (in seconds) the size of a rendered image has to stay the same
+    # for the image to be converted
+    WATCH_STABLE_DELAY = 5.0
+    # Longest time (in seconds) between two listings of the watched folder,
+    # changes made by other hosts aren't reported on network shares
+    WATCH_POLL_INTERVAL = 10.0
+    # The watch fails after this long (in seconds) without a new image
+    WATCH_TIMEOUT = 4 * 3600.0
+
+    # ####################################################################### #
+    #                                PROFILE                                  #
+    # ####################################################################### #
+    # Added to the movie path (without extension) to name the run report
+    PROFILE_SUFFIX = '_profile.json'
+    # The per frame durations summed in the report
+    PROFILE_TIMINGS = [
+        'read', 'convert', 'write', 'cache', 'queue_wait', 'sink_wait',
+    ]
+
 
 class ImageConverter(threading.Thread):
     """Thread dedicated to image conversion and color correction."""
 
-    def __init__(self, lock, in_images, out_images):
+    def __init__(self, lock, queue, backend, tuner=None, sink=None,
+                 cancel=None, profile=None):
         """Initialize the thread.
 
         Parameters
         ----------
         lock: threading.Lock
             A lock used when printing data to main thread.
-        in_images: list of str
-            Paths to images to convert.
-        out_images: list of str
-            Paths to output converted images.
+        queue: Queue.Queue
+            The queue the (input image, output image) path pairs to convert
+            are pulled from, the thread stops when it pulls None.
+        backend: callable
+            Creates the conversion backend, called once by the thread.
+        tuner: ThreadCountTuner or None
+            The tuner the conversion times are reported to, it can also ask
+            the thread to stop early.
+        sink: FrameStreamer, FrameJournal or None
+            The object the converted images (raw pixels or paths depending
+            on its raw attribute) are handed to, the conversion errors are
+            also reported to it. The threads stop on the first error
+            unless its keep_going attribute is set.
+        cancel: threading.Event or None
+            The event shared by the threads, set on the first error that
+            stops them. The threads stop pulling images once it is set.
+        profile: RunProfile or None
+            The profile the timings of the images are recorded in.
 
         """
         super(ImageConverter, self).__init__()
         self.lock = lock
-        self.in_images = in_images
-        self.out_images = out_images
+        self.queue = queue
+        self.backend = backend
+        self.tuner = tuner
+        self.sink = sink
+        self.cancel = cancel or threading.Event()
+        self.error = None
+        self.profile = profile
 
     def run(self):
-        """Convert the images."""
-        # Create a file descriptor to devnull
-        with open(os.devnull, 'w') as dev_null:
-            for in_image, out_image in zip(self.in_images, self.out_images):
-                if in_image is None or out_image is None:
-                    continue
-                # Pipe all messages to devnull to suppress them
-                subprocess.check_call(
-                    [
-                        Settings.OCIO_CONVERT,
-                        in_image, Settings.OCIO_IN_PROFILE,
-                        out_image, Settings.OCIO_OUT_PROFILE
-                    ],
-                    stdout=dev_null,
-                    stderr=dev_null
-                )
-                # Lock before printing to avoid multiple print on the same
-                # line
+        """Convert the images until the queue hands out None."""
+        thread_start = time.time()
+        try:
+            backend = self.backend()
+        except Exception as error:
+            if self.sink:
+                self.sink.fail(error)
+            self.stop(error)
+            return
+
+        while not self.cancel.is_set():
+            if self.tuner and self.tuner.should_retire():
+                break
+            waited = time.time()
+            item = self.queue.get()
+            if item is None:
+                break
+            in_image, out_image = item
+            start = time.time()
+            try:
+                image = self.convert(backend, in_image, out_image)
+                converted = time.time()
+                if self.tuner:
+                    self.tuner.record(converted - start)
+                if self.sink:
+                    self.sink.put(in_image, image)
+                if self.profile:
+                    timings = dict(getattr(backend, 'timings', {}))
+                    timings['queue_wait'] = start - waited
+                    timings['sink_wait'] = time.time() - converted
+                    self.profile.frame(
+                        self.name, in_image, start, converted - start,
+                        timings
+                    )
+            except Exception as error:
+                if self.sink:
+                    self.sink.fail(error, in_image)
+                if not (self.sink and self.sink.keep_going):
+                    self.stop(error, in_image)
+                    break
                 self.lock.acquire(1)
-                print '{} converted'.format(in_image)
+                print '{} failed: {}'.format(in_image, error)
                 self.lock.release()
+                continue
+            # Lock before printing to avoid multiple print on the same
+            # line
+            self.lock.acquire(1)
+            print '{} converted'.format(in_image)
+            self.lock.release()
 
+        if self.profile:
+            self.profile.worker(self.name, thread_start, time.time())
 
-def ffmpeg_draw_box(
-    text, bold=False, size=10, pos=(0, 0), anchor=('right', 'top'), extra=[]
-):
-    """Draw a box on the frame with the given data.
+    def convert(self, backend, in_image, out_image):
+        """Convert an image, retrying after transient errors.
 
-    Parameters
-    ----------
-    text: str
-        The text to put in the box
-    bold: bool
-        Whether the text should be in bold font.
-    size: int
-        The size of the text's font.
-    pos: tuple of 2 int
-        The position relative to the anchor.
-    anchor: tuple of 2 str
-        Where to place the text box relative to the image. Valid values are
-        'left' or 'right' for the first value and 'top' or 'bottom' for the
-        second value.
-    extra: list of str
-        Extra flags to pass to the command.
+        Parameters
+        ----------
+        backend: OcioConvertBackend, OcioBackend, LutBackend or CachedBackend
+            The conversion backend of the thread.
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to the converted image.
 
-    """
-    x = '{}{:+.0f}'.format(
-        '' if anchor[0] == 'left' else 'w-text_w',
-        pos[0] if anchor[0] == 'left' else pos[0] * -1
-    )
-    y = '{}{:+.0f}'.format(
-        '' if anchor[1] == 'top' else 'h-text_h',
-        pos[1] if anchor[1] == 'top' else pos[1] * -1
-    )
-    return (
-        "drawtext="
-        "fontfile={font}:"
-        "fontcolor=white:"
-        "fontsize={size}:"
-        "box=1:"
-        "boxcolor=DarkGray:"
-        "boxborderw=5:"
-        "{extra}"
-        "text='{text}':"
-        "x={x}:"
-        "y={y}"
-    ).format(
-        font=Settings.FONT_BOLD if bold else Settings.FONT_NORMAL,
-        size=size,
-        extra=':'.join(extra) + ':' if extra else '',
-        text=text,
-        x=x, y=y,
-    )
+        Returns
+        -------
+        tuple or str
+            The raw pixels (as returned by the backend load method) if the
+            sink takes raw pixels, the path to the converted image
+            otherwise.
 
+        """
+        delay = Settings.RETRY_DELAY
+        for retry in xrange(Settings.CONVERT_RETRIES + 1):
+            try:
+                if self.sink and self.sink.raw:
+                    return backend.load(in_image, out_image)
+                backend.convert(in_image, out_image)
+                return out_image
+            except Settings.RETRY_ERRORS as error:
+                if retry == Settings.CONVERT_RETRIES or \
+                        self.cancel.is_set():
+                    raise
+                self.lock.acquire(1)
+                print '{} failed, retrying in {:g}s: {}'.format(
+                    in_image, delay, error
+                )
+                self.lock.release()
+                # Don't wait for the retry if the conversion is cancelled
+                self.cancel.wait(delay)
+                delay *= 2
 
-class EncodeMovieFx(object):
-    """Convert a folder of images to a color corrected video."""
+    def stop(self, error, in_image=None):
+        """Keep an error and stop all the threads.
 
-    # The text printed if incorrect arguments are passed to the cli
-    cli_usage = (
-        'usage: '
-        'encodeMovieFx.py '
-        'path/to/first_file_to_convert '
-        '[-c/--thread_count thread_count] '
-        '[-p/--production_name production_name] '
-        '[-h]'
-    )
+        Parameters
+        ----------
+        error: Exception
+            The error that occurred.
+        in_image: str or None
+            Path to the image that failed, None if the error isn't tied to
+            an image.
 
-    def __init__(self, args):
-        """Initialize tool.
+        """
+        self.error = error
+        self.cancel.set()
+        self.lock.acquire(1)
+        print '{} failed: {}'.format(in_image or 'Conversion', error)
+        self.lock.release()
+
+
+class OcioConvertBackend(object):
+    """Conversion backend running an ocioconvert process per image.
+
+    The reading and writing of the images are part of the convert timing
+    of the process.
+    """
+
+    def __init__(self, scale=None, image_format=None):
+        """Initialize the backend.
 
         Parameters
-        -----------
-        args: list of str
-            The cli args passed to the script without the script name
-            (i.e. sys.argv[1:]).
+        ----------
+        scale: float or tuple of int, int or None
+            The factor or the width and height the images are resized to,
+            None to keep their size.
+        image_format: str or None
+            The name of the format the images are written in, the default
+            format if None.
 
         """
-        # Update the environement for ocio
-        if 'windows' in platform.system().lower():
-            os.environ['PATH'] += Settings.OCIO_LIB
-        else:
-            os.environ['LD_LIBRARY_PATH'] = Settings.OCIO_LIB
-        os.environ["OCIO"] = Settings.OCIO_CONFIG
-
-        self.args = args
-        self.path = None
-        self.thread_count = Settings.DEFAULT_THREAD_COUNT
-        self.production_name = Settings.DEFAULT_PROD_NAME
-        self.in_folder = None
-        self.out_folder = None
-        self.filename = None
-        self.current_frame = None
-        self.seq_shot = Settings.DEFAULT_SEQ_SHOT
-        self.title = None
-        self.out_filepath = None
-        self.username = os.environ['USERNAME']
+        self.scale = scale
+        self.image_format = image_format or Settings.DEFAULT_IMAGE_FORMAT
+        # Durations (in seconds) of the steps of the last conversion
+        self.timings = {}
 
-    def run(self):
-        """Parse args and filename, convert images and generate video."""
-        # Parse command line
-        self.parse_args()
-        # Parse input filename
-        self.parse_filename()
+    @staticmethod
+    def identity():
+        """Return what the converted images depend on.
 
-        # Convert input images
-        self.convert_images()
-        # Generate video
-        self.generate_video()
+        Returns
+        -------
+        tuple
+            The backend name and the color transform.
 
-        # Delete temp folder
-        shutil.rmtree(self.out_folder)
+        """
+        return (
+            Settings.OCIO_CONVERT_BACKEND,
+            Settings.OCIO_CONFIG, config_time(),
+            Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE
+        )
 
-        # Open the video
-        if self.out_filepath:
-            if 'windows' in platform.system().lower():
-                os.startfile(self.out_filepath)
-            else:
-                subprocess.check_output(
-                    [Settings.LINUX_OPEN_FILE, self.out_filepath]
-                )
+    def convert(self, in_image, out_image):
+        """Convert and color correct an image.
 
-    def parse_args(self):
-        """Parse the command line args.
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to the converted image.
 
-        Sets the path, thread_count, production_name vars.
         """
-        if not self.args:
-            print EncodeMovieFx.cli_usage
-            sys.exit(2)
+        start = time.time()
+        # Pipe all messages to devnull to suppress them
+        with open(os.devnull, 'w') as dev_null:
+            subprocess.check_call(
+                conversion_command(
+                    in_image, out_image, self.scale,
+                    Settings.IMAGE_FORMATS[self.image_format]['oiiotool_args']
+                ),
+                stdout=dev_null,
+                stderr=dev_null
+            )
+        self.timings = {'convert': time.time() - start}
 
-        self.path = self.args[0]
-        if len(self.args) > 1:
-            try:
-                options, args = getopt.getopt(
-                    self.args[1:],
-                    '{help}{thread_count}:{prod_name}:'.format(
-                        help=Settings.HELP_FLAG[1:],
-                        thread_count=Settings.THREAD_COUNT_FLAG[0][1:],
-                        prod_name=Settings.PROD_NAME_FLAG[0][1:]
-                    ),
-                    [
-                        '{}='.format(Settings.THREAD_COUNT_FLAG[1][2:]),
-                        '{}='.format(Settings.PROD_NAME_FLAG[1][2:])
-                    ]
-                )
-            except getopt.GetoptError:
-                print EncodeMovieFx.cli_usage
-                sys.exit(2)
+    def load(self, in_image, out_image):
+        """Convert and color correct an image to raw pixels.
 
-            for flag, argument in options:
-                if flag == Settings.HELP_FLAG:
-                    print EncodeMovieFx.cli_usage
-                    sys.exit()
-                elif flag in Settings.THREAD_COUNT_FLAG:
-                    self.thread_count = int(argument)
-                elif flag in Settings.PROD_NAME_FLAG:
-                    self.production_name = argument
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to a temporary ppm image, deleted once read.
 
-    def parse_filename(self):
-        """Parse the given filepath.
+        Returns
+        -------
+        int, int, str, str
+            The width, height, ffmpeg pixel format and raw pixels of the
+            converted image.
 
-        Sets the in_folder, out_folder, filename, current_frame, seq_shot and
-        title vars.
         """
-        clean_path = os.path.normpath(os.path.abspath(self.path))
-        # Extract path to the folder
-        self.in_folder, filename = os.path.split(clean_path)
+        self.convert(in_image, out_image)
+        start = time.time()
+        image = read_ppm(out_image)
+        os.remove(out_image)
+        self.timings['convert'] += time.time() - start
+        return image
 
-        # Build output folder
-        self.out_folder = os.path.normpath(
-            os.path.join(self.in_folder, Settings.TEMP_FOLDER)
-        )
 
-        filename, extension = os.path.splitext(filename)
-        if not re.compile('.+?\.[0-9]{4,4}').match(filename):
-            print (
-                'Wrong file name formatting, should be filename.frame_num.{}.'
-            ).format(Settings.IN_IMAGE_EXTENSION)
-            sys.exit(1)
-        # Extract filename and extension
-        self.filename, self.current_frame = filename.split('.')
-        # Check for correct file extension
-        if extension not in '.{}'.format(Settings.IN_IMAGE_EXTENSION):
-            print 'Wrong input file type, should be {}.'.format(
-                Settings.IN_IMAGE_EXTENSION
-            )
-            sys.exit(1)
+class OcioBackend(object):
+    """Conversion backend running OpenColorIO in the calling thread.
 
-        # Get seq and shot info from filename
-        seq_shot_pattern = re.compile("[0-9]{3,}_[0-9]{4,}")
-        result = seq_shot_pattern.findall(self.filename)
-        if result:
-            self.seq_shot = result[0]
+    The config and the color processor are loaded once per process, shared
+    by the backends. Images are read, color corrected and written in
+    memory.
+    """
 
-        # Get title from filename
-        split_name = self.filename.split('_')
-        if len(split_name) > 2:
-            self.title = split_name[2]
-        # Get title from user when it is masterlayer
-        if not self.title or self.title.lower() in Settings.TITLES_TO_REPLACE:
-            self.title = self.get_title_from_user()
+    def __init__(self, scale=None, image_format=None):
+        """Get the color processor, loading the config the first time.
 
-    def get_title_from_user(self):
-        """Get title from raw input.
+        Parameters
+        ----------
+        scale: float or tuple of int, int or None
+            The factor or the width and height the images are resized to,
+            None to keep their size.
+        image_format: str or None
+            The name of the format the images are written in, the default
+            format if None.
+
+        """
+        self.scale = scale
+        self.image_format = image_format or Settings.DEFAULT_IMAGE_FORMAT
+        self.timings = {}
+        self.processor, self.in_place = load_processor()
+
+    @staticmethod
+    def available():
+        """Return whether the python modules used by the backend exist.
 
         Returns
         -------
-        str
-            The title.
+        bool
+            True if the backend can be used.
 
         """
-        return raw_input("Contents : ").strip()
+        return None not in (numpy, OCIO, oiio)
+
+    @staticmethod
+    def identity():
+        """Return what the converted images depend on.
+
+        Returns
+        -------
+        tuple
+            The backend name and the color transform.
+
+        """
+        return (
+            Settings.OCIO_BACKEND,
+            Settings.OCIO_CONFIG, config_time(),
+            Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE
+        )
+
+    def transform(self, pixels):
+        """Color correct pixels.
+
+        Parameters
+        ----------
+        pixels: numpy.ndarray
+            The height x width x 3 float32 pixels to color correct.
+
+        Returns
+        -------
+        numpy.ndarray
+            The color corrected pixels.
+
+        """
+        pixels = numpy.ascontiguousarray(pixels, dtype=numpy.float32)
+        if self.in_place:
+            # OpenColorIO 2 works in place on arrays
+            self.processor.applyRGB(pixels)
+            return pixels
+        # OpenColorIO 1 takes and returns flat lists of floats
+        result = self.processor.applyRGB(pixels.ravel().tolist())
+        return numpy.asarray(result, dtype=numpy.float32).reshape(
+            pixels.shape
+        )
+
+    def read(self, in_image):
+        """Read an image, resized before the color correction.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image.
+
+        Returns
+        -------
+        numpy.ndarray
+            The height x width x 3 float32 pixels.
+
+        """
+        pixels = read_image(in_image)
+        if self.scale is None:
+            return pixels
+        height, width = pixels.shape[:2]
+        return resize_image(pixels, *scaled_size(width, height, self.scale))
+
+    def convert(self, in_image, out_image):
+        """Convert and color correct an image.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to the converted image.
+
+        """
+        start = time.time()
+        pixels = self.read(in_image)
+        read = time.time()
+        pixels = to_8_bits(self.transform(pixels))
+        converted = time.time()
+        write_image(
+            out_image, pixels,
+            Settings.IMAGE_FORMATS[self.image_format]['attributes']
+        )
+        self.timings = {
+            'read': read - start,
+            'convert': converted - read,
+            'write': time.time() - converted,
+        }
+
+    def load(self, in_image, out_image):
+        """Convert and color correct an image to raw pixels.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Unused, nothing is written.
+
+        Returns
+        -------
+        int, int, str, str
+            The width, height, ffmpeg pixel format and raw pixels of the
+            converted image.
+
+        """
+        start = time.time()
+        pixels = self.read(in_image)
+        read = time.time()
+        pixels = to_8_bits(self.transform(pixels))
+        self.timings = {'read': read - start, 'convert': time.time() - read}
+        height, width = pixels.shape[:2]
+        return width, height, 'rgb24', pixels.tostring()
+
+
+class LutBackend(OcioBackend):
+    """Conversion backend applying a baked 3D LUT in the calling thread.
+
+    The color transform is baked once in a LUT cached on disk, images are
+    then color corrected with a vectorized interpolation of the LUT. Faster
+    than the OpenColorIO evaluation at the cost of some precision.
+    """
+
+    def __init__(self, scale=None, image_format=None):
+        """Load the LUT, baking it if it isn't cached yet.
+
+        Parameters
+        ----------
+        scale: float or tuple of int, int or None
+            The factor or the width and height the images are resized to,
+            None to keep their size.
+        image_format: str or None
+            The name of the format the images are written in, the default
+            format if None.
+
+        """
+        self.scale = scale
+        self.image_format = image_format or Settings.DEFAULT_IMAGE_FORMAT
+        self.timings = {}
+        self.lut = load_lut()
+
+    @staticmethod
+    def available():
+        """Return whether the python modules used by the backend exist.
+
+        Returns
+        -------
+        bool
+            True if the backend can be used, OpenColorIO is only needed to
+            bake a LUT that isn't cached.
+
+        """
+        if None in (numpy, oiio):
+            return False
+        return OCIO is not None or os.path.exists(lut_path())
+
+    @staticmethod
+    def identity():
+        """Return what the converted images depend on.
+
+        Returns
+        -------
+        tuple
+            The backend name, the LUT (named after the color transform) and
+            the interpolation.
+
+        """
+        return (
+            Settings.LUT_BACKEND, os.path.basename(lut_path()),
+            Settings.LUT_INTERPOLATION
+        )
+
+    def transform(self, pixels):
+        """Color correct pixels.
+
+        Parameters
+        ----------
+        pixels: numpy.ndarray
+            The height x width x 3 float32 pixels to color correct.
+
+        Returns
+        -------
+        numpy.ndarray
+            The color corrected pixels.
+
+        """
+        return apply_lut(self.lut, pixels, Settings.LUT_INTERPOLATION)
+
+
+class CachedBackend(object):
+    """Conversion backend wrapper reusing the images of a conversion cache.
+
+    Images missing from the cache are converted by the wrapped backend and
+    added to the cache.
+    """
+
+    def __init__(self, backend, cache):
+        """Initialize the backend.
+
+        Parameters
+        ----------
+        backend: object
+            The wrapped backend.
+        cache: ConversionCache
+            The cache.
+
+        """
+        self.backend = backend
+        self.cache = cache
+        self.timings = {}
+
+    def convert(self, in_image, out_image):
+        """Convert and color correct an image.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to the converted image.
+
+        """
+        start = time.time()
+        entry = self.cache.entry(
+            in_image, os.path.splitext(out_image)[1][1:]
+        )
+        if self.cache.fetch(entry):
+            try:
+                link_or_copy(entry, out_image)
+                self.timings = {'cache': time.time() - start}
+                return
+            except (IOError, OSError):
+                # Evicted by another process in the meantime
+                pass
+        fetched = time.time()
+        self.backend.convert(in_image, out_image)
+        stored = time.time()
+        self.cache.store(entry, out_image)
+        self.timings = dict(
+            self.backend.timings,
+            cache=self.backend.timings.get('cache', 0.0) +
+            (fetched - start) + (time.time() - stored)
+        )
+
+    def load(self, in_image, out_image):
+        """Convert and color correct an image to raw pixels.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image to convert.
+        out_image: str
+            Path to a temporary ppm image the backend may use.
+
+        Returns
+        -------
+        int, int, str, str
+            The width, height, ffmpeg pixel format and raw pixels of the
+            converted image.
+
+        """
+        start = time.time()
+        entry = self.cache.entry(in_image, Settings.STREAM_IMAGE_EXTENSION)
+        if self.cache.fetch(entry):
+            try:
+                image = read_ppm(entry)
+                self.timings = {'cache': time.time() - start}
+                return image
+            except (IOError, OSError):
+                # Evicted by another process in the meantime
+                pass
+        fetched = time.time()
+        image = self.backend.load(in_image, out_image)
+        stored = time.time()
+        self.cache.write(entry, ppm_data(image))
+        self.timings = dict(
+            self.backend.timings,
+            cache=self.backend.timings.get('cache', 0.0) +
+            (fetched - start) + (time.time() - stored)
+        )
+        return image
+
+
+class FrameStreamer(threading.Thread):
+    """Thread piping converted images to ffmpeg in frame order.
+
+    Conversion threads hand their images over in any order, they are kept
+    in a reorder buffer until all the images before them are piped. A
+    conversion thread is blocked while its image is more than window()
+    images ahead of the next one to pipe.
+    """
+
+    # Whether the images handed over are raw pixels or image files
+    raw = True
+    # Whether the conversion threads go on after an image failed
+    keep_going = False
+
+    def __init__(self, in_images, build_command):
+        """Initialize the thread.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert, in frame order.
+        build_command: callable
+            Called with the width, height and pixel format of the images to
+            build the ffmpeg command reading raw images from stdin.
+
+        """
+        super(FrameStreamer, self).__init__()
+        self.indices = dict(
+            (in_image, index) for index, in_image in enumerate(in_images)
+        )
+        self.build_command = build_command
+        self.condition = threading.Condition()
+        self.images = {}
+        self.next_index = 0
+        self.image_format = None
+        self.error = None
+        # Duration (in seconds) of the ffmpeg process
+        self.encode_time = None
+
+    def window(self):
+        """Return how many images conversion threads can get ahead.
+
+        Returns
+        -------
+        int
+            The size of the reorder window.
+
+        """
+        return Settings.STREAM_WINDOW
+
+    def command(self, image):
+        """Build the ffmpeg command from the first image.
+
+        Parameters
+        ----------
+        image: tuple of int, int, str, str
+            The width, height, ffmpeg pixel format and raw pixels of the
+            first image.
+
+        Returns
+        -------
+        list of str
+            The command.
+
+        """
+        width, height, pix_fmt, _ = image
+        self.image_format = (width, height, pix_fmt)
+        return self.build_command(width, height, pix_fmt)
+
+    def data(self, index, image):
+        """Return the data to pipe to ffmpeg for an image.
+
+        Parameters
+        ----------
+        index: int
+            The index of the image.
+        image: tuple of int, int, str, str
+            The width, height, ffmpeg pixel format and raw pixels of the
+            image.
+
+        Returns
+        -------
+        str
+            The raw pixels.
+
+        """
+        width, height, pix_fmt, pixels = image
+        if (width, height, pix_fmt) != self.image_format:
+            raise ValueError(
+                'Image {} is {}x{} {}, expected {}x{} {}.'.format(
+                    index, width, height, pix_fmt, *self.image_format
+                )
+            )
+        return pixels
+
+    def put(self, in_image, image):
+        """Add a converted image to the reorder buffer.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the image that was converted.
+        image: object
+            The converted image.
+
+        Raises
+        ------
+        Exception
+            The error that stopped the streaming, the conversion threads
+            stop converting images that won't be piped.
+
+        """
+        index = self.indices[in_image]
+        with self.condition:
+            while (
+                index >= self.next_index + self.window() and
+                self.error is None
+            ):
+                self.condition.wait()
+            if self.error is not None:
+                raise self.error
+            self.images[index] = image
+            self.condition.notify_all()
+
+    def fail(self, error, in_image=None):
+        """Stop streaming because of an error.
+
+        Parameters
+        ----------
+        error: Exception
+            The error that occurred, only the first one is kept.
+        in_image: str or None
+            Path to the image that failed, None if the error isn't tied to
+            an image.
+
+        """
+        with self.condition:
+            if self.error is None:
+                self.error = error
+            self.condition.notify_all()
+
+    def run(self):
+        """Pipe the images to ffmpeg as soon as they are in order."""
+        ffmpeg = None
+        try:
+            for index in xrange(len(self.indices)):
+                with self.condition:
+                    while index not in self.images and self.error is None:
+                        self.condition.wait()
+                    if self.error is not None:
+                        break
+                    image = self.images.pop(index)
+                    self.next_index = index + 1
+                    self.condition.notify_all()
+
+                if ffmpeg is None:
+                    started = time.time()
+                    ffmpeg = subprocess.Popen(
+                        self.command(image), stdin=subprocess.PIPE
+                    )
+                ffmpeg.stdin.write(self.data(index, image))
+        except Exception as error:
+            self.fail(error)
+        finally:
+            if ffmpeg is not None:
+                # Don't let ffmpeg finalize an incomplete video
+                if self.error is not None:
+                    ffmpeg.terminate()
+                ffmpeg.stdin.close()
+                return_code = ffmpeg.wait()
+                self.encode_time = time.time() - started
+                if return_code and self.error is None:
+                    self.fail(subprocess.CalledProcessError(
+                        return_code, Settings.FFMPEG
+                    ))
+
+
+class ImageFileStreamer(FrameStreamer):
+    """Thread piping converted image files to ffmpeg in frame order.
+
+    The image files are read as soon as all the images before them are
+    piped, they are left on disk.
+    """
+
+    raw = False
+
+    def __init__(self, in_images, build_command):
+        """Initialize the thread.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert, in frame order.
+        build_command: callable
+            Called without arguments to build the ffmpeg command reading
+            image files from stdin.
+
+        """
+        super(ImageFileStreamer, self).__init__(in_images, build_command)
+
+    def window(self):
+        """Return how many images conversion threads can get ahead.
+
+        Returns
+        -------
+        int
+            The size of the reorder window.
+
+        """
+        return Settings.PIPELINE_WINDOW
+
+    def command(self, image):
+        """Build the ffmpeg command.
+
+        Parameters
+        ----------
+        image: str
+            Path to the first image.
+
+        Returns
+        -------
+        list of str
+            The command.
+
+        """
+        return self.build_command()
+
+    def data(self, index, image):
+        """Return the data to pipe to ffmpeg for an image.
+
+        Parameters
+        ----------
+        index: int
+            The index of the image.
+        image: str
+            Path to the image.
+
+        Returns
+        -------
+        str
+            The content of the image file.
+
+        """
+        with open(image, 'rb') as image_file:
+            return image_file.read()
+
+
+class ThreadCountTuner(object):
+    """Choose and adapt the number of conversion threads.
+
+    The first threads are sized from the core count and the available
+    memory. The first throughput measure tells how much of a conversion is
+    spent waiting on I/O rather than on CPU, which gives how many threads
+    keep the cores busy. Threads are then added as long as it makes the
+    throughput rise, and the last ones are retired if it made it drop.
+    """
+
+    def __init__(self, image_count):
+        """Initialize the tuner.
+
+        Parameters
+        ----------
+        image_count: int
+            The number of images to convert.
+
+        """
+        self.lock = threading.Lock()
+        self.cores = cpu_count()
+
+        max_count = min(
+            image_count, self.cores * Settings.MAX_THREADS_PER_CORE
+        )
+        memory = available_memory()
+        if memory is not None:
+            max_count = min(max_count, memory // Settings.THREAD_MEMORY)
+        self.max_count = max(1, max_count)
+
+        self.thread_count = min(self.cores, self.max_count)
+        self.settled = False
+        self.retire_count = 0
+        self.image_count = 0
+        self.image_time = 0.0
+        self.last_growth = 0
+        self.last_throughput = None
+        self.last_sample = (time.time(), cpu_time(), 0, 0.0)
+
+    def record(self, duration):
+        """Record the conversion of an image.
+
+        Parameters
+        ----------
+        duration: float
+            The time (in seconds) the conversion took.
+
+        """
+        with self.lock:
+            self.image_count += 1
+            self.image_time += duration
+
+    def should_retire(self):
+        """Return whether the calling thread should stop.
+
+        Returns
+        -------
+        bool
+            True if the thread should stop pulling images.
+
+        """
+        with self.lock:
+            if self.retire_count:
+                self.retire_count -= 1
+                self.thread_count -= 1
+                return True
+        return False
+
+    def update(self):
+        """Measure the throughput since the last call and adapt the threads.
+
+        Returns
+        -------
+        int
+            The number of threads to add.
+
+        """
+        if self.settled:
+            return 0
+
+        now = time.time()
+        used_cpu_time = cpu_time()
+        with self.lock:
+            image_count, image_time = self.image_count, self.image_time
+        last_time, last_cpu_time, last_count, last_image_time = \
+            self.last_sample
+        # Wait for images to be converted to have something to measure
+        if image_count == last_count:
+            return 0
+        self.last_sample = (now, used_cpu_time, image_count, image_time)
+        throughput = (image_count - last_count) / (now - last_time)
+
+        if self.last_throughput is None:
+            # Share of the conversion time a core is actually used, it is
+            # unknown when the children cpu time is not reported (windows)
+            busy_time = image_time - last_image_time
+            cpu_share = 0
+            if busy_time > 0:
+                cpu_share = (used_cpu_time - last_cpu_time) / busy_time
+            if cpu_share > 0:
+                target = int(math.ceil(self.cores / min(cpu_share, 1.0)))
+            else:
+                target = self.thread_count * 2
+        elif throughput > self.last_throughput * (
+            1 + Settings.TUNING_MIN_GAIN
+        ):
+            target = self.thread_count + max(1, self.thread_count // 4)
+        else:
+            # Throughput stopped rising, remove the last added threads if
+            # they made it drop
+            self.settled = True
+            if throughput < self.last_throughput * (
+                1 - Settings.TUNING_MIN_GAIN
+            ):
+                with self.lock:
+                    self.retire_count += self.last_growth
+            return 0
+
+        self.last_throughput = throughput
+        growth = max(0, min(target, self.max_count) - self.thread_count)
+        with self.lock:
+            self.thread_count += growth
+        self.last_growth = growth
+        if not growth:
+            self.settled = True
+        return growth
+
+
+class RunProfile(object):
+    """Timings of the frames, threads and stages of a run.
+
+    The conversion threads record the durations of every frame, the run
+    records the duration of its stages. The report tells whether the time
+    goes to the reads and writes on the file server, to the color
+    correction or to ffmpeg.
+    """
+
+    def __init__(self):
+        """Initialize the profile, the run starts now."""
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.frames = []
+        self.workers = []
+        self.stages = {}
+
+    def frame(self, worker, in_image, start, duration, timings):
+        """Record the conversion of an image.
+
+        Parameters
+        ----------
+        worker: str
+            The name of the thread that converted the image.
+        in_image: str
+            Path to the converted image.
+        start: float
+            The time the conversion started at.
+        duration: float
+            The time (in seconds) the conversion took, retries included.
+        timings: dict
+            The durations (in seconds) of the steps of the conversion, by
+            name (read, convert, write, cache, queue_wait, sink_wait).
+
+        """
+        frame = dict(timings)
+        frame.update({
+            'image': os.path.basename(in_image),
+            'worker': worker,
+            'start': start - self.start_time,
+            'duration': duration,
+        })
+        with self.lock:
+            self.frames.append(frame)
+
+    def worker(self, name, start, end):
+        """Record the lifetime of a conversion thread.
+
+        Parameters
+        ----------
+        name: str
+            The name of the thread.
+        start: float
+            The time the thread started at.
+        end: float
+            The time the thread stopped at.
+
+        """
+        with self.lock:
+            self.workers.append((name, end - start))
+
+    def stage(self, name, duration):
+        """Record the duration of a stage of the run.
+
+        Parameters
+        ----------
+        name: str
+            The name of the stage (convert, encode...).
+        duration: float
+            The time (in seconds) the stage took.
+
+        """
+        with self.lock:
+            self.stages[name] = self.stages.get(name, 0.0) + duration
+
+    def report(self, info=None):
+        """Build the report of the run.
+
+        Parameters
+        ----------
+        info: dict or None
+            The settings of the run, added to the report.
+
+        Returns
+        -------
+        dict
+            The report, serializable to JSON.
+
+        """
+        elapsed = time.time() - self.start_time
+        with self.lock:
+            frames = sorted(self.frames, key=lambda frame: frame['start'])
+            workers = list(self.workers)
+            stages = dict(self.stages)
+
+        busy = {}
+        for frame in frames:
+            busy[frame['worker']] = \
+                busy.get(frame['worker'], 0.0) + frame['duration']
+        worker_reports = [
+            {
+                'name': name,
+                'frames': len([
+                    frame for frame in frames if frame['worker'] == name
+                ]),
+                'elapsed': lifetime,
+                'busy': busy.get(name, 0.0),
+                'utilisation': busy.get(name, 0.0) / max(lifetime, 1e-6),
+            }
+            for name, lifetime in workers
+        ]
+        lifetimes = sum(lifetime for _, lifetime in workers)
+
+        report = dict(info or {})
+        report.update({
+            'frames': len(frames),
+            'elapsed': elapsed,
+            'frames_per_second': len(frames) / max(elapsed, 1e-6),
+            'stages': stages,
+            'utilisation': sum(busy.values()) / max(lifetimes, 1e-6),
+            'workers': worker_reports,
+            'totals': dict(
+                (name, sum(frame.get(name, 0.0) for frame in frames))
+                for name in Settings.PROFILE_TIMINGS
+            ),
+            'per_frame': frames,
+        })
+        return report
+
+    def write(self, path, info=None):
+        """Write the report of the run to a JSON file.
+
+        Parameters
+        ----------
+        path: str
+            Path to the report.
+        info: dict or None
+            The settings of the run, added to the report.
+
+        """
+        with open(path, 'w') as report_file:
+            json.dump(self.report(info), report_file, indent=2, sort_keys=True)
+
+
+def conversion_command(in_image, out_image, scale=None, format_args=None):
+    """Build the command converting and color correcting an image.
+
+    ocioconvert is used to write png images, oiiotool is used to write the
+    ppm images streamed to ffmpeg as it can drop the alpha channel (not
+    supported by the ppm format) and force 8 bits per channel. oiiotool is
+    also used to resize images, before the color correction, and to write
+    images in the other intermediate formats.
+
+    Parameters
+    ----------
+    in_image: str
+        Path to the image to convert.
+    out_image: str
+        Path to the converted image.
+    scale: float or tuple of int, int or None
+        The factor or the width and height the image is resized to, None
+        to keep its size.
+    format_args: list of str or None
+        The oiiotool args setting the output format options, None for the
+        default ocioconvert output.
+
+    Returns
+    -------
+    list of str
+        The command.
+
+    """
+    ppm = out_image.endswith('.{}'.format(Settings.STREAM_IMAGE_EXTENSION))
+    if ppm or scale is not None or format_args is not None:
+        command = [Settings.OIIOTOOL, in_image]
+        if ppm:
+            command += ['--ch', 'R,G,B']
+        if isinstance(scale, tuple):
+            command += ['--resize', '{}x{}'.format(*scale)]
+        elif scale is not None:
+            command += ['--resize', '{:g}%'.format(scale * 100)]
+        return command + [
+            '--colorconvert',
+            Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE,
+        ] + (format_args or []) + [
+            '-d', 'uint8',
+            '-o', out_image
+        ]
+    return [
+        Settings.OCIO_CONVERT,
+        in_image, Settings.OCIO_IN_PROFILE,
+        out_image, Settings.OCIO_OUT_PROFILE
+    ]
+
+
+def read_ppm(path):
+    """Read a binary ppm image.
+
+    Parameters
+    ----------
+    path: str
+        Path to the image.
+
+    Returns
+    -------
+    int, int, str, str
+        The width, height, ffmpeg pixel format and raw pixels of the image.
+
+    """
+    with open(path, 'rb') as ppm:
+        data = ppm.read()
+
+    # Header is made of 4 fields separated by whitespaces or comments
+    fields = []
+    position = 0
+    field_pattern = re.compile(r'(?:\s|#[^\n]*\n)*(\S+)')
+    while len(fields) < 4:
+        match = field_pattern.match(data, position)
+        if not match:
+            raise IOError('Invalid ppm header in {}.'.format(path))
+        fields.append(match.group(1))
+        position = match.end()
+    magic, width, height, max_value = fields
+    if magic != 'P6':
+        raise IOError('{} is not a binary ppm image.'.format(path))
+
+    # A single whitespace separates the header from the pixels
+    pix_fmt = 'rgb24' if int(max_value) < 256 else 'rgb48be'
+    return int(width), int(height), pix_fmt, data[position + 1:]
+
+
+def read_exr_size(path):
+    """Read the size of an exr image from its header.
+
+    Parameters
+    ----------
+    path: str
+        Path to the image.
+
+    Returns
+    -------
+    int, int
+        The width and height of the data window of the image.
+
+    Raises
+    ------
+    IOError
+        If the image can't be read or isn't an exr image.
+
+    """
+    def read_string(exr):
+        """Read a null terminated string of the header."""
+        chars = []
+        while True:
+            char = exr.read(1)
+            if not char:
+                raise struct.error('Truncated header.')
+            if char == '\0':
+                return ''.join(chars)
+            chars.append(char)
+
+    with open(path, 'rb') as exr:
+        try:
+            magic, _ = struct.unpack('<ii', exr.read(8))
+            if magic != 20000630:
+                raise IOError('{} is not an exr image.'.format(path))
+            # Attributes are a name, a type, a size and a value, the header
+            # ends with an empty name
+            while True:
+                name = read_string(exr)
+                if not name:
+                    break
+                read_string(exr)
+                size, = struct.unpack('<i', exr.read(4))
+                value = exr.read(size)
+                if name == 'dataWindow':
+                    x_min, y_min, x_max, y_max = struct.unpack('<iiii', value)
+                    return x_max - x_min + 1, y_max - y_min + 1
+        except struct.error:
+            pass
+    raise IOError('Invalid exr header in {}.'.format(path))
+
+
+def ppm_data(image):
+    """Build the content of a binary ppm image.
+
+    Parameters
+    ----------
+    image: tuple of int, int, str, str
+        The width, height, ffmpeg pixel format (rgb24 or rgb48be) and raw
+        pixels of the image.
+
+    Returns
+    -------
+    str
+        The content.
+
+    """
+    width, height, pix_fmt, pixels = image
+    max_value = 255 if pix_fmt == 'rgb24' else 65535
+    return 'P6\n{} {}\n{}\n'.format(width, height, max_value) + pixels
+
+
+def link_or_copy(source, destination):
+    """Hard link a file, copy it when it can't be linked.
+
+    Parameters
+    ----------
+    source: str
+        Path to the file.
+    destination: str
+        Path to the link or copy, replaced if it exists.
+
+    """
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except (AttributeError, OSError):
+        # No hard links on windows or across file systems
+        shutil.copyfile(source, destination)
+
+
+def read_tail(path, size):
+    """Read the end of a file.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+    size: int
+        The number of bytes read.
+
+    Returns
+    -------
+    str
+        The last bytes, the whole content of smaller files.
+
+    """
+    with open(path, 'rb') as tail_file:
+        tail_file.seek(-min(size, os.path.getsize(path)), os.SEEK_END)
+        return tail_file.read(size)
+
+
+def find_duplicates(paths, thread_count):
+    """Find the files with the same content as a previous file.
+
+    Only the files sharing their size with another file are compared, their
+    ends first then their whole content, by a pool of threads. Empty and
+    unreadable files are never duplicates, they are left to fail in the
+    conversion.
+
+    Parameters
+    ----------
+    paths: list of str
+        Paths to the files.
+    thread_count: int
+        The number of threads reading the files.
+
+    Returns
+    -------
+    dict
+        The index of the first file with the same content, by index of the
+        duplicate files.
+
+    """
+    def read_files(read, groups):
+        """Read the files of the groups of several files.
+
+        Parameters
+        ----------
+        read: callable
+            Return the value of a file from its path.
+        groups: dict
+            The indices of the files, by group.
+
+        Returns
+        -------
+        dict
+            The values read, by index of the readable files.
+
+        """
+        queue = Queue.Queue()
+        for indices in groups.values():
+            if len(indices) > 1:
+                for index in indices:
+                    queue.put(index)
+        values = {}
+
+        def read_queued():
+            """Read the queued files until the queue is empty."""
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    values[index] = read(paths[index])
+                except (IOError, OSError):
+                    continue
+
+        threads = [
+            threading.Thread(target=read_queued)
+            for _ in xrange(min(thread_count, queue.qsize()))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return values
+
+    by_size = {}
+    for index, path in enumerate(paths):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        if size:
+            by_size.setdefault(size, []).append(index)
+
+    # Files with another end never have the same content
+    tails = read_files(
+        lambda path: read_tail(path, Settings.DEDUPE_SAMPLE_SIZE), by_size
+    )
+    by_tail = {}
+    for size, indices in by_size.items():
+        for index in indices:
+            if index in tails:
+                by_tail.setdefault((size, tails[index]), []).append(index)
+    digests = read_files(hash_file, by_tail)
+
+    originals = {}
+    duplicates = {}
+    for index in sorted(digests):
+        original = originals.setdefault(digests[index], index)
+        if original != index:
+            duplicates[index] = original
+    return duplicates
+
+
+def read_image(path):
+    """Read the color channels of an image with OpenImageIO.
+
+    Parameters
+    ----------
+    path: str
+        Path to the image.
+
+    Returns
+    -------
+    numpy.ndarray
+        The height x width x 3 float32 pixels.
+
+    """
+    image_input = oiio.ImageInput.open(path)
+    if not image_input:
+        raise IOError('Could not open {}: {}'.format(path, oiio.geterror()))
+    try:
+        spec = image_input.spec()
+        pixels = image_input.read_image(oiio.FLOAT)
+    finally:
+        image_input.close()
+    pixels = numpy.asarray(pixels, dtype=numpy.float32).reshape(
+        spec.height, spec.width, spec.nchannels
+    )
+    # Grayscale images are spread on the 3 color channels
+    if spec.nchannels < 3:
+        return numpy.repeat(pixels[:, :, :1], 3, axis=2)
+    return pixels[:, :, :3]
+
+
+def write_image(path, pixels, attributes=()):
+    """Write 8 bits pixels to an image with OpenImageIO.
+
+    Parameters
+    ----------
+    path: str
+        Path to the image, its extension gives the file format.
+    pixels: numpy.ndarray
+        The height x width x channels uint8 pixels.
+    attributes: list of tuple of str, object
+        The names and values of the spec attributes (compression...).
+
+    """
+    height, width, channels = pixels.shape
+    spec = oiio.ImageSpec(width, height, channels, oiio.UINT8)
+    for name, value in attributes:
+        spec.attribute(name, value)
+    image_output = oiio.ImageOutput.create(path)
+    if not image_output or not image_output.open(path, spec):
+        raise IOError('Could not write {}: {}'.format(path, oiio.geterror()))
+    try:
+        image_output.write_image(pixels)
+    finally:
+        image_output.close()
+
+
+def to_8_bits(pixels):
+    """Quantize display referred pixels to 8 bits.
+
+    Parameters
+    ----------
+    pixels: numpy.ndarray
+        The float pixels, values outside of [0, 1] are clipped.
+
+    Returns
+    -------
+    numpy.ndarray
+        The uint8 pixels.
+
+    """
+    return (numpy.clip(pixels, 0.0, 1.0) * 255.0 + 0.5).astype(numpy.uint8)
+
+
+def parse_scale(text):
+    """Parse the scale passed to the cli.
+
+    Parameters
+    ----------
+    text: str
+        A fraction (1/2), a factor (0.25) or a size (1920x1080).
+
+    Returns
+    -------
+    float or tuple of int, int or None
+        The factor or the width and height, None for a factor of 1.
+
+    Raises
+    ------
+    ValueError
+        If the text isn't a positive factor or size.
+
+    """
+    match = re.match(r'^([0-9]+)x([0-9]+)$', text)
+    if match:
+        size = (int(match.group(1)), int(match.group(2)))
+        if 0 in size:
+            raise ValueError('Invalid size {}.'.format(text))
+        return size
+    if '/' in text:
+        numerator, denominator = text.split('/', 1)
+        factor = float(numerator) / float(denominator)
+    else:
+        factor = float(text)
+    if not 0.0 < factor < float('inf'):
+        raise ValueError('Invalid factor {}.'.format(text))
+    if factor == 1.0:
+        return None
+    return factor
+
+
+def scaled_size(width, height, scale):
+    """Return the size of a resized image.
+
+    Parameters
+    ----------
+    width: int
+        The width of the image.
+    height: int
+        The height of the image.
+    scale: float or tuple of int, int
+        The factor or the width and height the image is resized to.
+
+    Returns
+    -------
+    int, int
+        The width and height of the resized image.
+
+    """
+    if isinstance(scale, tuple):
+        return scale
+    return (
+        max(1, int(round(width * scale))),
+        max(1, int(round(height * scale)))
+    )
+
+
+def box_filter(in_size, out_size):
+    """Return the taps of a box filter resampling an image axis.
+
+    Every output pixel averages the input pixels its box covers, weighted
+    by how much of them it covers.
+
+    Parameters
+    ----------
+    in_size: int
+        The number of input pixels.
+    out_size: int
+        The number of output pixels.
+
+    Returns
+    -------
+    numpy.ndarray, numpy.ndarray
+        The out_size x taps indices and float32 weights of the input pixels
+        of every output pixel.
+
+    """
+    ratio = float(in_size) / out_size
+    taps = int(math.ceil(ratio)) + 1
+    starts = numpy.arange(out_size) * ratio
+    indices = (
+        numpy.floor(starts).astype(numpy.int64)[:, None] +
+        numpy.arange(taps)[None, :]
+    )
+    covered = (
+        numpy.minimum(indices + 1, starts[:, None] + ratio) -
+        numpy.maximum(indices, starts[:, None])
+    )
+    weights = numpy.clip(covered, 0.0, None) / ratio
+    return (
+        numpy.minimum(indices, in_size - 1),
+        weights.astype(numpy.float32)
+    )
+
+
+def resize_image(pixels, width, height):
+    """Resize pixels with a box filter.
+
+    Parameters
+    ----------
+    pixels: numpy.ndarray
+        The height x width x channels float pixels.
+    width: int
+        The width of the resized image.
+    height: int
+        The height of the resized image.
+
+    Returns
+    -------
+    numpy.ndarray
+        The resized float32 pixels.
+
+    """
+    if pixels.shape[:2] == (height, width):
+        return pixels
+    # Resample the rows, then the columns of the smaller image
+    indices, weights = box_filter(pixels.shape[0], height)
+    rows = numpy.zeros(
+        (height, pixels.shape[1], pixels.shape[2]), dtype=numpy.float32
+    )
+    for tap in xrange(indices.shape[1]):
+        rows += weights[:, tap, None, None] * pixels[indices[:, tap]]
+    indices, weights = box_filter(pixels.shape[1], width)
+    resized = numpy.zeros(
+        (height, width, pixels.shape[2]), dtype=numpy.float32
+    )
+    for tap in xrange(indices.shape[1]):
+        resized += weights[None, :, tap, None] * rows[:, indices[:, tap]]
+    return resized
+
+
+def shaper(pixels):
+    """Map scene linear values on the [0, 1] LUT input range.
+
+    Parameters
+    ----------
+    pixels: numpy.ndarray
+        The scene linear values.
+
+    Returns
+    -------
+    numpy.ndarray
+        The shaped values.
+
+    """
+    offset = Settings.LUT_SHAPER_OFFSET
+    low = numpy.log2(offset)
+    high = numpy.log2(Settings.LUT_SHAPER_MAX + offset)
+    pixels = numpy.clip(pixels, 0.0, Settings.LUT_SHAPER_MAX)
+    return (numpy.log2(pixels + offset) - low) / (high - low)
+
+
+def inverse_shaper(values):
+    """Map values of the [0, 1] LUT input range back to scene linear values.
+
+    Parameters
+    ----------
+    values: numpy.ndarray
+        The shaped values.
+
+    Returns
+    -------
+    numpy.ndarray
+        The scene linear values.
+
+    """
+    offset = Settings.LUT_SHAPER_OFFSET
+    low = numpy.log2(offset)
+    high = numpy.log2(Settings.LUT_SHAPER_MAX + offset)
+    return numpy.exp2(values * (high - low) + low) - offset
+
+
+def config_time():
+    """Return the modification time of the OCIO config.
+
+    Returns
+    -------
+    float or None
+        The time, None if the config can't be reached.
+
+    """
+    try:
+        return os.path.getmtime(Settings.OCIO_CONFIG)
+    except OSError:
+        return None
+
+
+def lut_path():
+    """Return the path to the cached LUT of the current color settings.
+
+    The name of the file is a hash of the OCIO config path and
+    modification time, the color profiles and the LUT settings.
+
+    Returns
+    -------
+    str
+        The path.
+
+    """
+    key = repr((
+        Settings.OCIO_CONFIG, config_time(),
+        Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE,
+        Settings.LUT_SIZE, Settings.LUT_SHAPER_MAX, Settings.LUT_SHAPER_OFFSET
+    ))
+    return os.path.join(
+        Settings.LUT_FOLDER,
+        '{}.npy'.format(hashlib.sha1(key).hexdigest())
+    )
+
+
+def bake_lut():
+    """Evaluate the color transform on the LUT lattice with OpenColorIO.
+
+    Returns
+    -------
+    numpy.ndarray
+        The size x size x size x 3 float32 LUT, indexed by the shaped red,
+        green and blue values.
+
+    """
+    size = Settings.LUT_SIZE
+    axis = numpy.linspace(0.0, 1.0, size).astype(numpy.float32)
+    red, green, blue = numpy.meshgrid(axis, axis, axis, indexing='ij')
+    lattice = inverse_shaper(numpy.stack([red, green, blue], axis=-1))
+    pixels = OcioBackend().transform(lattice.reshape(-1, 1, 3))
+    return numpy.asarray(pixels, dtype=numpy.float32).reshape(
+        size, size, size, 3
+    )
+
+
+# LUTs loaded by the process, shared by the conversion threads
+_LUTS = {}
+_LUTS_LOCK = threading.Lock()
+
+
+def load_lut():
+    """Load the LUT of the current color settings.
+
+    The LUT is baked and cached on disk the first time.
+
+    Returns
+    -------
+    numpy.ndarray
+        The size x size x size x 3 float32 LUT.
+
+    """
+    path = lut_path()
+    with _LUTS_LOCK:
+        if path not in _LUTS:
+            if os.path.exists(path):
+                _LUTS[path] = numpy.load(path)
+            else:
+                lut = bake_lut()
+                if not os.path.exists(Settings.LUT_FOLDER):
+                    os.makedirs(Settings.LUT_FOLDER)
+                # Write aside and rename so other processes never read a
+                # partial LUT
+                handle, temp_path = tempfile.mkstemp(
+                    dir=Settings.LUT_FOLDER, suffix='.npy'
+                )
+                with os.fdopen(handle, 'wb') as temp_file:
+                    numpy.save(temp_file, lut)
+                try:
+                    os.rename(temp_path, path)
+                except OSError:
+                    # Already cached by another process (windows)
+                    os.remove(temp_path)
+                _LUTS[path] = lut
+        return _LUTS[path]
+
+
+# Color processors built by the process, shared by the conversion threads
+_PROCESSORS = {}
+_PROCESSORS_LOCK = threading.Lock()
+
+
+def load_processor():
+    """Return the OpenColorIO processor of the current color settings.
+
+    The config is read the first time, and again once it is modified.
+
+    Returns
+    -------
+    PyOpenColorIO.Processor or PyOpenColorIO.CPUProcessor, bool
+        The processor applied to the pixels, and whether it is applied in
+        place on arrays (OpenColorIO 2) or to flat lists (OpenColorIO 1).
+
+    """
+    key = (
+        Settings.OCIO_CONFIG, config_time(),
+        Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE
+    )
+    with _PROCESSORS_LOCK:
+        if key not in _PROCESSORS:
+            config = OCIO.Config.CreateFromFile(Settings.OCIO_CONFIG)
+            processor = config.getProcessor(
+                Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE
+            )
+            # OpenColorIO 2 applies the processor with a dedicated object
+            if hasattr(processor, 'getDefaultCPUProcessor'):
+                _PROCESSORS[key] = (processor.getDefaultCPUProcessor(), True)
+            else:
+                _PROCESSORS[key] = (processor, False)
+        return _PROCESSORS[key]
+
+
+def apply_lut(lut, pixels, interpolation='tetrahedral'):
+    """Color correct pixels with a 3D LUT.
+
+    Parameters
+    ----------
+    lut: numpy.ndarray
+        The size x size x size x 3 LUT, indexed by the shaped red, green
+        and blue values.
+    pixels: numpy.ndarray
+        The ... x 3 scene linear pixels.
+    interpolation: str
+        'tetrahedral' or 'trilinear'.
+
+    Returns
+    -------
+    numpy.ndarray
+        The float32 color corrected pixels, same shape as the input.
+
+    """
+    size = lut.shape[0]
+    flat_lut = lut.reshape(-1, 3)
+    flat_pixels = numpy.asarray(pixels, dtype=numpy.float32).reshape(-1, 3)
+    result = numpy.empty_like(flat_pixels)
+    # Offsets between neighbour lattice points along each axis
+    strides = numpy.array([size * size, size, 1])
+
+    for start in xrange(0, len(flat_pixels), Settings.LUT_CHUNK_SIZE):
+        chunk = flat_pixels[start:start + Settings.LUT_CHUNK_SIZE]
+        position = shaper(chunk) * (size - 1)
+        corner = numpy.minimum(position.astype(numpy.intp), size - 2)
+        fraction = position - corner
+        base = corner.dot(strides)
+
+        if interpolation == 'trilinear':
+            values = numpy.zeros_like(chunk)
+            for offset in numpy.ndindex(2, 2, 2):
+                offset = numpy.array(offset)
+                weight = numpy.prod(
+                    numpy.where(offset, fraction, 1.0 - fraction), axis=1
+                )
+                values += (
+                    weight[:, None] * flat_lut[base + offset.dot(strides)]
+                )
+        elif interpolation == 'tetrahedral':
+            # Walk from the lower to the upper corner of the cell along the
+            # axes sorted by decreasing fraction, the weights are the
+            # differences between the sorted fractions
+            order = numpy.argsort(-fraction, axis=1)
+            sorted_fraction = numpy.take_along_axis(fraction, order, axis=1)
+            first = base + strides[order[:, 0]]
+            second = first + strides[order[:, 1]]
+            last = base + strides.sum()
+            values = (
+                (1.0 - sorted_fraction[:, 0])[:, None] * flat_lut[base] +
+                (sorted_fraction[:, 0] - sorted_fraction[:, 1])[:, None] *
+                flat_lut[first] +
+                (sorted_fraction[:, 1] - sorted_fraction[:, 2])[:, None] *
+                flat_lut[second] +
+                sorted_fraction[:, 2][:, None] * flat_lut[last]
+            )
+        else:
+            raise ValueError(
+                'Unknown interpolation {}.'.format(interpolation)
+            )
+        result[start:start + len(chunk)] = values
+
+    return result.reshape(numpy.shape(pixels))
+
+
+def frame_number(image):
+    """Return the frame number of an image.
+
+    Parameters
+    ----------
+    image: str
+        Path to an image named filename.frame_num.extension.
+
+    Returns
+    -------
+    str
+        The frame number.
+
+    """
+    return os.path.splitext(os.path.basename(image))[0].split('.')[-1]
+
+
+def setup_environment():
+    """Update the environment for ocio.
+
+    Called by every tool instance, the PATH is extended only once.
+    """
+    if 'windows' in platform.system().lower():
+        if Settings.OCIO_LIB not in os.environ['PATH']:
+            os.environ['PATH'] += Settings.OCIO_LIB
+    else:
+        os.environ['LD_LIBRARY_PATH'] = Settings.OCIO_LIB
+    os.environ["OCIO"] = Settings.OCIO_CONFIG
+
+
+def cpu_count():
+    """Return the number of cores of the machine.
+
+    Returns
+    -------
+    int
+        The number of cores, 1 if it can't be found.
+
+    """
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def available_memory():
+    """Return the memory available to start new processes.
+
+    Returns
+    -------
+    int or None
+        The available memory in bytes, None if it can't be found.
+
+    """
+    if 'windows' in platform.system().lower():
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(
+            ctypes.byref(status)
+        ):
+            return None
+        return status.ullAvailPhys
+
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    return None
+
+
+def free_space(folder):
+    """Return the space available to the user on the disk of a folder.
+
+    Parameters
+    ----------
+    folder: str
+        Path to an existing folder.
+
+    Returns
+    -------
+    int or None
+        The free space in bytes, None if it can't be found.
+
+    """
+    if 'windows' in platform.system().lower():
+        free = ctypes.c_ulonglong(0)
+        if not ctypes.windll.kernel32.GetDiskFreeSpaceExW(
+            ctypes.c_wchar_p(folder), ctypes.byref(free), None, None
+        ):
+            return None
+        return free.value
+    if not hasattr(os, 'statvfs'):
+        return None
+    stats = os.statvfs(folder)
+    return stats.f_bavail * stats.f_frsize
+
+
+def cpu_time():
+    """Return the cpu time used by the process and its terminated children.
+
+    Returns
+    -------
+    float
+        The user and system time in seconds, the children time is always 0
+        on windows.
+
+    """
+    return sum(os.times()[:4])
+
+
+def ffmpeg_draw_box(
+    text, bold=False, size=10, pos=(0, 0), anchor=('right', 'top'), extra=[]
+):
+    """Draw a box on the frame with the given data.
+
+    Parameters
+    ----------
+    text: str
+        The text to put in the box
+    bold: bool
+        Whether the text should be in bold font.
+    size: int
+        The size of the text's font.
+    pos: tuple of 2 int
+        The position relative to the anchor.
+    anchor: tuple of 2 str
+        Where to place the text box relative to the image. Valid values are
+        'left' or 'right' for the first value and 'top' or 'bottom' for the
+        second value.
+    extra: list of str
+        Extra flags to pass to the command.
+
+    """
+    x = '{}{:+.0f}'.format(
+        '' if anchor[0] == 'left' else 'w-text_w',
+        pos[0] if anchor[0] == 'left' else pos[0] * -1
+    )
+    y = '{}{:+.0f}'.format(
+        '' if anchor[1] == 'top' else 'h-text_h',
+        pos[1] if anchor[1] == 'top' else pos[1] * -1
+    )
+    return (
+        "drawtext="
+        "fontfile={font}:"
+        "fontcolor=white:"
+        "fontsize={size}:"
+        "box=1:"
+        "boxcolor=DarkGray:"
+        "boxborderw=5:"
+        "{extra}"
+        "text='{text}':"
+        "x={x}:"
+        "y={y}"
+    ).format(
+        font=Settings.FONT_BOLD if bold else Settings.FONT_NORMAL,
+        size=size,
+        extra=':'.join(extra) + ':' if extra else '',
+        text=text,
+        x=x, y=y,
+    )
+
+
+class EncodeMovieFx(object):
+    """Convert a folder of images to a color corrected video."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'encodeMovieFx.py '
+        'path/to/first_file_to_convert '
+        '[-c/--thread_count thread_count|auto] '
+        '[-p/--production_name production_name] '
+        '[-s/--stream] '
+        '[-P/--pipeline] '
+        '[-S/--scale 1/2|1/4|factor|widthxheight] '
+        '[-o/--outputs mov,mp4,poster,contact_sheet] '
+        '[-g/--segments segment_count|auto] '
+        '[-t/--scratch folder|network] '
+        '[-f/--image_format png|png0|ppm|tiff] '
+        '[-r/--profile] '
+        '[-j/--resume] '
+        '[-d/--distribute [host:]port] '
+        '[-w/--watch last_frame] '
+        '[-b/--backend ocio|ocioconvert|lut] '
+        '[-n/--no_cache] '
+        '[-x/--store folder] '
+        '[-D/--dedupe] '
+        '[-H/--hash] '
+        '[-h]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        setup_environment()
+
+        self.args = args
+        self.path = None
+        self.thread_count = Settings.DEFAULT_THREAD_COUNT
+        self.production_name = Settings.DEFAULT_PROD_NAME
+        self.stream = False
+        self.pipeline = False
+        self.scale = None
+        self.outputs = list(Settings.DEFAULT_OUTPUTS)
+        self.segment_count = Settings.DEFAULT_SEGMENT_COUNT
+        # The local scratch folder if None
+        self.scratch_folder = None
+        self.image_format = Settings.DEFAULT_IMAGE_FORMAT
+        self.backend = Settings.DEFAULT_BACKEND
+        self.use_cache = True
+        self.hash_content = False
+        self.store_folder = Settings.STORE_FOLDER
+        # Hashing every image of the same size is slow over the network
+        self.dedupe = False
+        self.duplicate_count = 0
+        self.profile = None
+        self.resume = False
+        self.journal = None
+        self.coordinator_address = None
+        self.watch_last = None
+        self.in_folder = None
+        self.out_folder = None
+        self.filename = None
+        self.current_frame = None
+        self.sequence = None
+        self.seq_shot = Settings.DEFAULT_SEQ_SHOT
+        self.title = None
+        self.out_filepath = None
+        self.frame_count = None
+        self.slate_path = None
+        # USERNAME is unset on the linux farm nodes
+        self.username = os.environ.get('USERNAME') or getpass.getuser()
+
+    def run(self):
+        """Parse args and filename, convert images and generate video."""
+        # Parse command line
+        self.parse_args()
+        # Parse input filename
+        self.parse_filename()
+
+        try:
+            self.encode()
+        except Settings.RUN_ERRORS as error:
+            print 'Encoding failed: {}'.format(error)
+            sys.exit(1)
+
+        # Open the video
+        if self.out_filepath:
+            if 'windows' in platform.system().lower():
+                os.startfile(self.out_filepath)
+            else:
+                subprocess.check_output(
+                    [Settings.LINUX_OPEN_FILE, self.out_filepath]
+                )
+
+    def encode(self):
+        """Convert images and generate video from the parsed args.
+
+        Raises
+        ------
+        Exception
+            The error that stopped the encoding, one of Settings.RUN_ERRORS
+            unless something unexpected happened.
+
+        """
+        if self.profile:
+            # Start timing once nothing more is asked to the user
+            self.profile = RunProfile()
+        succeeded = False
+        try:
+            if self.stream:
+                # Convert input images and generate video at once
+                self.run_stage('stream', self.stream_video)
+            elif self.pipeline:
+                # Generate video while converting input images
+                self.run_stage('pipeline', self.pipeline_video)
+            else:
+                # Convert input images, no video is generated if any fails
+                self.run_stage(
+                    'convert',
+                    self.convert_images if self.watch_last is None
+                    else self.watch_images
+                )
+                # Generate video
+                self.run_stage('encode', self.generate_video)
+            succeeded = True
+        finally:
+            # Delete temp folder, a resumable job keeps its converted images
+            # until the video is generated
+            if succeeded or not self.resume:
+                self.remove_out_folder()
+            if self.profile:
+                self.write_profile()
+
+    def run_stage(self, name, stage):
+        """Run a stage of the run, timed if the run is profiled.
+
+        Parameters
+        ----------
+        name: str
+            The name of the stage in the profile.
+        stage: callable
+            Runs the stage.
+
+        """
+        start = time.time()
+        try:
+            stage()
+        finally:
+            if self.profile:
+                self.profile.stage(name, time.time() - start)
+
+    def write_profile(self):
+        """Write the profile report of the run next to the movie."""
+        path = '{}{}'.format(
+            os.path.splitext(self.get_out_filepath())[0],
+            Settings.PROFILE_SUFFIX
+        )
+        try:
+            self.profile.write(path, {
+                'movie': self.out_filepath,
+                'backend': self.backend,
+                'thread_count': self.thread_count,
+                'mode': (
+                    'stream' if self.stream else
+                    'pipeline' if self.pipeline else 'convert'
+                ),
+                'scale': self.scale,
+                'image_format': self.image_format,
+                'outputs': self.outputs,
+                'duplicate_count': self.duplicate_count,
+            })
+        except (IOError, OSError) as error:
+            print 'Cannot write profile {}: {}'.format(path, error)
+            return
+        print 'Profile written to {}'.format(path)
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        Sets the path, thread_count, production_name, stream, pipeline,
+        scale, outputs, segment_count, scratch_folder, image_format, backend,
+        use_cache, hash_content, store_folder, dedupe, profile, resume,
+        coordinator_address and watch_last vars.
+        """
+        if not self.args:
+            print EncodeMovieFx.cli_usage
+            sys.exit(2)
+
+        # Flags followed by an argument and flags used alone
+        arg_flags = [
+            Settings.THREAD_COUNT_FLAG,
+            Settings.PROD_NAME_FLAG,
+            Settings.BACKEND_FLAG,
+            Settings.SCALE_FLAG,
+            Settings.OUTPUTS_FLAG,
+            Settings.SEGMENTS_FLAG,
+            Settings.SCRATCH_FLAG,
+            Settings.IMAGE_FORMAT_FLAG,
+            Settings.DISTRIBUTE_FLAG,
+            Settings.WATCH_FLAG,
+            Settings.STORE_FLAG,
+        ]
+        switch_flags = [
+            Settings.STREAM_FLAG,
+            Settings.PIPELINE_FLAG,
+            Settings.NO_CACHE_FLAG,
+            Settings.HASH_FLAG,
+            Settings.PROFILE_FLAG,
+            Settings.RESUME_FLAG,
+            Settings.DEDUPE_FLAG,
+        ]
+
+        self.path = self.args[0]
+        if len(self.args) > 1:
+            try:
+                options, args = getopt.getopt(
+                    self.args[1:],
+                    Settings.HELP_FLAG[1:] + ''.join(
+                        ['{}:'.format(flag[0][1:]) for flag in arg_flags] +
+                        [flag[0][1:] for flag in switch_flags]
+                    ),
+                    ['{}='.format(flag[1][2:]) for flag in arg_flags] +
+                    [flag[1][2:] for flag in switch_flags]
+                )
+            except getopt.GetoptError:
+                print EncodeMovieFx.cli_usage
+                sys.exit(2)
+
+            for flag, argument in options:
+                if flag == Settings.HELP_FLAG:
+                    print EncodeMovieFx.cli_usage
+                    sys.exit()
+                elif flag in Settings.THREAD_COUNT_FLAG:
+                    if argument == Settings.AUTO_THREAD_COUNT:
+                        self.thread_count = argument
+                        continue
+                    try:
+                        self.thread_count = int(argument)
+                    except ValueError:
+                        print EncodeMovieFx.cli_usage
+                        sys.exit(2)
+                elif flag in Settings.PROD_NAME_FLAG:
+                    self.production_name = argument
+                elif flag in Settings.STREAM_FLAG:
+                    self.stream = True
+                elif flag in Settings.PIPELINE_FLAG:
+                    self.pipeline = True
+                elif flag in Settings.IMAGE_FORMAT_FLAG:
+                    self.image_format = argument
+                elif flag in Settings.SCRATCH_FLAG:
+                    self.scratch_folder = argument
+                elif flag in Settings.SEGMENTS_FLAG:
+                    if argument == Settings.AUTO_SEGMENT_COUNT:
+                        self.segment_count = cpu_count()
+                        continue
+                    try:
+                        self.segment_count = int(argument)
+                    except ValueError:
+                        print EncodeMovieFx.cli_usage
+                        sys.exit(2)
+                elif flag in Settings.OUTPUTS_FLAG:
+                    outputs = [
+                        output.strip() for output in argument.split(',')
+                    ]
+                    # Drop repeated outputs, they would write the same file
+                    self.outputs = sorted(set(outputs), key=outputs.index)
+                elif flag in Settings.SCALE_FLAG:
+                    try:
+                        self.scale = parse_scale(argument)
+                    except ValueError:
+                        print EncodeMovieFx.cli_usage
+                        sys.exit(2)
+                elif flag in Settings.BACKEND_FLAG:
+                    self.backend = argument
+                elif flag in Settings.NO_CACHE_FLAG:
+                    self.use_cache = False
+                elif flag in Settings.HASH_FLAG:
+                    self.hash_content = True
+                elif flag in Settings.DEDUPE_FLAG:
+                    self.dedupe = True
+                elif flag in Settings.STORE_FLAG:
+                    self.store_folder = argument
+                elif flag in Settings.PROFILE_FLAG:
+                    self.profile = RunProfile()
+                elif flag in Settings.RESUME_FLAG:
+                    self.resume = True
+                elif flag in Settings.DISTRIBUTE_FLAG:
+                    try:
+                        self.coordinator_address = parse_address(argument)
+                    except ValueError:
+                        print EncodeMovieFx.cli_usage
+                        sys.exit(2)
+                elif flag in Settings.WATCH_FLAG:
+                    try:
+                        self.watch_last = int(argument)
+                    except ValueError:
+                        print EncodeMovieFx.cli_usage
+                        sys.exit(2)
+
+        try:
+            self.check_settings()
+        except ValueError:
+            print EncodeMovieFx.cli_usage
+            sys.exit(2)
+
+    def check_settings(self):
+        """Check the settings of the encoding are valid together.
+
+        Raises
+        ------
+        ValueError
+            If a setting has an unknown value, or modes that can't be
+            combined are.
+
+        """
+        if self.thread_count != Settings.AUTO_THREAD_COUNT and (
+            not isinstance(self.thread_count, int) or self.thread_count < 1
+        ):
+            raise ValueError(
+                'Invalid thread count {}.'.format(self.thread_count)
+            )
+        if not isinstance(self.segment_count, int) or \
+                self.segment_count < 1:
+            raise ValueError(
+                'Invalid segment count {}.'.format(self.segment_count)
+            )
+        if self.image_format not in Settings.IMAGE_FORMATS:
+            raise ValueError(
+                'Unknown image format {}.'.format(self.image_format)
+            )
+        if self.backend not in BACKENDS:
+            raise ValueError('Unknown backend {}.'.format(self.backend))
+        if not self.outputs:
+            raise ValueError('No output to generate.')
+        for output in self.outputs:
+            if output not in Settings.OUTPUTS:
+                raise ValueError('Unknown output {}.'.format(output))
+
+        # Streamed images are converted in process and aren't written, they
+        # can't be skipped by the journal or converted by workers. Watched
+        # images are converted in process as they are rendered
+        if (
+            self.resume or self.coordinator_address or
+            self.watch_last is not None
+        ) and (self.stream or self.pipeline):
+            raise ValueError(
+                'Resume, distribute and watch need the converted images '
+                'written, not streamed.'
+            )
+        if self.coordinator_address and self.watch_last is not None:
+            raise ValueError('Watched images are converted in process.')
+
+    def parse_filename(self):
+        """Parse the given filepath, exit if it is wrongly formatted.
+
+        Sets the in_folder, out_folder, filename, current_frame, seq_shot and
+        title vars.
+        """
+        try:
+            self.read_filename()
+        except ValueError as error:
+            print error
+            sys.exit(1)
+
+    def read_filename(self):
+        """Parse the given filepath.
+
+        Sets the in_folder, out_folder, filename, current_frame, seq_shot and
+        title vars.
+
+        Raises
+        ------
+        ValueError
+            If the file name is wrongly formatted.
+
+        """
+        clean_path = os.path.normpath(os.path.abspath(self.path))
+        # Extract path to the folder
+        self.in_folder, filename = os.path.split(clean_path)
+
+        filename, extension = os.path.splitext(filename)
+        if not re.compile('.+?\.[0-9]{4,4}').match(filename):
+            raise ValueError((
+                'Wrong file name formatting, should be filename.frame_num.{}.'
+            ).format(Settings.IN_IMAGE_EXTENSION))
+        # Extract filename and extension
+        self.filename, self.current_frame = filename.split('.')
+        # Check for correct file extension
+        if extension not in '.{}'.format(Settings.IN_IMAGE_EXTENSION):
+            raise ValueError('Wrong input file type, should be {}.'.format(
+                Settings.IN_IMAGE_EXTENSION
+            ))
+
+        # Get seq and shot info from filename
+        seq_shot_pattern = re.compile("[0-9]{3,}_[0-9]{4,}")
+        result = seq_shot_pattern.findall(self.filename)
+        if result:
+            self.seq_shot = result[0]
+
+        # Get title from filename
+        split_name = self.filename.split('_')
+        if len(split_name) > 2:
+            self.title = split_name[2]
+        # Get title from user when it is masterlayer
+        if not self.title or self.title.lower() in Settings.TITLES_TO_REPLACE:
+            self.title = self.get_title_from_user()
+
+        # Build output folder
+        self.out_folder = self.get_out_folder()
+
+    def get_out_folder(self):
+        """Return the folder the converted images are written to.
+
+        The folder is made in the scratch folder, or next to the input
+        images if the scratch folder is missing space or can't be written
+        to. Its name is unique, concurrent jobs converting the same images
+        don't share it. The folder of a resumable job is named from its
+        settings instead, the folder a previous run left with a journal is
+        used again. The images of resumable jobs, which may be restarted on
+        another host, and of distributed jobs, converted by the workers, are
+        written next to the input images where every host reaches them,
+        unless a scratch folder is given for a resumable job.
+
+        Returns
+        -------
+        str
+            The path, the folder isn't created.
+
+        """
+        if self.resume:
+            job_folder = '{}_{}'.format(self.filename, self.job_key())
+        else:
+            job_folder = '{}_{}'.format(self.filename, uuid.uuid4().hex[:12])
+        network_folder = os.path.normpath(
+            os.path.join(self.in_folder, Settings.TEMP_FOLDER, job_folder)
+        )
+        if self.scratch_folder == Settings.NETWORK_SCRATCH or \
+                self.coordinator_address is not None:
+            return network_folder
+        scratch_root = self.scratch_folder
+        if scratch_root is None:
+            if self.resume:
+                return network_folder
+            scratch_root = Settings.SCRATCH_FOLDER
+        scratch_folder = os.path.normpath(
+            os.path.join(scratch_root, job_folder)
+        )
+        if self.resume:
+            for folder in [scratch_folder, network_folder]:
+                if os.path.exists(
+                    os.path.join(folder, Settings.JOURNAL_NAME)
+                ):
+                    return folder
+
+        # Images to convert, the listing is cached for get_image_lists
+        try:
+            sequence = find_sequence(
+                self.in_folder, self.filename, Settings.IN_IMAGE_EXTENSION
+            )
+        except OSError:
+            sequence = None
+        image_count = len(sequence.frames) if sequence else 0
+        if self.watch_last is not None:
+            # The watched images aren't rendered yet
+            image_count = max(
+                image_count, self.watch_last - int(self.current_frame) + 1
+            )
+        image_size = Settings.SCRATCH_IMAGE_SIZE
+        if isinstance(self.scale, float):
+            image_size *= self.scale ** 2
+        needed = int(image_count * image_size) + Settings.SCRATCH_MIN_FREE
+
+        try:
+            if not os.path.exists(scratch_root):
+                os.makedirs(scratch_root)
+            free = free_space(scratch_root)
+        except OSError as error:
+            print 'Cannot use scratch folder {} ({}), using {}.'.format(
+                scratch_root, error, network_folder
+            )
+            return network_folder
+        if free is not None and free < needed:
+            print (
+                'Not enough space in scratch folder {} ({} MB free, {} MB '
+                'needed), using {}.'
+            ).format(
+                scratch_root, free // 1024 ** 2, needed // 1024 ** 2,
+                network_folder
+            )
+            return network_folder
+        return scratch_folder
+
+    def job_key(self):
+        """Return the key of the settings the converted images depend on.
+
+        Returns
+        -------
+        str
+            A hash of the input sequence and conversion settings, the color
+            transform (OCIO config, its modification time and the color
+            profiles) included.
+
+        """
+        settings = (
+            self.in_folder, self.filename, BACKENDS[self.backend].identity(),
+            self.scale, self.image_format,
+        )
+        return hashlib.sha1(repr(settings)).hexdigest()[
+            :Settings.JOB_KEY_LENGTH
+        ]
+
+    def remove_out_folder(self):
+        """Delete the folder the converted images were written to.
+
+        The network TEMP folder is deleted too once no job uses it.
+        """
+        shutil.rmtree(self.out_folder, ignore_errors=True)
+        self.slate_path = None
+        parent = os.path.dirname(self.out_folder)
+        if os.path.basename(parent) == Settings.TEMP_FOLDER:
+            try:
+                os.rmdir(parent)
+            except OSError:
+                # Used by another job
+                pass
+
+    def get_title_from_user(self):
+        """Get title from raw input.
+
+        Returns
+        -------
+        str
+            The title.
+
+        """
+        return raw_input("Contents : ").strip()
 
     def get_image_lists(self):
         """Build and return lists of input and output images.
 
+        Only the images of the input sequence are listed, the other
+        sequences of the folder are left out, and the frames after the last
+        watched one. Sets the sequence var.
+
+        Returns
+        -------
+        list, list
+            The paths to input and output images, in frame order.
+
+        """
+        self.sequence = find_sequence(
+            self.in_folder, self.filename, Settings.IN_IMAGE_EXTENSION
+        )
+        if self.sequence is not None and self.watch_last is not None:
+            # The render may already be writing the frames of the next job
+            self.sequence = self.sequence.until(self.watch_last)
+        if self.sequence is None:
+            return [], []
+
+        for frame in self.sequence.duplicates:
+            print 'Skipping {}, frame {} is already in the sequence.'.format(
+                frame.name, frame.frame
+            )
+        for first, last in self.sequence.gaps():
+            print 'Frames {} to {} are missing.'.format(first, last)
+
+        in_images = []
+        out_images = []
+        for frame in self.sequence.frames:
+            in_images.append(os.path.normpath(
+                os.path.join(self.in_folder, frame.name)
+            ))
+            out_images.append(self.out_image(frame.frame))
+        return in_images, out_images
+
+    def out_image(self, frame):
+        """Return the path to a converted image.
+
+        Parameters
+        ----------
+        frame: int
+            The frame number.
+
+        Returns
+        -------
+        str
+            The path, in the output folder, padded as the current frame.
+
+        """
+        return os.path.normpath(os.path.join(
+            self.out_folder,
+            '{}.{}.{}'.format(
+                self.filename,
+                str(frame).zfill(len(self.current_frame)),
+                Settings.IMAGE_FORMATS[self.image_format]['extension']
+            )
+        ))
+
+    def fill_gaps(self):
+        """Hold the previous converted image over the missing frames.
+
+        ffmpeg stops reading an image sequence at the first missing frame.
+        """
+        if self.sequence is None:
+            return
+        frames = set(frame.frame for frame in self.sequence.frames)
+        previous = None
+        for frame in xrange(int(self.current_frame), self.sequence.last + 1):
+            if frame in frames:
+                previous = self.out_image(frame)
+            elif previous is not None:
+                link_or_copy(previous, self.out_image(frame))
+
+    def convert_images(self):
+        """Convert input exr image to color corrected png images."""
+        # Get image lists
+        in_images, out_images = self.get_image_lists()
+
+        # Create output folder if it doesn't exist
+        if not os.path.exists(self.out_folder):
+            os.makedirs(self.out_folder)
+
+        self.convert_frames(in_images, out_images)
+
+    def watch_images(self):
+        """Convert the input images as they are rendered.
+
+        The images are converted once completely written, the conversion
+        ends once all the frames from the current one to the last watched
+        one are converted.
+
+        Raises
+        ------
+        ValueError
+            If the last watched frame is before the current one.
+        IOError
+            If no new image is written for Settings.WATCH_TIMEOUT.
+
+        """
+        first = int(self.current_frame)
+        if self.watch_last < first:
+            raise ValueError('The last frame {} is before frame {}.'.format(
+                self.watch_last, first
+            ))
+        # Create output folder if it doesn't exist
+        if not os.path.exists(self.out_folder):
+            os.makedirs(self.out_folder)
+
+        watcher = FolderWatcher(
+            self.in_folder, self.filename, Settings.IN_IMAGE_EXTENSION,
+            Settings.WATCH_STABLE_DELAY, Settings.WATCH_POLL_INTERVAL
+        )
+        remaining = set(xrange(first, self.watch_last + 1))
+        print 'Watching {} for frames {} to {}.'.format(
+            self.in_folder, first, self.watch_last
+        )
+        try:
+            last_image = time.time()
+            while remaining:
+                frames = [
+                    frame for frame in watcher.complete_images()
+                    if frame.frame in remaining
+                ]
+                if not frames:
+                    if time.time() - last_image > Settings.WATCH_TIMEOUT:
+                        raise IOError(
+                            'No new image for {:g}s, {} frames missing.'
+                            .format(Settings.WATCH_TIMEOUT, len(remaining))
+                        )
+                    watcher.wait()
+                    continue
+                last_image = time.time()
+                self.convert_frames(
+                    [
+                        os.path.normpath(
+                            os.path.join(self.in_folder, frame.name)
+                        ) for frame in frames
+                    ],
+                    [self.out_image(frame.frame) for frame in frames]
+                )
+                remaining.difference_update(frame.frame for frame in frames)
+                print '{} of {} frames converted.'.format(
+                    self.watch_last - first + 1 - len(remaining),
+                    self.watch_last - first + 1
+                )
+        finally:
+            watcher.close()
+
+        # The sequence is complete, list it for the encoding
+        self.get_image_lists()
+
+    def convert_frames(self, in_images, out_images):
+        """Convert images to the output folder.
+
+        A resumable job skips the images its journal lists as converted and
+        records the images it converts in it. Sets the journal var. The
+        images of a distributed job are converted by the workers. When
+        deduping, images with the same content as another one, held frames,
+        are converted once and linked.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert.
+        out_images: list of str
+            Paths to the converted images.
+
+        """
+        sink = None
+        if self.resume:
+            if self.journal is None:
+                self.journal = FrameJournal(
+                    os.path.join(self.out_folder, Settings.JOURNAL_NAME)
+                )
+            missing = self.journal.missing(in_images, out_images)
+            print '{} of {} images converted by a previous run.'.format(
+                len(in_images) - len(missing), len(in_images)
+            )
+            in_images = [in_image for in_image, _ in missing]
+            out_images = [out_image for _, out_image in missing]
+            sink = self.journal
+            if not in_images:
+                return
+
+        # The converted images the duplicates are linked to
+        duplicates = []
+        if self.dedupe:
+            originals = find_duplicates(
+                in_images, Settings.DEDUPE_THREAD_COUNT
+            )
+            duplicates = [
+                (in_images[index], out_images[original], out_images[index])
+                for index, original in sorted(originals.items())
+            ]
+            in_images, out_images = [
+                [image for index, image in enumerate(images)
+                 if index not in originals]
+                for images in (in_images, out_images)
+            ]
+
+        if self.coordinator_address is not None:
+            self.distribute_images(in_images, out_images, sink)
+        else:
+            self.run_converters(in_images, out_images, sink)
+
+        for in_image, original, out_image in duplicates:
+            link_or_copy(original, out_image)
+            if sink is not None:
+                sink.put(in_image, out_image)
+        if duplicates:
+            self.duplicate_count += len(duplicates)
+            print '{} duplicate images linked instead of converted.'.format(
+                len(duplicates)
+            )
+
+    def get_backend(self):
+        """Return the conversion backend to use.
+
+        Falls back to ocioconvert when the python modules used by the in
+        process backends are missing.
+
+        Returns
+        -------
+        class
+            The backend class.
+
+        """
+        backend = BACKENDS[self.backend]
+        if not getattr(backend, 'available', lambda: True)():
+            print (
+                'Python modules missing for the {} backend, using {}.'
+            ).format(self.backend, Settings.OCIO_CONVERT_BACKEND)
+            backend = BACKENDS[Settings.OCIO_CONVERT_BACKEND]
+        return backend
+
+    def run_converters(self, in_images, out_images, sink=None):
+        """Convert images and wait for the conversion to finish.
+
+        The images are put in a queue shared by all the conversion threads,
+        each thread pulls the next image as soon as it is done with the
+        previous one so a slow image doesn't hold back the others. Images
+        already converted by a previous run are taken from the conversion
+        cache, or from the shared store if another user converted them.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert.
+        out_images: list of str
+            Paths to the converted images.
+        sink: FrameStreamer, FrameJournal or None
+            The object the converted images are handed to.
+
+        Raises
+        ------
+        Exception
+            The first error that stopped the conversion, the outstanding
+            images are left unconverted. Not raised if the sink keeps going
+            after errors.
+
+        """
+        # Fill the queue, the None stopping the threads are added when the
+        # threads are started
+        queue = Queue.Queue()
+        for in_image, out_image in zip(in_images, out_images):
+            queue.put((in_image, out_image))
+
+        self.run_queue(queue, len(in_images), sink)
+
+    def run_queue(self, queue, image_count, sink=None):
+        """Convert the images of a queue and wait for the threads to finish.
+
+        Parameters
+        ----------
+        queue: Queue.Queue or CoordinatorClient
+            The queue the (input image, output image) path pairs are pulled
+            from, a None is put in it for every thread started.
+        image_count: int
+            The number of images to convert, bounds the thread count.
+        sink: FrameStreamer, FrameJournal, CoordinatorClient or None
+            The object the converted images are handed to.
+
+        Raises
+        ------
+        Exception
+            The first error that stopped the conversion. Not raised if the
+            sink keeps going after errors.
+
+        """
+        # Size the threads from the machine in auto mode, don't start more
+        # threads than there are images to convert otherwise
+        tuner = None
+        if self.thread_count == Settings.AUTO_THREAD_COUNT:
+            tuner = ThreadCountTuner(image_count)
+            thread_count = tuner.thread_count
+        else:
+            thread_count = max(1, min(self.thread_count, image_count))
+
+        lock = threading.Lock()
+        backend_class = self.get_backend()
+        scale = self.scale
+        image_format = self.image_format
+
+        def backend():
+            """Create a backend resizing and writing images as set."""
+            return backend_class(scale, image_format)
+
+        cache = None
+        store = None
+        if self.use_cache:
+            settings = backend_class.identity()
+            if scale is not None:
+                settings += (('scale', scale),)
+            cache = ConversionCache(
+                Settings.CACHE_FOLDER, Settings.CACHE_MAX_SIZE,
+                settings, self.hash_content
+            )
+            if self.store_folder:
+                # Looked up after the cache, its keys need the images read
+                store = ConversionCache(
+                    self.store_folder, Settings.STORE_MAX_SIZE, settings,
+                    content_addressed=True
+                )
+            uncached_backend = backend
+
+            def backend():
+                """Create a backend going through the cache and store."""
+                converter = uncached_backend()
+                if store is not None:
+                    converter = CachedBackend(converter, store)
+                return CachedBackend(converter, cache)
+
+        jobs = []
+        cancel = threading.Event()
+
+        def start_jobs(count):
+            """Create and start conversion jobs."""
+            for _ in xrange(count):
+                queue.put(None)
+                job = ImageConverter(
+                    lock, queue, backend, tuner, sink, cancel, self.profile
+                )
+                job.start()
+                jobs.append(job)
+
+        # Launch the jobs
+        start_jobs(thread_count)
+
+        # Add threads while it makes the conversion faster
+        if tuner:
+            while True:
+                alive_jobs = [job for job in jobs if job.is_alive()]
+                if not alive_jobs:
+                    break
+                alive_jobs[0].join(Settings.TUNING_INTERVAL)
+                start_jobs(tuner.update())
+
+        # Wait for all jobs to terminate
+        for job in jobs:
+            job.join()
+
+        if cache:
+            print '{} of {} images taken from the conversion cache.'.format(
+                cache.hits, cache.hits + cache.misses
+            )
+            cache.evict()
+        if store:
+            print '{} of {} images taken from the shared store {}.'.format(
+                store.hits, store.hits + store.misses, store.folder
+            )
+            # Walking the shared store is slow, only done once it grew
+            if store.misses:
+                store.evict()
+
+        errors = [job.error for job in jobs if job.error is not None]
+        if errors and not (sink and sink.keep_going):
+            raise errors[0]
+
+    def distribute_images(self, in_images, out_images, sink=None):
+        """Have the workers convert images and wait for them to finish.
+
+        The workers are started on any host with encodeWorker.py and the
+        token of the job, they claim the images one at a time over TCP.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert.
+        out_images: list of str
+            Paths to the converted images.
+        sink: FrameJournal or None
+            The object the images converted by the workers are handed to.
+
+        Raises
+        ------
+        IOError
+            The first failure reported by a worker, or no worker connected
+            for a while, the outstanding images are left unconverted.
+
+        """
+        coordinator = FrameCoordinator(
+            self.coordinator_address, zip(in_images, out_images), {
+                'backend': self.backend,
+                'scale': self.scale,
+                'image_format': self.image_format,
+                'use_cache': self.use_cache,
+                'hash_content': self.hash_content,
+                'store_folder': self.store_folder,
+                'image_count': len(in_images),
+                'out_folder': self.out_folder,
+            }, sink, Settings.COORDINATOR_TOKEN
+        )
+        coordinator.start()
+        print 'Start the workers converting the {} images with:'.format(
+            len(in_images)
+        )
+        print '    encodeWorker.py {} {} {}'.format(
+            coordinator.worker_address(), Settings.TOKEN_FLAG[0],
+            coordinator.token
+        )
+
+        def progress(converted, total):
+            """Print the number of images converted by the workers."""
+            print '{} of {} images converted by the workers.'.format(
+                converted, total
+            )
+
+        coordinator.wait(progress)
+
+    def get_out_filepath(self, output=None):
+        """Return the path to a generated output.
+
+        Parameters
+        ----------
+        output: str or None
+            The name of the output, the first output if None.
+
         Returns
         -------
-        list, list
-            The paths to input and output images.
+        str
+            The path, next to the input images.
 
         """
-        in_images = []
-        out_images = []
-        files = [
-            f
-            for f in os.listdir(self.in_folder)
-            if Settings.IN_IMAGE_EXTENSION in f
-        ]
-        for name in files:
-            name, _ = os.path.splitext(name)
-            in_images.append(os.path.normpath(os.path.join(
-                self.in_folder,
-                '{}.{}'.format(name, Settings.IN_IMAGE_EXTENSION))
-            ))
-            out_images.append(os.path.normpath(os.path.join(
-                self.out_folder,
-                '{}.{}'.format(name, Settings.OUT_IMAGE_EXTENSION))
-            ))
-        return in_images, out_images
+        spec = Settings.OUTPUTS[output or self.outputs[0]]
+        return os.path.join(
+            self.in_folder,
+            "{}{}.{}".format(self.filename, spec['suffix'], spec['extension'])
+        )
+
+    def slate_filters(self):
+        """Build the ffmpeg filters drawing the constant part of the ui.
 
-    def split_into_buckets(self, images):
-        """Split given image list into buckets.
+        Returns
+        -------
+        list of str
+            The filters, right aligned.
+
+        """
+        return [
+            ffmpeg_draw_box(
+                'Production\\: {}'.format(self.production_name),
+                bold=True, size=12, pos=(15, 10)
+            ),
+            ffmpeg_draw_box(
+                'Shot\\: {}'.format(self.seq_shot), pos=(15, 53)
+            ),
+            ffmpeg_draw_box(
+                'Date %{localtime\\:%d-%m-%Y}', pos=(15, 75)
+            ),
+            ffmpeg_draw_box(
+                'Content\\: {}'.format(self.title), pos=(15, 97)
+            ),
+            ffmpeg_draw_box(
+                'Artist\\: {}'.format(self.username), pos=(15, 119)
+            ),
+        ]
 
-        The number of buckets (length of the returned iterator) is equal to the
-        thread count, the missing elements are filled with None (i.e if
-        thread_count = 3 and images = range(10) then
-        buckets = [[0, 3, 6, 9], [1, 4, 7, None], [2, 5, 8, None]]).
+    def frame_filter(self, start_frame=None):
+        """Build the ffmpeg filter drawing the frame number.
 
         Parameters
         ----------
-        images: list of str
-            The list of images to split
+        start_frame: str or None
+            The frame number drawn on the first image, the current frame if
+            None.
 
         Returns
         -------
-        iterator of list of str
-            The bucket list iterator.
+        str
+            The filter.
 
         """
-        return itertools.izip_longest(
-            *(
-                images[i:i + self.thread_count]
-                for i in xrange(0, len(images), self.thread_count)
-            )
+        return ffmpeg_draw_box(
+            '%{frame_num}',
+            bold=True, size=14, pos=(15, 10),
+            anchor=('right', 'bottom'),
+            extra=['start_number={}'.format(
+                start_frame or self.current_frame
+            )]
         )
 
-    def convert_images(self):
-        """Convert input exr image to color corrected png images."""
-        # Get image lists
-        in_images, out_images = self.get_image_lists()
+    def slate_size(self):
+        """Return the size of the slate.
+
+        Returns
+        -------
+        int, int
+            The width of the converted images, Settings.SLATE_SIZE if the
+            first input image can't be read, and the height of the slate.
 
-        # Get buckets
-        in_buckets = self.split_into_buckets(in_images)
-        out_buckets = self.split_into_buckets(out_images)
+        """
+        try:
+            width, height = read_exr_size(self.path)
+        except IOError:
+            return Settings.SLATE_SIZE
+        if self.scale is not None:
+            width = scaled_size(width, height, self.scale)[0]
+        return width, Settings.SLATE_SIZE[1]
 
-        # Create conversion jobs
-        lock = threading.Lock()
-        jobs = []
-        for in_bucket, out_bucket in zip(in_buckets, out_buckets):
-            jobs.append(ImageConverter(lock, in_bucket, out_bucket))
+    def render_slate(self):
+        """Render the constant part of the ui to a transparent image.
+
+        The slate is rendered once per job, in the output folder, and
+        overlaid on every frame of every output and segment. It is as wide
+        as the frames, the boxes too long for them are clipped.
+
+        Returns
+        -------
+        str
+            Path to the slate image.
+
+        """
+        if self.slate_path is not None:
+            return self.slate_path
 
-        # Create output folder if it doesn't exist
         if not os.path.exists(self.out_folder):
             os.makedirs(self.out_folder)
+        path = os.path.join(self.out_folder, Settings.SLATE_NAME)
+        subprocess.check_call([
+            Settings.FFMPEG,
 
-        # Launch the jobs
-        for job in jobs:
-            job.start()
+            "-hide_banner",                         # Reduce log verbose
+            "-loglevel", "panic",                   # Reduce log verbose
 
-        # Wait for all jobs to terminate
-        for job in jobs:
-            job.join()
+            "-f", "lavfi",                          # Set input to a filter
+            "-i", "color=c=black@0:s={}x{},format=rgba".format(
+                *self.slate_size()                  # Transparent canvas
+            ),
+            "-vf", ', '.join(self.slate_filters()),
+            "-frames:v", "1",                       # Write a single image
+            "-y", path,
+        ])
+        self.slate_path = path
+        return path
 
-    def generate_video(self):
-        """Generate mov video file from png files."""
+    def ui_input_args(self):
+        """Build the ffmpeg args reading the slate, the second input.
+
+        Returns
+        -------
+        list of str
+            The args, to be put after the video input args.
+
+        """
+        return ["-i", self.render_slate()]
+
+    def ffmpeg_filters(self, start_frame=None):
+        """Build the ffmpeg filters drawing the ui over the video.
+
+        The slate is overlaid on the top right corner, only the frame
+        number is drawn on every frame.
+
+        Parameters
+        ----------
+        start_frame: str or None
+            The frame number drawn on the first image, the current frame if
+            None.
+
+        Returns
+        -------
+        str
+            The filters, with the video and slate input pads.
+
+        """
+        return '[0:v][1:v]{}'.format(', '.join([
+            'overlay=x=main_w-overlay_w:y=0',
+            self.frame_filter(start_frame),
+        ]))
+
+    def output_filters(self, output):
+        """Build the ffmpeg filters specific to an output.
+
+        Parameters
+        ----------
+        output: str
+            The name of the output.
+
+        Returns
+        -------
+        str
+            The filters, applied after the ui is drawn.
+
+        """
+        spec = Settings.OUTPUTS[output]
+        frame_count = self.frame_count or 1
+        filters = []
+        if spec['kind'] == 'poster':
+            filters.append('select=eq(n\\,{})'.format(frame_count // 2))
+        elif spec['kind'] == 'contact_sheet':
+            columns, rows = Settings.CONTACT_SHEET_GRID
+            step = int(math.ceil(float(frame_count) / (columns * rows)))
+            filters += [
+                'select=not(mod(n\\,{}))'.format(max(1, step)),
+                'scale={}:-2'.format(Settings.CONTACT_SHEET_FRAME_WIDTH),
+                'tile={}x{}'.format(columns, rows),
+            ]
+        if spec['scale'] is not None:
+            # Even sizes, needed by yuv420p
+            filters.append(
+                'scale=trunc(iw*{0:g}/2)*2:trunc(ih*{0:g}/2)*2'.format(
+                    spec['scale']
+                )
+            )
+        return ','.join(filters) or 'null'
+
+    def ffmpeg_output_args(self, start_frame=None, frame_count=None,
+                           paths=None):
+        """Build the ffmpeg args drawing the ui and encoding the outputs.
+
+        The ui is drawn once and split between the outputs, all of them are
+        written by a single ffmpeg process from a single conversion pass.
+        The args start with the ui inputs.
+
+        Parameters
+        ----------
+        start_frame: str or None
+            The frame number drawn on the first image, the current frame if
+            None.
+        frame_count: int or None
+            The number of frames written to the video outputs, all of them
+            if None.
+        paths: dict or None
+            Paths to the outputs by name, replacing the paths next to the
+            input images.
+
+        Returns
+        -------
+        list of str
+            The args, to be put after the input args.
+
+        """
+        paths = paths or {}
+        graph = ['{},split={}{}'.format(
+            self.ffmpeg_filters(start_frame), len(self.outputs),
+            ''.join('[ui{}]'.format(i) for i in xrange(len(self.outputs)))
+        )]
+        args = []
+        for i, output in enumerate(self.outputs):
+            spec = Settings.OUTPUTS[output]
+            graph.append('[ui{0}]{1}[out{0}]'.format(
+                i, self.output_filters(output)
+            ))
+            args += ["-map", "[out{}]".format(i)] + spec['args']
+            if spec['kind'] != 'video':
+                args += ["-frames:v", "1"]          # Write a single image
+            elif frame_count is not None:
+                args += ["-frames:v", str(frame_count)]
+            args += ["-y", paths.get(output) or self.get_out_filepath(output)]
+
+        return self.ui_input_args() + [
+            "-filter_complex", ';'.join(graph),     # Draw ui, split outputs
+        ] + args
+
+    def image_input_args(self, start_frame):
+        """Build the ffmpeg args reading the converted image files.
+
+        Parameters
+        ----------
+        start_frame: str
+            The first frame read.
+
+        Returns
+        -------
+        list of str
+            The args, to be put before the output args.
+
+        """
         # Build file path for ffmpeg
         in_filepath = os.path.join(
             self.out_folder,
             "{filename}.%{padding}d.{extension}".format(
                 filename=self.filename,
                 padding=len(self.current_frame),
-                extension=Settings.OUT_IMAGE_EXTENSION
+                extension=Settings.IMAGE_FORMATS[self.image_format][
+                    'extension'
+                ]
             )
         )
+        return [
+            Settings.FFMPEG,
+
+            "-hide_banner",                         # Reduce log verbose
+            "-loglevel", "panic",                   # Reduce log verbose
+
+            "-start_number", start_frame,           # Set first frame
+            "-r", Settings.FRAME_RATE,              # Set video frame rate
+            "-f", "image2",                         # Set input codec to image
+            "-i", in_filepath,                      # Set input path
+        ]
+
+    def generate_video(self):
+        """Generate mov video file from png files.
 
+        Raises
+        ------
+        ValueError
+            The journal of a resumable job doesn't list all the images.
+
+        """
         # Movie path
-        self.out_filepath = os.path.join(
-            self.in_folder,
-            "{}.{}".format(self.filename, Settings.OUT_VIDEO_EXTENSION)
-        )
+        self.out_filepath = self.get_out_filepath()
+
+        if self.journal is not None and self.sequence is not None:
+            missing = self.journal.missing_names([
+                self.out_image(frame.frame) for frame in self.sequence.frames
+            ])
+            if missing:
+                raise ValueError(
+                    '{} images missing from the journal, first {}'.format(
+                        len(missing), missing[0]
+                    )
+                )
+
+        self.fill_gaps()
+        if self.sequence is not None:
+            self.frame_count = self.sequence.last - int(self.current_frame) + 1
+
+        segments = self.get_segments()
+        if len(segments) > 1:
+            self.generate_segments(segments)
+            return
 
         print 'Generating video...'
         # Generate video
-        subprocess.check_call([
+        subprocess.check_call(
+            self.image_input_args(self.current_frame) +
+            self.ffmpeg_output_args()
+        )
+
+    def get_segments(self):
+        """Split the frames to encode in segments encoded in parallel.
+
+        Only intra frame video outputs are split, their segments are joined
+        without encoding them again.
+
+        Returns
+        -------
+        list of tuple of str, int
+            The first frame (padded as the current frame) and the frame
+            count of every segment.
+
+        """
+        frame_count = self.frame_count or 0
+        if self.segment_count < 2 or frame_count < 2:
+            return [(self.current_frame, frame_count)]
+        if not all(
+            Settings.OUTPUTS[output]['kind'] == 'video' and
+            Settings.OUTPUTS[output]['intra']
+            for output in self.outputs
+        ):
+            print 'Only intra frame videos are encoded in segments.'
+            return [(self.current_frame, frame_count)]
+
+        segment_count = max(1, min(
+            self.segment_count, frame_count // Settings.MIN_SEGMENT_FRAMES
+        ))
+        segments = []
+        first = int(self.current_frame)
+        for index in xrange(segment_count):
+            # Spread the remainder over the first segments
+            count = frame_count // segment_count + (
+                1 if index < frame_count % segment_count else 0
+            )
+            segments.append(
+                (str(first).zfill(len(self.current_frame)), count)
+            )
+            first += count
+        return segments
+
+    def generate_segments(self, segments):
+        """Encode the outputs in segments and join them.
+
+        Every segment is encoded by its own ffmpeg process, the frame
+        numbers drawn start at the first frame of the segment. The segments
+        are then joined with the concat demuxer, copying the frames.
+
+        Parameters
+        ----------
+        segments: list of tuple of str, int
+            The first frame and the frame count of every segment.
+
+        """
+        folder = os.path.join(self.out_folder, Settings.SEGMENTS_FOLDER)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        segment_paths = []
+        commands = []
+        for index, (start_frame, frame_count) in enumerate(segments):
+            paths = dict(
+                (
+                    output,
+                    os.path.join(folder, '{}.{:04d}.{}'.format(
+                        output, index, Settings.OUTPUTS[output]['extension']
+                    ))
+                )
+                for output in self.outputs
+            )
+            segment_paths.append(paths)
+            commands.append(
+                self.image_input_args(start_frame) +
+                self.ffmpeg_output_args(start_frame, frame_count, paths)
+            )
+
+        print 'Generating video in {} segments...'.format(len(segments))
+        errors = []
+
+        def encode(command):
+            """Run an ffmpeg process, keep its error."""
+            try:
+                subprocess.check_call(command)
+            except Exception as error:
+                errors.append(error)
+
+        encoders = [
+            threading.Thread(target=encode, args=(command,))
+            for command in commands
+        ]
+        for encoder in encoders:
+            encoder.start()
+        for encoder in encoders:
+            encoder.join()
+        if errors:
+            raise errors[0]
+
+        for output in self.outputs:
+            list_path = os.path.join(folder, '{}.txt'.format(output))
+            with open(list_path, 'w') as list_file:
+                for paths in segment_paths:
+                    # Quotes are escaped in the concat demuxer syntax
+                    list_file.write("file '{}'\n".format(
+                        paths[output].replace("'", "'\\''")
+                    ))
+            subprocess.check_call([
+                Settings.FFMPEG,
+
+                "-hide_banner",                     # Reduce log verbose
+                "-loglevel", "panic",               # Reduce log verbose
+
+                "-f", "concat",                     # Join the segments
+                "-safe", "0",                       # Allow absolute paths
+                "-i", list_path,                    # Set input path
+                "-c", "copy",                       # Don't encode again
+                "-y", self.get_out_filepath(output),
+            ])
+
+    def stream_command(self, width, height, pix_fmt):
+        """Build the ffmpeg command encoding raw images read from stdin.
+
+        Parameters
+        ----------
+        width: int
+            The width of the images.
+        height: int
+            The height of the images.
+        pix_fmt: str
+            The ffmpeg pixel format of the images.
+
+        Returns
+        -------
+        list of str
+            The command.
+
+        """
+        return [
             Settings.FFMPEG,
 
             "-hide_banner",                         # Reduce log verbose
             "-loglevel", "panic",                   # Reduce log verbose
 
-            "-start_number", self.current_frame,    # Set first frame
+            "-f", "rawvideo",                       # Set input to raw images
+            "-pix_fmt", pix_fmt,                    # Set pixel format
+            "-s", "{}x{}".format(width, height),    # Set image size
             "-r", Settings.FRAME_RATE,              # Set video frame rate
-            "-f", "image2",                         # Set input codec to image
-            "-i", in_filepath,                      # Set input path
+            "-i", "-",                              # Read from stdin
+        ] + self.ffmpeg_output_args()
 
-            "-vf",                                  # Draw ui
-            ', '.join([
-                ffmpeg_draw_box(
-                    'Production\\: {}'.format(self.production_name),
-                    bold=True, size=12, pos=(15, 10)
-                ),
-                ffmpeg_draw_box(
-                    'Shot\\: {}'.format(self.seq_shot), pos=(15, 53)
-                ),
-                ffmpeg_draw_box(
-                    'Date %{localtime\\:%d-%m-%Y}', pos=(15, 75)
-                ),
-                ffmpeg_draw_box(
-                    'Content\\: {}'.format(self.title), pos=(15, 97)
-                ),
-                ffmpeg_draw_box(
-                    'Artist\\: {}'.format(self.username), pos=(15, 119)
-                ),
-                ffmpeg_draw_box(
-                    '%{frame_num}',
-                    bold=True, size=14, pos=(15, 10),
-                    anchor=('right', 'bottom'),
-                    extra=['start_number={}'.format(self.current_frame)]
-                ),
-            ]),
+    def pipeline_command(self):
+        """Build the ffmpeg command encoding image files read from stdin.
 
-            "-vcodec", Settings.CODEC,              # Set output codec
-            "-b:v", Settings.BITRATE,               # Set bitrate
+        Returns
+        -------
+        list of str
+            The command.
 
-            "-y", self.out_filepath,                # Set output path
-        ])
+        """
+        return [
+            Settings.FFMPEG,
+
+            "-hide_banner",                         # Reduce log verbose
+            "-loglevel", "panic",                   # Reduce log verbose
+
+            "-f", "image2pipe",                     # Set input to images
+            "-c:v", Settings.IMAGE_FORMATS[         # Set image decoder
+                self.image_format
+            ]['decoder'],
+            "-r", Settings.FRAME_RATE,              # Set video frame rate
+            "-i", "-",                              # Read from stdin
+        ] + self.ffmpeg_output_args()
+
+    def from_current_frame(self, in_images, out_images):
+        """Keep the images from the current frame on.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to input images.
+        out_images: list of str
+            Paths to output images.
+
+        Returns
+        -------
+        list, list
+            The paths to the kept input and output images.
+
+        """
+        kept = [
+            (in_image, out_image)
+            for in_image, out_image in zip(in_images, out_images)
+            if int(frame_number(in_image)) >= int(self.current_frame)
+        ]
+        return [pair[0] for pair in kept], [pair[1] for pair in kept]
+
+    def stream_video(self):
+        """Generate mov video file by streaming converted images to ffmpeg.
+
+        Images from the current frame on are converted in memory, or to ppm
+        images in a local temporary folder with ocioconvert, and piped to
+        ffmpeg as soon as the images before them are piped. Nothing is
+        written next to the input images but the video.
+        """
+        temp_folder = tempfile.mkdtemp(prefix='encodeMovieFx_')
+        in_images, _ = self.get_image_lists()
+        out_images = [
+            os.path.join(temp_folder, '{}.{}'.format(
+                os.path.splitext(os.path.basename(in_image))[0],
+                Settings.STREAM_IMAGE_EXTENSION
+            ))
+            for in_image in in_images
+        ]
+        in_images, out_images = self.from_current_frame(in_images, out_images)
+
+        try:
+            self.pipe_images(
+                in_images, out_images,
+                FrameStreamer(in_images, self.stream_command)
+            )
+        finally:
+            shutil.rmtree(temp_folder)
+
+    def pipeline_video(self):
+        """Generate mov video file while converting images to png files.
+
+        Images from the current frame on are converted to the output folder
+        and piped to ffmpeg as soon as the images before them are piped, the
+        encoding runs alongside the conversion instead of after it.
+        """
+        in_images, out_images = self.from_current_frame(
+            *self.get_image_lists()
+        )
+
+        # Create output folder if it doesn't exist
+        if not os.path.exists(self.out_folder):
+            os.makedirs(self.out_folder)
+
+        self.pipe_images(
+            in_images, out_images,
+            ImageFileStreamer(in_images, self.pipeline_command)
+        )
+
+    def pipe_images(self, in_images, out_images, streamer):
+        """Convert images and pipe them to ffmpeg in frame order.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the images to convert, in frame order.
+        out_images: list of str
+            Paths to the converted images.
+        streamer: FrameStreamer
+            The thread piping the converted images to ffmpeg.
+
+        """
+        # Movie path
+        self.out_filepath = self.get_out_filepath()
+        self.frame_count = len(in_images)
+
+        print 'Generating video...'
+        streamer.start()
+        try:
+            self.run_converters(in_images, out_images, streamer)
+        except BaseException as error:
+            # Unblock the streamer waiting for images that won't come
+            streamer.fail(error)
+            raise
+        finally:
+            streamer.join()
+            if self.profile and streamer.encode_time is not None:
+                self.profile.stage('ffmpeg', streamer.encode_time)
+
+        if streamer.error is not None:
+            raise streamer.error
+
+
+# The conversion backends selectable from the cli
+BACKENDS = {
+    Settings.OCIO_BACKEND: OcioBackend,
+    Settings.OCIO_CONVERT_BACKEND: OcioConvertBackend,
+    Settings.LUT_BACKEND: LutBackend,
+}
 
 
 if __name__ == '__main__':
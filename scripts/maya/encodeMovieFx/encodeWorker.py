@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Convert the images of a distributed encodeMovieFx job."""
+
+import os
+import sys
+import socket
+import getopt
+
+from encodeMovieFx import Settings
+from encodeMovieFx import EncodeMovieFx
+from frameCoordinator import CoordinatorClient
+from frameCoordinator import parse_address
+
+
+class EncodeWorker(object):
+    """Convert the images handed out by an encodeMovieFx coordinator."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'encodeWorker.py '
+        'host:port '
+        '[-k/--token token] '
+        '[-c/--thread_count thread_count|auto] '
+        '[-h]'
+    )
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        self.args = args
+        self.address = None
+        self.token = Settings.COORDINATOR_TOKEN
+        self.thread_count = Settings.DEFAULT_THREAD_COUNT
+
+    def run(self):
+        """Convert images until the coordinator has none left."""
+        self.parse_args()
+
+        client = CoordinatorClient(
+            self.address, self.token, EncodeWorker.accept_task
+        )
+        try:
+            try:
+                settings = client.settings()
+            except (IOError, socket.error) as error:
+                print 'Cannot reach coordinator {}:{}: {}'.format(
+                    self.address[0], self.address[1], error
+                )
+                sys.exit(1)
+
+            # The conversion threads are set up from a tool instance with
+            # the settings of the job
+            options = EncodeMovieFx([])
+            options.thread_count = self.thread_count
+            options.backend = settings['backend']
+            options.scale = settings['scale']
+            if isinstance(options.scale, list):
+                options.scale = tuple(options.scale)
+            options.image_format = settings['image_format']
+            options.use_cache = settings['use_cache']
+            options.hash_content = settings['hash_content']
+            options.store_folder = settings['store_folder']
+
+            try:
+                options.run_queue(client, settings['image_count'], client)
+            except Settings.RUN_ERRORS as error:
+                print 'Conversion failed: {}'.format(error)
+                sys.exit(1)
+        finally:
+            client.close()
+
+    @staticmethod
+    def accept_task(in_image, out_image):
+        """Return whether a frame handed out by the coordinator is written.
+
+        The images of distributed jobs are written to a job folder in the
+        temp folder next to the input images, the workers write nowhere
+        else.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the input image.
+        out_image: str
+            Path to the converted image.
+
+        Returns
+        -------
+        bool
+            True if the converted image is in a job folder.
+
+        """
+        in_image = os.path.normpath(os.path.abspath(in_image))
+        out_image = os.path.normpath(os.path.abspath(out_image))
+        job_folder = os.path.dirname(out_image)
+        return (
+            os.path.basename(job_folder) not in ('', os.curdir, os.pardir) and
+            os.path.dirname(job_folder) == os.path.join(
+                os.path.dirname(in_image), Settings.TEMP_FOLDER
+            )
+        )
+
+    def parse_args(self):
+        """Parse the command line args.
+
+        Sets the address, token and thread_count vars.
+        """
+        arg_flags = [Settings.TOKEN_FLAG, Settings.THREAD_COUNT_FLAG]
+        try:
+            options, args = getopt.gnu_getopt(
+                self.args,
+                Settings.HELP_FLAG[1:] + ''.join(
+                    '{}:'.format(flag[0][1:]) for flag in arg_flags
+                ),
+                ['{}='.format(flag[1][2:]) for flag in arg_flags]
+            )
+        except getopt.GetoptError:
+            print EncodeWorker.cli_usage
+            sys.exit(2)
+
+        for flag, argument in options:
+            if flag == Settings.HELP_FLAG:
+                print EncodeWorker.cli_usage
+                sys.exit()
+            elif flag in Settings.TOKEN_FLAG:
+                self.token = argument
+            elif flag in Settings.THREAD_COUNT_FLAG:
+                if argument == Settings.AUTO_THREAD_COUNT:
+                    self.thread_count = argument
+                    continue
+                try:
+                    self.thread_count = int(argument)
+                except ValueError:
+                    print EncodeWorker.cli_usage
+                    sys.exit(2)
+
+        if len(args) != 1 or ':' not in args[0] or not self.token:
+            print EncodeWorker.cli_usage
+            sys.exit(2)
+        try:
+            self.address = parse_address(args[0])
+        except ValueError:
+            print EncodeWorker.cli_usage
+            sys.exit(2)
+
+
+if __name__ == '__main__':
+    EncodeWorker(sys.argv[1:]).run()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Watch a folder for the images of a sequence being written."""
+
+import os
+import time
+import errno
+import select
+import ctypes
+import ctypes.util
+
+from imageSequence import list_folder
+from imageSequence import parse_frame
+
+# inotify events waking up the watcher, from sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+
+class Inotify(object):
+    """inotify watch of a folder, read through the C library.
+
+    The events aren't parsed, they only tell the folder changed.
+    """
+
+    def __init__(self, folder):
+        """Watch a folder.
+
+        Parameters
+        ----------
+        folder: str
+            Path to the folder.
+
+        Raises
+        ------
+        OSError
+            If inotify isn't available or the folder can't be watched.
+
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        try:
+            init = libc.inotify_init1
+            add_watch = libc.inotify_add_watch
+        except AttributeError:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.fd = init(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if add_watch(
+            self.fd, folder,
+            IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        ) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, 'Cannot watch {}'.format(folder))
+
+    def wait(self, timeout):
+        """Wait for the folder to change.
+
+        Parameters
+        ----------
+        timeout: float
+            The longest wait (in seconds).
+
+        Returns
+        -------
+        bool
+            True if the folder changed, False on timeout.
+
+        """
+        readable = select.select([self.fd], [], [], timeout)[0]
+        if not readable:
+            return False
+        # Drop the pending events
+        while True:
+            try:
+                if not os.read(self.fd, 65536):
+                    break
+            except OSError as error:
+                if error.errno == errno.EAGAIN:
+                    break
+                raise
+        return True
+
+    def close(self):
+        """Stop watching the folder."""
+        os.close(self.fd)
+
+
+class FolderWatcher(object):
+    """Report the images of a sequence once they are completely written.
+
+    An image is complete once its size stayed the same for a delay. The
+    folder is listed when inotify reports a change, and at an interval
+    otherwise: inotify is missing on some systems and doesn't report the
+    files written by other hosts on network shares.
+    """
+
+    def __init__(self, folder, basename, extension, stable_delay,
+                 poll_interval):
+        """Initialize the watcher.
+
+        Parameters
+        ----------
+        folder: str
+            Path to the folder.
+        basename: str
+            The name of the images without frame and extension.
+        extension: str
+            The extension of the images.
+        stable_delay: float
+            The time (in seconds) the size of an image has to stay the same
+            for the image to be complete.
+        poll_interval: float
+            The longest time (in seconds) between two listings.
+
+        """
+        self.folder = folder
+        self.basename = basename
+        self.extension = extension
+        self.stable_delay = stable_delay
+        self.poll_interval = poll_interval
+        # The size of the images being written, and when it last changed
+        self.sizes = {}
+        self.reported = set()
+        try:
+            self.inotify = Inotify(folder)
+        except OSError as error:
+            print 'Polling {} every {:g}s ({}).'.format(
+                folder, poll_interval, error
+            )
+            self.inotify = None
+
+    def wait(self):
+        """Wait for the folder to change, or for images to be complete.
+
+        Returns once a change is reported, once the images being written
+        may be complete, or after the poll interval.
+        """
+        timeout = self.poll_interval
+        if self.sizes:
+            timeout = min(timeout, self.stable_delay)
+        if self.inotify is None:
+            time.sleep(timeout)
+        else:
+            self.inotify.wait(timeout)
+
+    def complete_images(self):
+        """List the images completed since the last call.
+
+        Returns
+        -------
+        list of Frame
+            The images, in frame order.
+
+        """
+        now = time.time()
+        complete = []
+        for name in list_folder(self.folder):
+            if name in self.reported:
+                continue
+            frame = parse_frame(name)
+            if frame is None or frame.basename != self.basename or \
+                    frame.extension != self.extension:
+                continue
+            try:
+                size = os.path.getsize(os.path.join(self.folder, name))
+            except OSError:
+                # Renamed or deleted since listed
+                continue
+            last = self.sizes.get(name)
+            if not size or last is None or last[0] != size:
+                # Empty images are created before being written
+                self.sizes[name] = (size, now)
+            elif now - last[1] >= self.stable_delay:
+                del self.sizes[name]
+                self.reported.add(name)
+                complete.append(frame)
+        return sorted(complete, key=lambda frame: frame.frame)
+
+    def close(self):
+        """Stop watching the folder."""
+        if self.inotify is not None:
+            self.inotify.close()
@@ -0,0 +1,564 @@
+# -*- coding: utf-8 -*-
+"""Conversion of the frames of a job distributed to workers over TCP."""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import socket
+import threading
+import collections
+import SocketServer
+
+# Delay (in seconds) between two checks of the end of the conversion, the
+# wait can be interrupted in between
+POLL_INTERVAL = 1.0
+# Time (in seconds) after which the conversion is given up when no worker
+# is connected
+IDLE_TIMEOUT = 600.0
+
+
+def parse_address(text, host=''):
+    """Parse an address passed to the cli.
+
+    Parameters
+    ----------
+    text: str
+        The address, host:port or port.
+    host: str
+        The host used when the address has none, '' for all the interfaces.
+
+    Returns
+    -------
+    tuple of str, int
+        The host and port.
+
+    Raises
+    ------
+    ValueError
+        If the port isn't a number from 0 to 65535.
+
+    """
+    if ':' in text:
+        host, port = text.rsplit(':', 1)
+    else:
+        port = text
+    port = int(port)
+    if not 0 <= port <= 65535:
+        raise ValueError('Invalid port {}.'.format(port))
+    return host, port
+
+
+def send_message(stream, message):
+    """Send a message, one json object per line.
+
+    Parameters
+    ----------
+    stream: file
+        The socket file the message is written to.
+    message: dict
+        The message.
+
+    """
+    stream.write(json.dumps(message) + '\n')
+    stream.flush()
+
+
+def receive_message(stream):
+    """Receive a message sent by send_message.
+
+    Parameters
+    ----------
+    stream: file
+        The socket file the message is read from.
+
+    Returns
+    -------
+    dict
+        The message.
+
+    Raises
+    ------
+    IOError
+        If the connection is closed or the message is incomplete.
+
+    """
+    line = stream.readline()
+    if not line.endswith('\n'):
+        raise IOError('Connection closed.')
+    try:
+        return json.loads(line)
+    except ValueError:
+        raise IOError('Invalid message {!r}.'.format(line))
+
+
+class CoordinatorServer(SocketServer.ThreadingTCPServer):
+    """Server handing out the frames of a coordinator, a thread per worker
+    connection."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class CoordinatorHandler(SocketServer.StreamRequestHandler):
+    """Conversation with a worker thread.
+
+    The worker sends {"token": token} on connection, answered by
+    {"settings": settings} if the token is the one of the job. The worker
+    then sends one of these messages, with the token too, and waits for the
+    answer:
+
+    - {"claim": true}, answered by {"task": [in_image, out_image]}, or by
+      {"task": null} once no frame is left to convert.
+    - {"done": in_image}, answered by {}.
+    - {"failed": in_image or null, "error": message}, answered by {}.
+
+    The connection is closed on the first message without the token. The
+    frames claimed and not reported are handed out again when the
+    connection is lost.
+    """
+
+    def handle(self):
+        """Answer the worker messages until the connection is closed."""
+        coordinator = self.server.coordinator
+        # The frames claimed on this connection, by input image
+        claimed = {}
+        try:
+            coordinator.check_token(receive_message(self.rfile))
+        except (IOError, socket.error):
+            return
+        coordinator.connect(1)
+        try:
+            send_message(self.wfile, {'settings': coordinator.settings})
+            while True:
+                message = receive_message(self.rfile)
+                coordinator.check_token(message)
+                if 'claim' in message:
+                    task = coordinator.claim(claimed)
+                    send_message(self.wfile, {'task': task})
+                elif 'done' in message:
+                    coordinator.complete(claimed, message['done'])
+                    send_message(self.wfile, {})
+                elif 'failed' in message:
+                    coordinator.fail(
+                        claimed, message['failed'], message.get('error')
+                    )
+                    send_message(self.wfile, {})
+                else:
+                    raise IOError('Unknown message {!r}.'.format(message))
+        except (IOError, socket.error):
+            pass
+        finally:
+            coordinator.release(claimed)
+            coordinator.connect(-1)
+
+
+class FrameCoordinator(object):
+    """Hand out the frames of a job to workers and collect the results.
+
+    The workers connect over TCP with the token of the job, claim one frame
+    at a time and report it converted or failed. The first failure stops
+    the conversion, the frames of a worker that goes away are handed to the
+    others.
+    """
+
+    def __init__(self, address, tasks, settings, sink=None, token=None):
+        """Initialize the coordinator and bind its socket.
+
+        Parameters
+        ----------
+        address: tuple of str, int
+            The host and port listened on, port 0 picks a free port.
+        tasks: list of tuple of str, str
+            The (input image, output image) path pairs to convert.
+        settings: dict
+            The settings of the job sent to the workers.
+        sink: FrameJournal or None
+            The object the images converted by the workers are handed to.
+        token: str or None
+            The token the workers authenticate with, a random one if None.
+
+        """
+        self.settings = settings
+        self.sink = sink
+        self.token = str(token or uuid.uuid4().hex)
+        self.condition = threading.Condition()
+        self.pending = collections.deque(tuple(task) for task in tasks)
+        self.remaining = len(self.pending)
+        self.finished = threading.Event()
+        self.error = None
+        if not self.remaining:
+            self.finished.set()
+        # The connected workers, and since when none is
+        self.workers = 0
+        self.idle_since = time.time()
+
+        self.server = CoordinatorServer(address, CoordinatorHandler)
+        self.server.coordinator = self
+        self.thread = None
+
+    def worker_address(self):
+        """Return the address the workers connect to.
+
+        Returns
+        -------
+        str
+            The host and port, host:port.
+
+        """
+        host, port = self.server.server_address[:2]
+        if host in ('', '0.0.0.0'):
+            host = socket.gethostname()
+        return '{}:{}'.format(host, port)
+
+    def start(self):
+        """Start accepting workers."""
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def wait(self, progress=None):
+        """Wait for the frames to be converted and stop accepting workers.
+
+        Parameters
+        ----------
+        progress: callable or None
+            Called with the numbers of converted and total frames when
+            frames are converted.
+
+        Raises
+        ------
+        IOError
+            The first failure reported by a worker, or no worker connected
+            for IDLE_TIMEOUT.
+
+        """
+        total = self.remaining
+        reported = total
+        try:
+            while not self.finished.is_set():
+                self.finished.wait(POLL_INTERVAL)
+                with self.condition:
+                    remaining = self.remaining
+                    idle = not self.workers and \
+                        time.time() - self.idle_since > IDLE_TIMEOUT
+                if progress is not None and remaining != reported:
+                    progress(total - remaining, total)
+                    reported = remaining
+                if idle:
+                    self.stop(IOError(
+                        'No worker connected for {:g}s, {} frames left.'
+                        .format(IDLE_TIMEOUT, remaining)
+                    ))
+        finally:
+            self.stop()
+            self.server.shutdown()
+            self.server.server_close()
+        if self.error is not None:
+            raise self.error
+
+    def check_token(self, message):
+        """Check a message of a worker carries the token of the job.
+
+        Parameters
+        ----------
+        message: dict
+            The message.
+
+        Raises
+        ------
+        IOError
+            If the token is missing or wrong.
+
+        """
+        token = message.get('token')
+        # Compared in constant time, the token can't be guessed byte by byte
+        if not isinstance(token, basestring) or \
+                not hmac.compare_digest(token.encode('utf-8'), self.token):
+            raise IOError('Invalid token.')
+
+    def connect(self, count):
+        """Count the workers connecting or going away.
+
+        Parameters
+        ----------
+        count: int
+            1 for a connected worker, -1 for a worker gone.
+
+        """
+        with self.condition:
+            self.workers += count
+            if not self.workers:
+                self.idle_since = time.time()
+
+    def claim(self, claimed):
+        """Hand out the next frame, waiting for one to be available.
+
+        Parameters
+        ----------
+        claimed: dict
+            The frames claimed by the worker connection, the frame is added
+            to it.
+
+        Returns
+        -------
+        tuple of str, str or None
+            The input and output image paths, None once no frame is left.
+
+        """
+        with self.condition:
+            # The frames of the other workers are handed out again if they
+            # go away
+            while not self.pending and not self.finished.is_set():
+                self.condition.wait()
+            if self.finished.is_set():
+                return None
+            task = self.pending.popleft()
+            claimed[task[0]] = task
+            return task
+
+    def complete(self, claimed, in_image):
+        """Record a frame converted by a worker.
+
+        A frame reported converted without its output image stops the
+        conversion.
+
+        Parameters
+        ----------
+        claimed: dict
+            The frames claimed by the worker connection.
+        in_image: str
+            Path to the converted input image.
+
+        """
+        with self.condition:
+            task = claimed.pop(in_image, None)
+            if task is None or self.finished.is_set():
+                return
+        try:
+            written = os.path.getsize(task[1]) > 0
+        except OSError:
+            written = False
+        if not written:
+            self.stop(IOError(
+                '{} reported converted, {} is missing or empty.'.format(*task)
+            ))
+            return
+        if self.sink:
+            try:
+                self.sink.put(*task)
+            except Exception as error:
+                self.stop(error)
+                return
+        with self.condition:
+            self.remaining -= 1
+            if not self.remaining:
+                self.finished.set()
+                self.condition.notify_all()
+
+    def fail(self, claimed, in_image, message):
+        """Stop the conversion on a failure reported by a worker.
+
+        Parameters
+        ----------
+        claimed: dict
+            The frames claimed by the worker connection.
+        in_image: str or None
+            Path to the input image that failed, None if the worker
+            couldn't start converting.
+        message: str
+            The error reported by the worker.
+
+        """
+        with self.condition:
+            claimed.pop(in_image, None)
+        if in_image is None:
+            error = IOError('Worker failed: {}'.format(message))
+        else:
+            error = IOError('{} failed: {}'.format(in_image, message))
+        self.stop(error)
+
+    def release(self, claimed):
+        """Hand out again the frames of a worker connection that was lost.
+
+        Parameters
+        ----------
+        claimed: dict
+            The frames claimed by the worker connection, emptied.
+
+        """
+        with self.condition:
+            self.pending.extendleft(claimed.values())
+            claimed.clear()
+            self.condition.notify_all()
+
+    def stop(self, error=None):
+        """Stop handing out frames.
+
+        Parameters
+        ----------
+        error: Exception or None
+            The error stopping the conversion, only the first one is kept.
+
+        """
+        with self.condition:
+            if error is not None and self.error is None:
+                self.error = error
+            self.pending.clear()
+            self.finished.set()
+            self.condition.notify_all()
+
+
+class CoordinatorClient(object):
+    """Queue and sink of the conversion threads of a worker.
+
+    Every thread has its own connection to the coordinator, a thread
+    waiting for a frame doesn't hold back the others reporting theirs.
+    """
+
+    raw = False
+    keep_going = False
+
+    def __init__(self, address, token, accept=None):
+        """Initialize the client.
+
+        Parameters
+        ----------
+        address: tuple of str, int
+            The host and port of the coordinator.
+        token: str
+            The token of the job.
+        accept: callable or None
+            Called with the input and output image paths of every frame
+            handed out, the frames it returns False for are refused.
+
+        """
+        self.address = address
+        self.token = token
+        self.accept = accept
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.connections = []
+
+    def connection(self):
+        """Return the connection of the calling thread, opened if needed.
+
+        Returns
+        -------
+        tuple of file, file, dict
+            The socket files read from and written to, and the settings of
+            the job.
+
+        Raises
+        ------
+        IOError
+            If the coordinator can't be reached.
+
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            sock = socket.create_connection(self.address)
+            reader = sock.makefile('rb')
+            writer = sock.makefile('wb')
+            with self.lock:
+                self.connections.append((sock, reader, writer))
+            send_message(writer, {'token': self.token})
+            settings = receive_message(reader)['settings']
+            connection = self.local.connection = (reader, writer, settings)
+        return connection
+
+    def request(self, message):
+        """Send a message and return the answer of the coordinator.
+
+        Parameters
+        ----------
+        message: dict
+            The message.
+
+        Returns
+        -------
+        dict
+            The answer.
+
+        """
+        reader, writer, _ = self.connection()
+        send_message(writer, dict(message, token=self.token))
+        return receive_message(reader)
+
+    def settings(self):
+        """Return the settings of the job.
+
+        Returns
+        -------
+        dict
+            The settings sent by the coordinator.
+
+        """
+        return self.connection()[2]
+
+    def get(self):
+        """Claim the next frame to convert.
+
+        Returns
+        -------
+        tuple of str, str or None
+            The input and output image paths, None once no frame is left,
+            the coordinator is gone or the frame is refused.
+
+        """
+        try:
+            task = self.request({'claim': True})['task']
+        except (IOError, socket.error):
+            return None
+        if not task:
+            return None
+        task = tuple(task)
+        if self.accept is not None and not self.accept(*task):
+            # The coordinator stops the conversion
+            self.fail(IOError('Refused to write {}.'.format(task[1])), task[0])
+            return None
+        return task
+
+    def put(self, in_image, image=None):
+        """Report a converted frame.
+
+        The stop items put by the conversion threads are ignored, they stop
+        once the coordinator has no frame left.
+
+        Parameters
+        ----------
+        in_image: str or None
+            Path to the converted input image.
+        image: str or None
+            Path to the converted image.
+
+        """
+        if in_image is None:
+            return
+        self.request({'done': in_image})
+
+    def fail(self, error, in_image=None):
+        """Report a failed frame, the coordinator stops the conversion.
+
+        Parameters
+        ----------
+        error: Exception
+            The error that occurred.
+        in_image: str or None
+            Path to the image that failed.
+
+        """
+        try:
+            self.request({'failed': in_image, 'error': str(error)})
+        except (IOError, socket.error):
+            pass
+
+    def close(self):
+        """Close the connections of all the threads."""
+        with self.lock:
+            # The socket files hold the sockets open
+            for files in self.connections:
+                for opened in reversed(files):
+                    opened.close()
+            del self.connections[:]
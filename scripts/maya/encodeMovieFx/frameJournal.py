@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""On disk journal of the converted frames of a job."""
+
+import os
+import threading
+
+from conversionCache import hash_file
+
+
+class FrameJournal(object):
+    """Journal of the frames a job converted, kept next to its images.
+
+    A line is appended to the journal file for every converted image, with
+    the modification time and size of the source image and the size and
+    checksum of the converted image. A restarted job skips the images whose
+    entry still matches the files on disk.
+
+    The journal is the sink of the conversion threads, which hand over the
+    converted image files and stop on the first error.
+    """
+
+    # Fields of a line, separated by tabs
+    SEPARATOR = '\t'
+    # Length of the sha1 hex digests of the converted images
+    CHECKSUM_LENGTH = 40
+
+    raw = False
+    keep_going = False
+
+    def __init__(self, path):
+        """Open the journal, reading the entries of a previous run.
+
+        Parameters
+        ----------
+        path: str
+            Path to the journal file, created on the first entry.
+
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = self.read()
+
+    def read(self):
+        """Read the entries of the journal file.
+
+        Lines left incomplete by an interrupted job are skipped.
+
+        Returns
+        -------
+        dict
+            The source stamp, size and checksum of the converted images,
+            by converted image name.
+
+        """
+        entries = {}
+        try:
+            with open(self.path) as journal_file:
+                lines = journal_file.read().splitlines()
+        except IOError:
+            return entries
+        for line in lines:
+            fields = line.split(FrameJournal.SEPARATOR)
+            if len(fields) != 4:
+                continue
+            name, stamp, size, checksum = fields
+            if len(checksum) != FrameJournal.CHECKSUM_LENGTH:
+                continue
+            try:
+                entries[name] = (stamp, int(size), checksum)
+            except ValueError:
+                continue
+        return entries
+
+    @staticmethod
+    def stamp(in_image):
+        """Return what tells a source image was modified.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the source image.
+
+        Returns
+        -------
+        str
+            The modification time and size of the image.
+
+        """
+        stat = os.stat(in_image)
+        return '{!r}:{}'.format(stat.st_mtime, stat.st_size)
+
+    def done(self, in_image, out_image):
+        """Return whether an image was converted by a previous run.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the source image.
+        out_image: str
+            Path to the converted image.
+
+        Returns
+        -------
+        bool
+            True if the source image is unchanged and the converted image
+            is complete.
+
+        """
+        entry = self.entries.get(os.path.basename(out_image))
+        if entry is None:
+            return False
+        stamp, size, checksum = entry
+        try:
+            return (
+                stamp == FrameJournal.stamp(in_image) and
+                size == os.path.getsize(out_image) and
+                checksum == hash_file(out_image)
+            )
+        except (IOError, OSError):
+            return False
+
+    def missing(self, in_images, out_images):
+        """Return the images which aren't converted.
+
+        Parameters
+        ----------
+        in_images: list of str
+            Paths to the source images.
+        out_images: list of str
+            Paths to the converted images.
+
+        Returns
+        -------
+        list of tuple of str, str
+            The source and converted image path pairs.
+
+        """
+        return [
+            (in_image, out_image)
+            for in_image, out_image in zip(in_images, out_images)
+            if not self.done(in_image, out_image)
+        ]
+
+    def missing_names(self, out_images):
+        """Return the images the journal has no entry for.
+
+        The converted images aren't checked again.
+
+        Parameters
+        ----------
+        out_images: list of str
+            Paths to the converted images.
+
+        Returns
+        -------
+        list of str
+            The names of the images, in the given order.
+
+        """
+        names = [os.path.basename(out_image) for out_image in out_images]
+        return [name for name in names if name not in self.entries]
+
+    def put(self, in_image, image):
+        """Append the entry of a converted image.
+
+        The line is flushed at once, a killed job loses at most the images
+        being converted.
+
+        Parameters
+        ----------
+        in_image: str
+            Path to the source image.
+        image: str
+            Path to the converted image.
+
+        """
+        name = os.path.basename(image)
+        entry = (
+            FrameJournal.stamp(in_image), os.path.getsize(image),
+            hash_file(image)
+        )
+        line = FrameJournal.SEPARATOR.join(
+            [name] + [str(field) for field in entry]
+        )
+        with self.lock:
+            with open(self.path, 'a') as journal_file:
+                journal_file.write(line + '\n')
+                journal_file.flush()
+            self.entries[name] = entry
+
+    def fail(self, error, in_image=None):
+        """Ignore a failed image, it has no entry.
+
+        Parameters
+        ----------
+        error: Exception
+            The error that occurred.
+        in_image: str or None
+            Path to the image that failed.
+
+        """
+        pass
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""Discovery of the image sequences of a folder."""
+
+import os
+import re
+import time
+import threading
+import collections
+
+# os.scandir (python 3.5+, or the scandir backport) reads the file type
+# along with the names, os.listdir is used when it is missing
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+# An image of a sequence, named basename.frame.extension
+Frame = collections.namedtuple(
+    'Frame', ['basename', 'padding', 'frame', 'extension', 'name']
+)
+
+FRAME_PATTERN = re.compile(
+    r'^(?P<basename>.+)\.(?P<frame>[0-9]+)\.(?P<extension>[^.]+)$'
+)
+
+# Listings more recent than this (in seconds) aren't cached, the folder
+# modification time may not change for files added in the same second
+# (coarse time resolution of some network file systems)
+RACY_DELAY = 2.0
+
+# Cached sequences per folder, along with the folder modification time
+_SCANS = {}
+_SCANS_LOCK = threading.Lock()
+
+
+def parse_frame(name):
+    """Parse the name of an image of a sequence.
+
+    Parameters
+    ----------
+    name: str
+        The file name, without folder.
+
+    Returns
+    -------
+    Frame or None
+        The frame, None if the name isn't basename.frame.extension.
+
+    """
+    match = FRAME_PATTERN.match(name)
+    if not match:
+        return None
+    frame = match.group('frame')
+    return Frame(
+        match.group('basename'), len(frame), int(frame),
+        match.group('extension'), name
+    )
+
+
+class ImageSequence(object):
+    """Images sharing a basename and an extension, in frame order."""
+
+    def __init__(self, basename, extension, frames):
+        """Initialize the sequence.
+
+        Frames sharing a frame number (e.g. name.1.exr and name.0001.exr)
+        are duplicates, the one with the most common padding is kept.
+
+        Parameters
+        ----------
+        basename: str
+            The name of the images without frame and extension.
+        extension: str
+            The extension of the images.
+        frames: list of Frame
+            The images of the sequence, in any order.
+
+        """
+        self.basename = basename
+        self.extension = extension
+
+        paddings = collections.Counter(frame.padding for frame in frames)
+        # Most common padding, the smallest one on ties
+        self.padding = min(
+            paddings, key=lambda padding: (-paddings[padding], padding)
+        )
+
+        by_number = collections.defaultdict(list)
+        for frame in frames:
+            by_number[frame.frame].append(frame)
+        self.frames = []
+        self.duplicates = []
+        for number in sorted(by_number):
+            candidates = sorted(
+                by_number[number],
+                key=lambda frame: (frame.padding != self.padding, frame.name)
+            )
+            self.frames.append(candidates[0])
+            self.duplicates.extend(candidates[1:])
+
+    @property
+    def first(self):
+        """int: The first frame number."""
+        return self.frames[0].frame
+
+    @property
+    def last(self):
+        """int: The last frame number."""
+        return self.frames[-1].frame
+
+    def gaps(self):
+        """Return the missing frame ranges.
+
+        Returns
+        -------
+        list of tuple of int, int
+            The first and last missing frame numbers of every gap.
+
+        """
+        gaps = []
+        for previous, frame in zip(self.frames, self.frames[1:]):
+            if frame.frame > previous.frame + 1:
+                gaps.append((previous.frame + 1, frame.frame - 1))
+        return gaps
+
+    def until(self, last):
+        """Return the sequence without the frames after a frame.
+
+        Parameters
+        ----------
+        last: int
+            The last frame number kept.
+
+        Returns
+        -------
+        ImageSequence or None
+            The sequence, itself if no frame is after the last one, None if
+            every frame is.
+
+        """
+        if self.last <= last:
+            return self
+        frames = [
+            frame for frame in self.frames + self.duplicates
+            if frame.frame <= last
+        ]
+        if not frames:
+            return None
+        return ImageSequence(self.basename, self.extension, frames)
+
+
+def list_folder(folder):
+    """List the names of the files of a folder.
+
+    Parameters
+    ----------
+    folder: str
+        Path to the folder.
+
+    Returns
+    -------
+    list of str
+        The file names, in no particular order.
+
+    """
+    if scandir is None:
+        return os.listdir(folder)
+    return [entry.name for entry in scandir(folder) if entry.is_file()]
+
+
+def scan_folder(folder):
+    """Group the images of a folder in sequences.
+
+    The sequences are cached until the folder modification time changes,
+    listing a folder of tens of thousands of files over the network takes
+    seconds when checking its modification time doesn't.
+
+    Parameters
+    ----------
+    folder: str
+        Path to the folder.
+
+    Returns
+    -------
+    dict
+        The sequences of the folder, by (basename, extension). Shared with
+        the other callers, not to be modified.
+
+    """
+    folder = os.path.normpath(os.path.abspath(folder))
+    mtime = os.stat(folder).st_mtime
+    with _SCANS_LOCK:
+        scan = _SCANS.get(folder)
+    if scan is not None and scan[0] == mtime:
+        return scan[1]
+
+    frames = collections.defaultdict(list)
+    for name in list_folder(folder):
+        frame = parse_frame(name)
+        if frame is not None:
+            frames[(frame.basename, frame.extension)].append(frame)
+    sequences = dict(
+        (key, ImageSequence(key[0], key[1], sequence_frames))
+        for key, sequence_frames in frames.iteritems()
+    )
+
+    if time.time() - mtime > RACY_DELAY:
+        with _SCANS_LOCK:
+            _SCANS[folder] = (mtime, sequences)
+    return sequences
+
+
+def find_sequence(folder, basename, extension):
+    """Return a sequence of a folder.
+
+    Parameters
+    ----------
+    folder: str
+        Path to the folder.
+    basename: str
+        The name of the images without frame and extension.
+    extension: str
+        The extension of the images.
+
+    Returns
+    -------
+    ImageSequence or None
+        The sequence, None if the folder has no such images.
+
+    """
+    return scan_folder(folder).get((basename, extension))
@@ -11,6 +11,7 @@ class ImageConverter(object):
     join_count = 0
     init_count = 0
     init_args = []
+    error = None
 
     def __init__(self, *args, **kwargs):
         ImageConverter.init_count += 1
@@ -19,16 +20,40 @@ class ImageConverter(object):
     def start(self):
         ImageConverter.start_count += 1
 
-    def join(self):
+    def join(self, timeout=None):
         ImageConverter.join_count += 1
 
-    def reset(self):
+    def is_alive(self):
+        return False
+
+    @staticmethod
+    def reset():
         ImageConverter.start_count = 0
-        ImageConverter.call_count = 0
+        ImageConverter.join_count = 0
         ImageConverter.init_count = 0
         ImageConverter.init_args = []
 
 
+@pytest.fixture(autouse=True)
+def cache_folders(tmpdir, mocker):
+    """Keep the caches and scratch of the tests in a temporary directory.
+
+    Failed conversions are retried without waiting, the color processors
+    are built again by every test. The shared store is only used when a test
+    sets it.
+    """
+    mocker.patch.object(
+        Settings, 'CACHE_FOLDER', str(tmpdir.join('conversion_cache'))
+    )
+    mocker.patch.object(Settings, 'LUT_FOLDER', str(tmpdir.join('luts')))
+    mocker.patch.object(
+        Settings, 'SCRATCH_FOLDER', str(tmpdir.join('scratch'))
+    )
+    mocker.patch.object(Settings, 'RETRY_DELAY', 0.0)
+    mocker.patch.object(Settings, 'STORE_FOLDER', None)
+    mocker.patch.object(encodeMovieFx, '_PROCESSORS', {})
+
+
 @pytest.fixture
 def exr_files(tmpdir):
     """Create test exr files in a temporary directory."""
@@ -54,5 +79,6 @@ def exr_files(tmpdir):
 @pytest.fixture
 def image_converter(mocker):
     """Mock the ImageConverter class."""
+    ImageConverter.reset()
     mocker.patch.object(encodeMovieFx, 'ImageConverter', ImageConverter)
     yield ImageConverter
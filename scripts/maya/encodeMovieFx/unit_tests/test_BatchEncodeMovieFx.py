@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import py
+import pytest
+import subprocess
+import threading
+import time
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import EncodeMovieFx
+from nwave.effects.tools.encodeMovieFx.batchEncodeMovieFx import Shot
+from nwave.effects.tools.encodeMovieFx.batchEncodeMovieFx import \
+    BatchScheduler
+from nwave.effects.tools.encodeMovieFx.batchEncodeMovieFx import \
+    BatchEncodeMovieFx
+
+
+@pytest.fixture
+def shot_folders(tmpdir):
+    """Create the exr files of two shots in temporary directories."""
+    folders = []
+    for shot in ('0010', '0020'):
+        folder = tmpdir.mkdir(shot)
+        for i in range(5):
+            folder.join('999_{}_test.{}.{}'.format(
+                shot, str(i).zfill(4), Settings.IN_IMAGE_EXTENSION
+            )).write('')
+        folders.append(str(folder))
+    yield folders
+
+
+class TestBatchEncodeMovieFx:
+    """Test suite for BatchEncodeMovieFx class."""
+
+    def test_parse_args(self, tmpdir):
+        """Test batch cli argument parsing."""
+        # Test no paths
+        with pytest.raises(SystemExit) as e:
+            BatchEncodeMovieFx([]).parse_args()
+        assert e.value.code == 2
+        with pytest.raises(SystemExit) as e:
+            BatchEncodeMovieFx(['-e', '2']).parse_args()
+        assert e.value.code == 2
+
+        # Test paths and flags in any order
+        batch = BatchEncodeMovieFx(
+            ['a.0001.exr', '-e', '3', 'b/', '-c', '4', '-n', '-p', 'abc']
+        )
+        batch.parse_args()
+        assert batch.paths == ['a.0001.exr', 'b/']
+        assert batch.encoder_count == 3
+        assert batch.shot_args == ['-c', '4', '-n', '-p', 'abc']
+        assert batch.options.thread_count == 4
+        assert not batch.options.use_cache
+        assert batch.options.production_name == 'abc'
+
+        # Test invalid args
+        for args in (
+            ['a.0001.exr', '-e', 'many'],
+            ['a.0001.exr', '-e', '0'],
+            ['a.0001.exr', '-s'],
+            ['a.0001.exr', '-b', 'nuke'],
+        ):
+            with pytest.raises(SystemExit) as e:
+                BatchEncodeMovieFx(args).parse_args()
+            assert e.value.code == 2
+
+        # Test manifest
+        manifest = tmpdir.join('dailies.txt')
+        manifest.write('# dailies\n\nshots/0010\n  /abs/0020/*  \n')
+        batch = BatchEncodeMovieFx(['-m', str(manifest)])
+        batch.parse_args()
+        assert batch.paths == [
+            str(tmpdir.join('shots', '0010')), '/abs/0020/*'
+        ]
+
+        # Test missing manifest
+        with pytest.raises(SystemExit) as e:
+            BatchEncodeMovieFx(
+                ['--manifest', str(tmpdir.join('missing.txt'))]
+            ).parse_args()
+        assert e.value.code == 1
+
+    def test_load_shots(self, mocker, tmpdir, shot_folders):
+        """Test shots built from paths, folders and globs."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+        tmpdir.join('readme.txt').write('')
+        py.path.local(shot_folders[0]).join('999_0010_comp.0001.exr').write('')
+        batch = BatchEncodeMovieFx([
+            os.path.join(shot_folders[0], '999_0010_test.0002.exr'),
+            str(tmpdir.join('00*')),
+            str(tmpdir.join('missing')),
+            str(tmpdir.join('readme.txt')),
+            str(tmpdir.join('999_0030_test.0001.exr')),
+        ])
+        batch.parse_args()
+        shots = batch.load_shots()
+
+        # Test every sequence of the folders, sequence already batched
+        # skipped
+        assert [shot.name for shot in shots] == [
+            '999_0010_test',
+            '999_0010_comp',
+            '999_0020_test',
+            str(tmpdir.join('missing')),
+            str(tmpdir.join('readme.txt')),
+            str(tmpdir.join('999_0030_test.0001.exr')),
+        ]
+        assert shots[0].encode_movie_fx.current_frame == '0002'
+        assert shots[2].encode_movie_fx.current_frame == '0000'
+        assert len(shots[1].in_images) == 1
+        for shot in (shots[0], shots[2]):
+            assert shot.error is None
+            assert len(shot.in_images) == 5
+            assert len(shot.out_images) == 5
+
+        # Test paths which can't be loaded
+        for shot in shots[3:]:
+            assert shot.error is not None
+
+    def test_batch_scheduler(self, mocker):
+        """Test shots encoded once all their images are converted."""
+        # Mock call args aren't thread safe, encodings are listed
+        encoded = []
+        running = []
+        max_running = []
+
+        def _shot(name, image_count):
+            encode_movie_fx = mocker.Mock(out_folder='/no/such/folder')
+
+            def _generate_video():
+                running.append(name)
+                max_running.append(len(running))
+                time.sleep(0.05)
+                running.remove(name)
+                encoded.append(name)
+
+            encode_movie_fx.generate_video.side_effect = _generate_video
+            shot = Shot(name, encode_movie_fx)
+            shot.in_images = [
+                '{}.{}.exr'.format(name, i) for i in range(image_count)
+            ]
+            return shot
+
+        # Test shots encoded as they complete, failed shots skipped
+        shots = [_shot('a', 2), _shot('b', 2), _shot('c', 1)]
+        scheduler = BatchScheduler(shots, 1)
+        scheduler.start()
+        scheduler.put('b.0.exr', 'b.0.png')
+        scheduler.put('b.1.exr', 'b.1.png')
+        scheduler.put('a.0.exr', 'a.0.png')
+        error = subprocess.CalledProcessError(1, 'ocioconvert')
+        scheduler.fail(error, 'a.1.exr')
+        scheduler.join()
+        assert encoded == ['b']
+        assert shots[0].error is error
+        assert shots[1].error is None
+        assert shots[1].elapsed is not None
+
+        # Test shots left unconverted given up
+        assert shots[2].error == 'conversion stopped'
+        assert not shots[2].encode_movie_fx.generate_video.called
+
+        # Test errors not tied to an image reported to unconverted shots
+        shots = [_shot('d', 1)]
+        scheduler = BatchScheduler(shots, 1)
+        scheduler.start()
+        scheduler.fail(error)
+        scheduler.join()
+        assert shots[0].error is error
+
+        # Test encoding errors kept
+        shots = [_shot('e', 1)]
+        shots[0].encode_movie_fx.generate_video.side_effect = error
+        scheduler = BatchScheduler(shots, 1)
+        scheduler.start()
+        scheduler.put('e.0.exr', 'e.0.png')
+        scheduler.join()
+        assert shots[0].error is error
+
+        # Test bounded number of encoders
+        del max_running[:]
+        shots = [_shot(str(i), 1) for i in range(6)]
+        scheduler = BatchScheduler(shots, 2)
+        scheduler.start()
+        threads = [
+            threading.Thread(
+                target=scheduler.put, args=(shot.in_images[0], None)
+            )
+            for shot in shots
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        scheduler.join()
+        assert max(max_running) <= 2
+        assert all(shot.error is None for shot in shots)
+
+    def test_run(self, mocker, shot_folders, capsys):
+        """Test whole batch run operation."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+
+        # Mock call args aren't thread safe, commands are listed
+        conversions = []
+        encodings = []
+        failing = []
+
+        def _check_call(command, **kwargs):
+            if 'lavfi' in command:
+                # Slate rendered by ffmpeg
+                return
+            if command[0] == Settings.FFMPEG:
+                encodings.append(command)
+                return
+            if command[1] in failing:
+                raise subprocess.CalledProcessError(1, command[0])
+            with open(command[3], 'wb') as png:
+                png.write('')
+            conversions.append(command)
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+
+        args = shot_folders + ['-c', '3', '-e', '2', '-b', 'ocioconvert']
+        batch = BatchEncodeMovieFx(args)
+        batch.run()
+
+        # Test frames of all shots converted and every shot encoded
+        assert len(conversions) == 10
+        assert len(encodings) == 2
+        for folder in shot_folders:
+            assert not os.path.exists(
+                os.path.join(folder, Settings.TEMP_FOLDER)
+            )
+        out = capsys.readouterr()[0]
+        assert '2 of 2 shots encoded' in out
+
+        # Test failed shot reported and exit status
+        failing.append(
+            os.path.join(shot_folders[1], '999_0020_test.0003.exr')
+        )
+        del encodings[:]
+        batch = BatchEncodeMovieFx(args + ['-n'])
+        with pytest.raises(SystemExit) as e:
+            batch.run()
+        assert e.value.code == 1
+        assert len(encodings) == 1
+        out = capsys.readouterr()[0]
+        assert '999_0020_test: failed' in out
+        assert '1 of 2 shots encoded' in out
+        assert not os.path.exists(
+            os.path.join(shot_folders[1], Settings.TEMP_FOLDER)
+        )
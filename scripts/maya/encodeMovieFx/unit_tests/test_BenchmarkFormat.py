@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import pytest
+import subprocess
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.benchmarkFormat import BenchmarkFormat
+
+
+class TestBenchmarkFormat:
+    """Test suite for BenchmarkFormat class."""
+
+    def test_run(self, mocker, exr_files, capsys):
+        """Test encoding timed with every intermediate format."""
+        # Test no args
+        with pytest.raises(SystemExit) as e:
+            BenchmarkFormat([]).run()
+        assert e.value.code == 2
+
+        # Mock call args aren't thread safe, commands are listed
+        conversions = []
+        encodings = []
+
+        def _check_call(command, **kwargs):
+            if 'lavfi' in command:
+                # Slate rendered by ffmpeg
+                return
+            if command[0] == Settings.FFMPEG:
+                encodings.append(command)
+                return
+            if command[0] == Settings.OCIO_CONVERT:
+                out_image = command[3]
+            else:
+                out_image = command[-1]
+            with open(out_image, 'wb') as image:
+                image.write('\0' * 1024)
+            conversions.append(out_image)
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+        stream_video = mocker.patch(
+            'nwave.effects.tools.encodeMovieFx.benchmarkScale.'
+            'BenchmarkEncode.stream_video'
+        )
+
+        exr_folder = os.path.dirname(exr_files[0])
+        before = sorted(os.listdir(exr_folder))
+        BenchmarkFormat([exr_files[0], '-c', '4', '-b', 'ocioconvert']).run()
+
+        # Test every image converted with every format, cache disabled
+        image_formats = BenchmarkFormat.formats[:-1]
+        assert len(conversions) == len(exr_files) * len(image_formats)
+        extensions = set(
+            os.path.splitext(out_image)[1] for out_image in conversions
+        )
+        assert extensions == set(['.png', '.ppm', '.tif'])
+        assert len(encodings) == len(image_formats)
+        assert stream_video.call_count == 1
+        assert not os.path.exists(Settings.CACHE_FOLDER)
+
+        # Test nothing written next to the input images
+        assert sorted(os.listdir(exr_folder)) == before
+
+        # Test scratch bytes written reported, none when streaming
+        out = capsys.readouterr()[0]
+        lines = out.splitlines()[-len(BenchmarkFormat.formats):]
+        for line, image_format in zip(lines, BenchmarkFormat.formats):
+            assert line.split()[0] == image_format
+            assert line.split()[-1] == (
+                '0' if image_format == 'stream' else str(len(exr_files))
+            )
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import pytest
+import subprocess
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.benchmarkScale import BenchmarkScale
+
+
+class TestBenchmarkScale:
+    """Test suite for BenchmarkScale class."""
+
+    def test_run(self, mocker, exr_files, capsys):
+        """Test encoding timed at every scale."""
+        # Test no args
+        with pytest.raises(SystemExit) as e:
+            BenchmarkScale([]).run()
+        assert e.value.code == 2
+
+        # Mock call args aren't thread safe, commands are listed
+        conversions = []
+        encodings = []
+
+        def _check_call(command, **kwargs):
+            if 'lavfi' in command:
+                # Slate rendered by ffmpeg
+                return
+            if command[0] == Settings.FFMPEG:
+                encodings.append(command)
+                with open(command[-1], 'wb') as video:
+                    video.write('\0' * 2048)
+                return
+            conversions.append(command)
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+
+        exr_folder = os.path.dirname(exr_files[0])
+        before = sorted(os.listdir(exr_folder))
+        BenchmarkScale([exr_files[0], '-c', '4', '-b', 'ocioconvert']).run()
+
+        # Test every image converted at every scale, cache disabled
+        assert len(conversions) == len(exr_files) * len(BenchmarkScale.scales)
+        resizes = set(
+            command[command.index('--resize') + 1]
+            for command in conversions
+            if '--resize' in command
+        )
+        assert resizes == set(['50%', '25%'])
+        assert len(encodings) == len(BenchmarkScale.scales)
+        assert not os.path.exists(Settings.CACHE_FOLDER)
+        assert not os.path.exists(Settings.SCRATCH_FOLDER)
+
+        # Test nothing written next to the input images
+        assert sorted(os.listdir(exr_folder)) == before
+        for command in encodings:
+            assert not command[-1].startswith(exr_folder)
+            assert not os.path.exists(command[-1])
+
+        # Test results printed
+        out = capsys.readouterr()[0]
+        lines = out.splitlines()[-len(BenchmarkScale.scales):]
+        for line, scale in zip(lines, BenchmarkScale.scales):
+            assert line.split()[0] == scale
+            assert line.split()[-1] == '2'
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import pytest
+import subprocess
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.benchmarkSlate import BenchmarkSlate
+
+
+class TestBenchmarkSlate:
+    """Test suite for BenchmarkSlate class."""
+
+    def test_run(self, mocker, exr_files, capsys):
+        """Test encoding timed with both ui drawing methods."""
+        # Test no args
+        with pytest.raises(SystemExit) as e:
+            BenchmarkSlate([]).run()
+        assert e.value.code == 2
+
+        # Mock call args aren't thread safe, commands are listed
+        conversions = []
+        encodings = []
+        slates = []
+
+        def _check_call(command, **kwargs):
+            if 'lavfi' in command:
+                slates.append(command)
+            elif command[0] == Settings.FFMPEG:
+                encodings.append(command)
+            else:
+                with open(command[3], 'wb') as png:
+                    png.write('')
+                conversions.append(command)
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+
+        exr_folder = os.path.dirname(exr_files[0])
+        before = sorted(os.listdir(exr_folder))
+        BenchmarkSlate([exr_files[0], '-c', '4', '-b', 'ocioconvert']).run()
+
+        # Test images converted once, encoded repeatedly with each method
+        assert len(conversions) == len(exr_files)
+        repeat = BenchmarkSlate.repeat
+        assert len(encodings) == 2 * repeat
+        assert len(slates) == repeat
+
+        # Test whole ui drawn on every frame, then slate overlaid
+        for command in encodings[:repeat]:
+            graph = command[command.index('-filter_complex') + 1]
+            assert graph.count('drawtext') == 6
+            assert 'overlay' not in graph
+            assert command.count('-i') == 1
+        for command in encodings[repeat:]:
+            graph = command[command.index('-filter_complex') + 1]
+            assert graph.count('drawtext') == 1
+            assert 'overlay' in graph
+            assert command.count('-i') == 2
+
+        # Test nothing written next to the input images
+        assert sorted(os.listdir(exr_folder)) == before
+
+        # Test results printed
+        out = capsys.readouterr()[0]
+        lines = out.splitlines()[-2:]
+        assert [line.split()[0] for line in lines] == ['drawtext', 'overlay']
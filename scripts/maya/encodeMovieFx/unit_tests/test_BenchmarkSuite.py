@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import json
+import pytest
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx import benchmarkSuite
+from nwave.effects.tools.encodeMovieFx.benchmarkSuite import BenchmarkSuite
+from nwave.effects.tools.encodeMovieFx.benchmarkSuite import make_sequence
+
+
+class TestBenchmarkSuite:
+    """Test suite for BenchmarkSuite class."""
+
+    def test_parse_args(self):
+        """Test benchmark cli argument parsing."""
+        suite = BenchmarkSuite([])
+        suite.parse_args()
+        assert suite.resolution == (1920, 1080)
+        assert not suite.stub
+
+        suite = BenchmarkSuite([
+            '-x', '64x32', '-l', '5', '-c', '2,8', '--image_formats',
+            'png0,tiff', '-s', '-o', 'new.json', '-C', 'old.json'
+        ])
+        suite.parse_args()
+        assert suite.resolution == (64, 32)
+        assert suite.length == 5
+        assert suite.thread_counts == [2, 8]
+        assert suite.image_formats == ['png0', 'tiff']
+        assert suite.stub
+        assert suite.out_path == 'new.json'
+        assert suite.compare_path == 'old.json'
+
+        # Test invalid args
+        for args in (
+            ['-x', '64'], ['-l', 'many'], ['-c', '0'], ['-f', 'jpg'], ['-w'],
+        ):
+            with pytest.raises(SystemExit) as e:
+                BenchmarkSuite(args).parse_args()
+            assert e.value.code == 2
+
+    def test_make_sequence(self, mocker, tmpdir):
+        """Test synthetic sequences written without OpenImageIO."""
+        mocker.patch.object(benchmarkSuite, 'oiio', None)
+        path = make_sequence(str(tmpdir), 16, 8, 3)
+        assert os.path.basename(path) == '999_0010_benchmark.0001.exr'
+        names = sorted(os.listdir(str(tmpdir)))
+        assert names[-1] == '999_0010_benchmark.0003.exr'
+        assert len(names) == 3
+        assert os.path.getsize(path) == 16 * 8 * 4 * 2
+
+    def test_run(self, mocker, tmpdir, capsys):
+        """Test cases run with the stub executables and compared."""
+        out_path = str(tmpdir.join('results.json'))
+        args = [
+            '-s', '-x', '16x8', '-l', '3', '-c', '1,2', '-f', 'png,ppm',
+            '-o', out_path,
+        ]
+        BenchmarkSuite(args).run()
+
+        # Test every format and thread count measured
+        with open(out_path) as results_file:
+            report = json.load(results_file)
+        assert report['resolution'] == '16x8'
+        assert [
+            (result['image_format'], result['thread_count'])
+            for result in report['results']
+        ] == [('png', 1), ('png', 2), ('ppm', 1), ('ppm', 2)]
+        for result in report['results']:
+            assert result['frames'] == 3
+            assert result['frames_per_second'] > 0
+            # Converted images and the video
+            assert result['bytes_written'] >= 3 * 16 * 8 * 3 + 1024
+            assert result['peak_rss_kb'] > 0
+        out = capsys.readouterr()[0]
+        assert 'frames/s' in out
+
+        # Test results compared with previous faster results
+        for result in report['results']:
+            result['frames_per_second'] *= 1000
+        with open(out_path, 'w') as results_file:
+            json.dump(report, results_file)
+        with pytest.raises(SystemExit) as e:
+            BenchmarkSuite(
+                args[:-2] + ['-f', 'png', '-C', out_path]
+            ).run()
+        assert e.value.code == 1
+        out = capsys.readouterr()[0]
+        assert out.count('REGRESSION') == 2
+
+        # Test no exr images written without OpenImageIO unless stubbed
+        mocker.patch.object(benchmarkSuite, 'oiio', None)
+        with pytest.raises(SystemExit) as e:
+            BenchmarkSuite(['-l', '1']).run()
+        assert e.value.code == 1
+        assert not os.path.exists(Settings.CACHE_FOLDER)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import time
+import errno
+import stat
+
+from nwave.effects.tools.encodeMovieFx.conversionCache import ConversionCache
+from nwave.effects.tools.encodeMovieFx.conversionCache import hash_file
+
+
+class TestConversionCache:
+    """Test suite for ConversionCache class."""
+
+    def test_entry(self, tmpdir):
+        """Test entry keys."""
+        in_image = tmpdir.join('in.0001.exr')
+        in_image.write('exr')
+        in_image = str(in_image)
+        cache = ConversionCache(str(tmpdir.join('cache')), 0, ('ocio',))
+
+        # Test entries in the cache folder with the converted extension
+        entry = cache.entry(in_image, 'png')
+        assert entry.startswith(cache.folder)
+        assert entry.endswith('.png')
+        assert cache.entry(in_image, 'png') == entry
+
+        # Test key changes with the extension and settings
+        assert cache.entry(in_image, 'ppm') != entry
+        other_cache = ConversionCache(cache.folder, 0, ('lut',))
+        assert other_cache.entry(in_image, 'png') != entry
+
+        # Test key changes with the image time and size
+        os.utime(in_image, (0, 0))
+        assert cache.entry(in_image, 'png') != entry
+        entry = cache.entry(in_image, 'png')
+        with open(in_image, 'w') as exr:
+            exr.write('new exr')
+        os.utime(in_image, (0, 0))
+        assert cache.entry(in_image, 'png') != entry
+
+        # Test key changes with the content when hashed
+        hashed_cache = ConversionCache(cache.folder, 0, ('ocio',), True)
+        entry = hashed_cache.entry(in_image, 'png')
+        with open(in_image, 'w') as exr:
+            exr.write('old exr')
+        os.utime(in_image, (0, 0))
+        assert cache.entry(in_image, 'png') == \
+            cache.entry(in_image, 'png')
+        assert hashed_cache.entry(in_image, 'png') != entry
+
+    def test_content_addressed(self, mocker, tmpdir):
+        """Test entries shared by identical images of any folder."""
+        store = ConversionCache(
+            str(tmpdir.join('store')), 0, ('ocio',), content_addressed=True
+        )
+        in_images = []
+        for folder in ('a', 'b'):
+            in_image = tmpdir.mkdir(folder).join('in.0001.exr')
+            in_image.write('exr')
+            in_images.append(str(in_image))
+        os.utime(in_images[1], (0, 0))
+
+        # Test key from the content and settings only
+        entry = store.entry(in_images[0], 'png')
+        assert store.entry(in_images[1], 'png') == entry
+        other_store = ConversionCache(
+            store.folder, 0, ('lut',), content_addressed=True
+        )
+        assert other_store.entry(in_images[0], 'png') != entry
+        with open(in_images[1], 'w') as exr:
+            exr.write('new exr')
+        assert store.entry(in_images[1], 'png') != entry
+
+        # Test entries and folders written for every user of the group
+        store.write(entry, 'png')
+        for path, mode in (
+            (entry, ConversionCache.SHARED_FILE_MODE),
+            (os.path.dirname(entry), ConversionCache.SHARED_FOLDER_MODE),
+            (store.folder, ConversionCache.SHARED_FOLDER_MODE),
+        ):
+            assert stat.S_IMODE(os.stat(path).st_mode) == mode
+
+        # Test entries of other users used without being marked as used
+        mocker.patch.object(
+            os, 'utime', side_effect=OSError(errno.EPERM, 'not owner')
+        )
+        assert store.fetch(entry)
+        assert not store.fetch(entry + '.missing')
+        assert (store.hits, store.misses) == (1, 1)
+
+    def test_store_fetch(self, tmpdir):
+        """Test storing and fetching entries."""
+        cache = ConversionCache(str(tmpdir.join('cache')), 0, ())
+        entry = os.path.join(cache.folder, 'ab', 'abc.png')
+
+        assert not cache.fetch(entry)
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        # Test copied entries
+        image = tmpdir.join('image.png')
+        image.write('png')
+        cache.store(entry, str(image))
+        os.utime(entry, (0, 0))
+        assert cache.fetch(entry)
+        assert (cache.hits, cache.misses) == (1, 1)
+        with open(entry) as cached:
+            assert cached.read() == 'png'
+        # Test fetched entries marked as used
+        assert os.path.getmtime(entry) > 0
+
+        # Test written entries and no temporary file left
+        cache.write(entry, 'new png')
+        with open(entry) as cached:
+            assert cached.read() == 'new png'
+        assert os.listdir(os.path.dirname(entry)) == ['abc.png']
+
+    def test_evict(self, tmpdir):
+        """Test least recently used entries evicted."""
+        cache = ConversionCache(str(tmpdir.join('cache')), 25, ())
+        entries = []
+        for index in range(4):
+            entry = os.path.join(
+                cache.folder, str(index), '{}.png'.format(index)
+            )
+            cache.write(entry, 'x' * 10)
+            os.utime(entry, (index, index))
+            entries.append(entry)
+        # Entry 0 is the most recently used
+        os.utime(entries[0], (10, 10))
+
+        # Test entries being written kept, unless left by killed processes
+        temp_paths = []
+        for age in (0, ConversionCache.STALE_TEMP_AGE + 1):
+            temp_path = os.path.join(cache.folder, '0', '.tmp{}'.format(age))
+            with open(temp_path, 'w') as temp:
+                temp.write('x' * 10)
+            os.utime(temp_path, (time.time() - age,) * 2)
+            temp_paths.append(temp_path)
+
+        assert cache.evict() == 2
+        assert [os.path.exists(path) for path in entries] == \
+            [True, False, False, True]
+        assert [os.path.exists(path) for path in temp_paths] == \
+            [True, False]
+        assert cache.evict() == 0
+
+    def test_hash_file(self, tmpdir):
+        """Test hashing file content."""
+        path = tmpdir.join('file')
+        path.write('abc')
+        assert hash_file(str(path)) == \
+            'a9993e364706816aba3e25717850c26c9cd0d89d'
+        assert hash_file(str(path), chunk_size=1) == hash_file(str(path))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import subprocess
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx import encodeApi
+from nwave.effects.tools.encodeMovieFx.encodeApi import EncodeJob
+from nwave.effects.tools.encodeMovieFx.encodeApi import JobEncode
+from nwave.effects.tools.encodeMovieFx.encodeApi import encode_movie
+
+
+class TestEncodeApi:
+    """Test suite for the encode_movie function."""
+
+    def test_encode_movie(self, mocker, exr_files, tmpdir):
+        """Test jobs encoded in process, without prompt nor exit."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+        failing = set()
+        encoded = []
+
+        def _check_call(command, **kwargs):
+            if command[0] != Settings.OCIO_CONVERT:
+                encoded.append(command)
+                return
+            if command[1] in failing:
+                raise subprocess.CalledProcessError(1, command)
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+        check_output = mocker.patch.object(subprocess, 'check_output')
+        raw_input = mocker.patch('__builtin__.raw_input')
+
+        # Test result of an encoded job, the movie isn't opened
+        result = encode_movie(EncodeJob(
+            exr_files[0], thread_count=4, backend='ocioconvert',
+            outputs=['mov', 'mp4'], use_cache=False
+        ))
+        assert result.succeeded
+        assert result.error is None
+        folder = os.path.dirname(exr_files[0])
+        assert result.movie == os.path.join(folder, '999_0010_test.mov')
+        assert result.outputs == {
+            'mov': result.movie,
+            'mp4': os.path.join(folder, '999_0010_test.mp4'),
+        }
+        assert result.frame_count == len(exr_files)
+        assert sorted(converted) == sorted(exr_files)
+        assert len(encoded) == 2
+        assert set(result.timings) == set(['convert', 'encode', 'total'])
+        assert result.timings['total'] >= result.timings['convert']
+        assert not check_output.called
+        assert not os.path.exists(
+            os.path.join(folder, '999_0010_test{}'.format(
+                Settings.PROFILE_SUFFIX
+            ))
+        )
+
+        # Test failed conversion reported in the result
+        failing.add(exr_files[50])
+        result = encode_movie(EncodeJob(
+            exr_files[0], thread_count=4, backend='ocioconvert',
+            use_cache=False, profile=True
+        ))
+        assert not result.succeeded
+        assert isinstance(result.error, subprocess.CalledProcessError)
+        assert result.movie is None
+        assert result.outputs == {}
+        assert 'convert' in result.timings
+        # Test profile written when asked for
+        assert os.path.exists(
+            os.path.join(folder, '999_0010_test{}'.format(
+                Settings.PROFILE_SUFFIX
+            ))
+        )
+
+        # Test invalid settings and file names reported in the result
+        for job in (
+            EncodeJob(exr_files[0], backend='x'),
+            EncodeJob(exr_files[0], outputs=['mov', 'gif']),
+            EncodeJob(exr_files[0], scale='0'),
+            EncodeJob(exr_files[0], segment_count=0),
+            EncodeJob(exr_files[0], coordinator_address='render01:port'),
+            EncodeJob(exr_files[0], stream=True, resume=True),
+            EncodeJob(str(tmpdir.join('999_0010_test.exr'))),
+            EncodeJob(str(tmpdir.join('999_0010_test.0001.png'))),
+        ):
+            result = encode_movie(job)
+            assert isinstance(result.error, ValueError)
+
+        # Test title required when the file name has none, never asked
+        masterlayer = tmpdir.join('999_0010_masterlayer.0001.exr')
+        masterlayer.write('')
+        failing.clear()
+        result = encode_movie(EncodeJob(str(masterlayer)))
+        assert isinstance(result.error, ValueError)
+        assert 'title' in str(result.error)
+        del encoded[:]
+        result = encode_movie(EncodeJob(
+            str(masterlayer), title='fx', backend='ocioconvert',
+            username='artist'
+        ))
+        assert result.succeeded
+        assert result.frame_count == 1
+        assert 'fx' in ' '.join(encoded[0])
+        assert 'Artist\\: artist' in ' '.join(encoded[0])
+        assert not raw_input.called
+
+        # Test errors setting the encoding up reported in the result
+        mocker.patch.object(
+            encodeApi, 'JobEncode', side_effect=OSError('no user')
+        )
+        result = encode_movie(EncodeJob(exr_files[0]))
+        assert isinstance(result.error, OSError)
+        assert result.frame_count is None
+        assert 'total' in result.timings
+
+    def test_prepare(self, exr_files):
+        """Test cli style settings of a job parsed."""
+        encode = JobEncode(EncodeJob(
+            exr_files[0], scale='1/2', segment_count='auto',
+            coordinator_address='7510', outputs=('mov',)
+        ))
+        encode.prepare()
+        assert encode.scale == 0.5
+        assert encode.segment_count >= 1
+        assert encode.coordinator_address == ('', 7510)
+        assert encode.outputs == ['mov']
+        assert encode.title == 'test'
+        assert encode.thread_count == Settings.DEFAULT_THREAD_COUNT
+
+        encode = JobEncode(EncodeJob(
+            exr_files[0], scale=[1920, 1080], title='fx'
+        ))
+        encode.prepare()
+        assert encode.scale == (1920, 1080)
+        assert encode.title == 'fx'
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import time
+import socket
+import pytest
+import subprocess
+import threading
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import EncodeMovieFx
+from nwave.effects.tools.encodeMovieFx import encodeClient
+from nwave.effects.tools.encodeMovieFx.encodeClient import EncodeClient
+from nwave.effects.tools.encodeMovieFx.encodeClient import request
+from nwave.effects.tools.encodeMovieFx.encodeDaemon import EncodeDaemon
+
+
+def wait_for_status(socket_path, job_id, status, timeout=10.0):
+    """Wait for a job of the daemon to reach a status."""
+    start = time.time()
+    while True:
+        info = request(socket_path, {'status': job_id})['jobs'][0]
+        if info['status'] == status:
+            return info
+        assert time.time() - start < timeout
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def daemon(tmpdir):
+    """Run a daemon with a single job thread and queue slot."""
+    socket_path = str(tmpdir.join('daemon.sock'))
+    daemon = EncodeDaemon(['-k', socket_path, '-q', '1'])
+    daemon.parse_args()
+    daemon.start()
+    yield daemon
+    daemon.stop()
+
+
+class TestEncodeDaemon:
+    """Test suite for EncodeDaemon and EncodeClient classes."""
+
+    def test_parse_args(self):
+        """Test daemon and client cli argument parsing."""
+        daemon = EncodeDaemon(['-k', 'daemon.sock', '-q', '4', '-J', '2'])
+        daemon.parse_args()
+        assert daemon.socket_path == 'daemon.sock'
+        assert daemon.queue_size == 4
+        assert daemon.job_count == 2
+        for args in (['-q', '0'], ['-J', 'x'], ['extra'], ['-x']):
+            with pytest.raises(SystemExit) as e:
+                EncodeDaemon(args).parse_args()
+            assert e.value.code == 2
+
+        # Test job args passed as is, with an absolute path
+        client = EncodeClient(
+            ['--detach', '-k', 'daemon.sock', 'a.0001.exr', '-c', '4', '-s']
+        )
+        client.parse_args()
+        assert client.detach
+        assert client.socket_path == 'daemon.sock'
+        assert client.job_args == [os.path.abspath('a.0001.exr'), '-c', '4',
+                                   '-s']
+        client = EncodeClient(['--status', '3'])
+        client.parse_args()
+        assert client.status
+        assert client.job_args == ['3']
+        for args in ([], ['--status', 'x'], ['-x', 'a.0001.exr']):
+            with pytest.raises(SystemExit) as e:
+                EncodeClient(args).parse_args()
+            assert e.value.code == 2
+
+    def test_jobs(self, mocker, daemon, exr_files, tmpdir, capsys):
+        """Test jobs queued, encoded in order and queried."""
+        release = threading.Event()
+        encoded = []
+
+        def _encode(encode_movie_fx):
+            release.wait()
+            if '-P' in encode_movie_fx.args:
+                raise IOError('ffmpeg crashed')
+            encode_movie_fx.out_filepath = encode_movie_fx.get_out_filepath()
+            encoded.append(encode_movie_fx)
+
+        mocker.patch.object(
+            EncodeMovieFx, 'encode', autospec=True, side_effect=_encode
+        )
+        socket_path = daemon.socket_path
+
+        def _submit(args, title=None):
+            return request(
+                socket_path, {'submit': [exr_files[0]] + args, 'title': title}
+            )
+
+        # Test job encoded by the job thread
+        first = _submit([])['job']
+        wait_for_status(socket_path, first, encodeClient.JOB_RUNNING)
+
+        # Test queued job position and bounded queue
+        second = _submit(['-P'])['job']
+        info = request(socket_path, {'status': second})['jobs'][0]
+        assert info['status'] == encodeClient.JOB_QUEUED
+        assert info['position'] == 1
+        assert 'full' in _submit([])['error']
+
+        # Test invalid args refused with the usage
+        answer = _submit(['-g', '0'])
+        assert answer['usage'] == EncodeMovieFx.cli_usage
+        answer = request(socket_path, {'submit': [str(tmpdir.join('a.exr'))]})
+        assert answer['error'].startswith('Wrong file name')
+
+        # Test title asked to the client when missing from the file name
+        masterlayer = tmpdir.join('999_0010_masterlayer.0001.exr')
+        masterlayer.write('')
+        answer = request(socket_path, {'submit': [str(masterlayer)]})
+        assert answer == {'title_required': True}
+
+        # Test jobs outcome
+        release.set()
+        info = wait_for_status(socket_path, first, encodeClient.JOB_DONE)
+        assert info['movie'] == encoded[0].out_filepath
+        info = wait_for_status(socket_path, second, encodeClient.JOB_FAILED)
+        assert info['error'] == 'ffmpeg crashed'
+        jobs = request(socket_path, {'status': None})['jobs']
+        assert [job['id'] for job in jobs] == [first, second]
+        assert request(socket_path, {'status': 99})['jobs'] == []
+
+        # Test status printed by the client
+        capsys.readouterr()
+        EncodeClient(['-k', socket_path, '--status']).run()
+        out = capsys.readouterr()[0]
+        assert 'Job {} done'.format(first) in out
+        assert 'Job {} failed: ffmpeg crashed'.format(second) in out
+
+        # Test client waiting for the movie and opening it
+        check_output = mocker.patch.object(subprocess, 'check_output')
+        mocker.patch.object(encodeClient, 'STATUS_INTERVAL', 0.01)
+        EncodeClient(['-k', socket_path, exr_files[0]]).run()
+        assert check_output.call_args[0][0] == [
+            encodeClient.LINUX_OPEN_FILE, encoded[-1].out_filepath
+        ]
+        # Test title entered on the client
+        mocker.patch('__builtin__.raw_input', return_value='title')
+        EncodeClient(['-k', socket_path, str(masterlayer)]).run()
+        assert encoded[-1].title == 'title'
+        # Test movie signed by the user of the client
+        mocker.patch.object(encodeClient, 'user_name', return_value='artist')
+        EncodeClient(['-k', socket_path, exr_files[0]]).run()
+        assert encoded[-1].username == 'artist'
+
+        # Test failed job
+        with pytest.raises(SystemExit) as e:
+            EncodeClient(['-k', socket_path, exr_files[0], '-P']).run()
+        assert e.value.code == 1
+
+        # Test unreachable daemon
+        with pytest.raises(SystemExit) as e:
+            EncodeClient(
+                ['-k', str(tmpdir.join('missing.sock')), '--status']
+            ).run()
+        assert e.value.code == 1
+
+    def test_socket(self, mocker, tmpdir):
+        """Test socket left by a killed daemon reused, and kept private."""
+        socket_path = str(tmpdir.join('daemon.sock'))
+
+        def _daemon():
+            daemon = EncodeDaemon(['-k', socket_path])
+            daemon.parse_args()
+            return daemon
+
+        # Test another daemon refused while the first one runs
+        daemon = _daemon()
+        daemon.start()
+        assert len(daemon.runners) == Settings.DAEMON_JOB_COUNT
+        assert os.stat(socket_path).st_mode & 0o777 == encodeClient.SOCKET_MODE
+        with pytest.raises(IOError):
+            _daemon().start()
+        daemon.stop()
+        assert not os.path.exists(socket_path)
+
+        # Test socket file nobody listens on replaced
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        daemon = _daemon()
+        daemon.start()
+        assert request(socket_path, {'status': None}) == {'jobs': []}
+
+        # Test sockets of other users neither reached nor replaced
+        mocker.patch.object(os, 'getuid', return_value=os.getuid() + 1)
+        with pytest.raises(IOError):
+            request(socket_path, {'status': None})
+        daemon.stop()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(socket_path)
+        stale.close()
+        with pytest.raises(IOError):
+            _daemon().start()
+        assert os.path.exists(socket_path)
@@ -2,12 +2,58 @@
 """DOCSTRING."""
 
 import os
+import numpy
+import py
 import pytest
 import shutil
 import subprocess
+import threading
+import time
+import json
+import getpass
+import Queue
+import struct
 
 from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
 from nwave.effects.tools.encodeMovieFx.encodeMovieFx import EncodeMovieFx
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import ImageConverter
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import ThreadCountTuner
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import RunProfile
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import OcioConvertBackend
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import OcioBackend
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import LutBackend
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import CachedBackend
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import ppm_data
+from nwave.effects.tools.encodeMovieFx.conversionCache import ConversionCache
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import shaper
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import inverse_shaper
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import apply_lut
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import load_lut
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import lut_path
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import FrameStreamer
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import ImageFileStreamer
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import read_ppm
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import read_exr_size
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import frame_number
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import parse_scale
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import scaled_size
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import resize_image
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import find_duplicates
+from nwave.effects.tools.encodeMovieFx import encodeMovieFx
+
+
+def exr_header(width, height):
+    """Build the header of an exr image."""
+    attributes = [
+        ('channels', 'chlist',
+         'R\0' + struct.pack('<iBBBBii', 1, 0, 0, 0, 0, 1, 1) + '\0'),
+        ('dataWindow', 'box2i',
+         struct.pack('<iiii', 10, 20, 10 + width - 1, 20 + height - 1)),
+    ]
+    return struct.pack('<ii', 20000630, 2) + ''.join(
+        name + '\0' + kind + '\0' + struct.pack('<i', len(value)) + value
+        for name, kind, value in attributes
+    ) + '\0'
 
 
 class TestEncodeMovieFx:
@@ -29,6 +75,13 @@ class TestEncodeMovieFx:
         assert encode_movie.out_filepath is None
         assert encode_movie.username == os.environ['USERNAME']
 
+    def test_init_username(self, mocker):
+        """Test user name read from the system without USERNAME."""
+        mocker.patch.dict(os.environ)
+        del os.environ['USERNAME']
+        mocker.patch.object(getpass, 'getuser', return_value='render')
+        assert EncodeMovieFx([]).username == 'render'
+
     def test_arg_parser(self, mocker):
         """Test tool cli argument parsing."""
         # Test no args
@@ -60,6 +113,22 @@ class TestEncodeMovieFx:
         encode_movie_fx.parse_args()
         assert encode_movie_fx.thread_count == thread_count
 
+        # Test auto thread_count arg
+        args = [
+            '999_0010_abc_beauty_v00_persp.0010.exr',
+            '-c', Settings.AUTO_THREAD_COUNT
+        ]
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.thread_count == Settings.AUTO_THREAD_COUNT
+
+        # Test invalid thread_count arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr', '-c', 'many']
+        encode_movie_fx = EncodeMovieFx(args)
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.parse_args()
+        assert e.value.code == 2
+
         # Test production_name arg
         prod_name = 'abc'
         args = [
@@ -69,6 +138,135 @@ class TestEncodeMovieFx:
         encode_movie_fx.parse_args()
         assert encode_movie_fx.production_name == prod_name
 
+        # Test backend arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.backend == Settings.DEFAULT_BACKEND
+        for backend in (
+            Settings.OCIO_BACKEND,
+            Settings.OCIO_CONVERT_BACKEND,
+            Settings.LUT_BACKEND,
+        ):
+            encode_movie_fx = EncodeMovieFx(args + ['-b', backend])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.backend == backend
+        encode_movie_fx = EncodeMovieFx(args + ['--backend', 'nuke'])
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.parse_args()
+        assert e.value.code == 2
+
+        # Test cache args
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.use_cache
+        assert not encode_movie_fx.hash_content
+        encode_movie_fx = EncodeMovieFx(args + ['-n', '--hash'])
+        encode_movie_fx.parse_args()
+        assert not encode_movie_fx.use_cache
+        assert encode_movie_fx.hash_content
+
+        # Test dedupe arg
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert not encode_movie_fx.dedupe
+        for flag in Settings.DEDUPE_FLAG:
+            encode_movie_fx = EncodeMovieFx(args + [flag])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.dedupe
+
+        # Test store arg
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.store_folder is None
+        for flag in Settings.STORE_FLAG:
+            encode_movie_fx = EncodeMovieFx(args + [flag, 'store'])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.store_folder == 'store'
+
+        # Test stream arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert not encode_movie_fx.stream
+        for flag in Settings.STREAM_FLAG:
+            encode_movie_fx = EncodeMovieFx(args + [flag])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.stream
+
+        # Test pipeline arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert not encode_movie_fx.pipeline
+        for flag in Settings.PIPELINE_FLAG:
+            encode_movie_fx = EncodeMovieFx(args + [flag])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.pipeline
+
+        # Test scale arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.scale is None
+        encode_movie_fx = EncodeMovieFx(args + ['-S', '1/2'])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.scale == 0.5
+        encode_movie_fx = EncodeMovieFx(args + ['--scale', '960x540'])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.scale == (960, 540)
+        encode_movie_fx = EncodeMovieFx(args + ['--scale', 'half'])
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.parse_args()
+        assert e.value.code == 2
+
+        # Test outputs arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.outputs == Settings.DEFAULT_OUTPUTS
+        encode_movie_fx = EncodeMovieFx(
+            args + ['-o', 'mp4, poster,mp4,contact_sheet']
+        )
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.outputs == ['mp4', 'poster', 'contact_sheet']
+        encode_movie_fx = EncodeMovieFx(args + ['--outputs', 'mov,avi'])
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.parse_args()
+        assert e.value.code == 2
+
+        # Test segments arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.segment_count == 1
+        encode_movie_fx = EncodeMovieFx(args + ['-g', '6'])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.segment_count == 6
+        mocker.patch.object(encodeMovieFx, 'cpu_count', return_value=12)
+        encode_movie_fx = EncodeMovieFx(args + ['--segments', 'auto'])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.segment_count == 12
+        for segments in ('0', 'many'):
+            encode_movie_fx = EncodeMovieFx(args + ['-g', segments])
+            with pytest.raises(SystemExit) as e:
+                encode_movie_fx.parse_args()
+            assert e.value.code == 2
+
+        # Test image format arg
+        args = ['999_0010_abc_beauty_v00_persp.0010.exr']
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.image_format == Settings.DEFAULT_IMAGE_FORMAT
+        encode_movie_fx = EncodeMovieFx(args + ['-f', 'tiff'])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.image_format == 'tiff'
+        encode_movie_fx = EncodeMovieFx(args + ['--image_format', 'jpg'])
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.parse_args()
+        assert e.value.code == 2
+
         # Test help flag
         args = [
             '999_0010_abc_beauty_v00_persp.0010.exr', '-h'
@@ -153,14 +351,90 @@ class TestEncodeMovieFx:
         filename, _ = os.path.splitext(filename)
         filename, frame_num = filename.split('.')
         assert encode_movie_fx.in_folder == folder
-        assert encode_movie_fx.out_folder == os.path.normpath(
-            os.path.join(folder, Settings.TEMP_FOLDER)
+        assert os.path.dirname(encode_movie_fx.out_folder) == \
+            Settings.SCRATCH_FOLDER
+        assert os.path.basename(encode_movie_fx.out_folder).startswith(
+            filename
         )
         assert encode_movie_fx.filename == filename
         assert encode_movie_fx.current_frame == frame_num
         assert encode_movie_fx.seq_shot == '999_0010'
         assert encode_movie_fx.title == 'abc'
 
+    def test_out_folder(self, mocker, tmpdir, exr_files, capsys):
+        """Test converted images folder in the scratch folder."""
+        free_space = mocker.patch.object(
+            encodeMovieFx, 'free_space', return_value=1024 ** 4
+        )
+        network_folder = os.path.join(
+            os.path.dirname(exr_files[0]), Settings.TEMP_FOLDER
+        )
+
+        def _out_folder(args):
+            encode_movie_fx = EncodeMovieFx([exr_files[0]] + args)
+            encode_movie_fx.parse_args()
+            encode_movie_fx.parse_filename()
+            return encode_movie_fx.out_folder
+
+        # Test unique folder in the scratch folder, not created
+        out_folder = _out_folder([])
+        assert os.path.dirname(out_folder) == Settings.SCRATCH_FOLDER
+        assert not os.path.exists(out_folder)
+        assert _out_folder([]) != out_folder
+        assert free_space.call_args[0][0] == Settings.SCRATCH_FOLDER
+
+        # Test scratch folder passed to the cli
+        scratch = str(tmpdir.join('ssd'))
+        assert os.path.dirname(_out_folder(['-t', scratch])) == scratch
+        assert os.path.isdir(scratch)
+
+        # Test network folder
+        out_folder = _out_folder(['--scratch', Settings.NETWORK_SCRATCH])
+        assert os.path.dirname(out_folder) == network_folder
+
+        # Test fall back on the network folder when space is missing
+        needed = (
+            len(exr_files) * Settings.SCRATCH_IMAGE_SIZE +
+            Settings.SCRATCH_MIN_FREE
+        )
+        free_space.return_value = needed - 1
+        assert os.path.dirname(_out_folder([])) == network_folder
+        assert 'Not enough space' in capsys.readouterr()[0]
+        # Smaller images at a smaller scale
+        assert os.path.dirname(_out_folder(['-S', '1/2'])) == \
+            Settings.SCRATCH_FOLDER
+        free_space.return_value = needed
+
+        # Test fall back on the network folder when it can't be created
+        readonly = str(tmpdir.join('readonly'))
+        makedirs = os.makedirs
+
+        def _makedirs(path, *args):
+            if path.startswith(readonly):
+                raise OSError('denied')
+            makedirs(path, *args)
+
+        mocker.patch.object(os, 'makedirs', side_effect=_makedirs)
+        out_folder = _out_folder(['-t', readonly])
+        assert os.path.dirname(out_folder) == network_folder
+
+        # Test network TEMP folder deleted with the last job folder
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[0], '-t', Settings.NETWORK_SCRATCH]
+        )
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        other_folder = os.path.join(network_folder, 'other_job')
+        os.makedirs(other_folder)
+        os.makedirs(encode_movie_fx.out_folder)
+        encode_movie_fx.remove_out_folder()
+        assert not os.path.exists(encode_movie_fx.out_folder)
+        assert os.path.exists(other_folder)
+        os.rmdir(other_folder)
+        os.makedirs(encode_movie_fx.out_folder)
+        encode_movie_fx.remove_out_folder()
+        assert not os.path.exists(network_folder)
+
     def test_get_image_list(self, exr_files):
         """Test getting input and output images."""
         encode_movie_fx = EncodeMovieFx([exr_files[0]])
@@ -178,59 +452,1310 @@ class TestEncodeMovieFx:
         assert in_images[0].startswith(encode_movie_fx.in_folder)
         assert out_images[0].startswith(encode_movie_fx.out_folder)
 
-    def test_split_into_buckets(self, exr_files):
-        """Test splitting images into buckets."""
-        # Convenience function to run tests
-        def _run(args):
-            encode_movie_fx = EncodeMovieFx(args)
-            encode_movie_fx.parse_args()
-            encode_movie_fx.parse_filename()
-            in_images, _ = encode_movie_fx.get_image_lists()
-            return encode_movie_fx.split_into_buckets(in_images)
+        # Test image format extension
+        encode_movie_fx = EncodeMovieFx([exr_files[0], '-f', 'tiff'])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        _, out_images = encode_movie_fx.get_image_lists()
+        assert out_images[0].endswith('.tif')
+        args = encode_movie_fx.image_input_args('0000')
+        assert args[args.index('-i') + 1].endswith('.%4d.tif')
+
+    def test_get_image_list_sequence(self, mocker, tmpdir, capsys):
+        """Test images of other sequences, gaps and duplicates."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+        folder = tmpdir.mkdir('exr')
+        for name in (
+            'shot.0999.exr', 'shot.1000.exr', 'shot.1003.exr', 'shot.999.exr',
+            'shot_v2.1000.exr', 'shot.1000.exr.bak', 'shot.1001.jpg',
+        ):
+            folder.join(name).write('')
+        encode_movie_fx = EncodeMovieFx([str(folder.join('shot.0999.exr'))])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        in_images, out_images = encode_movie_fx.get_image_lists()
 
-        # Test normal case
-        buckets = list(_run([exr_files[0]]))
-        assert len(buckets) == EncodeMovieFx([]).thread_count
+        # Test only the images of the sequence, in frame order
+        assert [os.path.basename(image) for image in in_images] == [
+            'shot.0999.exr', 'shot.1000.exr', 'shot.1003.exr'
+        ]
+        assert [os.path.basename(image) for image in out_images] == [
+            'shot.0999.png', 'shot.1000.png', 'shot.1003.png'
+        ]
 
-        # Test modified thread count
-        thread_count = 10
-        buckets = list(_run([exr_files[0], '-c', thread_count]))
-        assert len(buckets) == thread_count
+        # Test gaps and duplicates reported
+        out = capsys.readouterr()[0]
+        assert 'shot.999.exr' in out
+        assert 'Frames 1001 to 1002 are missing.' in out
+
+        # Test missing sequence
+        encode_movie_fx.filename = 'other'
+        assert encode_movie_fx.get_image_lists() == ([], [])
+
+    def test_image_converter(self, mocker):
+        """Test images are pulled from the queue until None is reached."""
+        subprocess_mock = mocker.patch.object(subprocess, 'check_call')
+
+        queue = Queue.Queue()
+        pairs = [
+            ('in_{}.exr'.format(i), 'out_{}.png'.format(i)) for i in range(3)
+        ]
+        for pair in pairs:
+            queue.put(pair)
+        queue.put(None)
+        queue.put(('never.exr', 'never.png'))
+
+        ImageConverter(threading.Lock(), queue, OcioConvertBackend).run()
+
+        # Test every image before None converted, in queue order
+        assert subprocess_mock.call_count == len(pairs)
+        for call_args, (in_image, out_image) in zip(
+            subprocess_mock.call_args_list, pairs
+        ):
+            args = call_args[0][0]
+            assert args[0] == Settings.OCIO_CONVERT
+            assert in_image in args
+            assert out_image in args
+        # Test the item after None is left for another thread
+        assert queue.get_nowait() == ('never.exr', 'never.png')
+
+        # Test transient errors retried
+        error = subprocess.CalledProcessError(1, 'ocioconvert')
+        subprocess_mock.reset_mock()
+        subprocess_mock.side_effect = [error, None, None]
+        for pair in pairs[:2]:
+            queue.put(pair)
+        queue.put(None)
+        converter = ImageConverter(threading.Lock(), queue, OcioConvertBackend)
+        converter.run()
+        assert subprocess_mock.call_count == 3
+        assert converter.error is None
+
+        # Test the threads stopped once the retries are exhausted
+        subprocess_mock.reset_mock()
+        subprocess_mock.side_effect = error
+        for pair in pairs:
+            queue.put(pair)
+        queue.put(None)
+        converter = ImageConverter(threading.Lock(), queue, OcioConvertBackend)
+        converter.run()
+        assert subprocess_mock.call_count == Settings.CONVERT_RETRIES + 1
+        assert converter.error is error
+        assert converter.cancel.is_set()
+        assert queue.get_nowait() == pairs[1]
+
+        # Test other errors not retried
+        subprocess_mock.reset_mock()
+        subprocess_mock.side_effect = KeyError('ocioconvert')
+        queue.put(pairs[0])
+        converter = ImageConverter(threading.Lock(), queue, OcioConvertBackend)
+        converter.run()
+        assert subprocess_mock.call_count == 1
+        assert isinstance(converter.error, KeyError)
+
+    def test_run_converters_fail_fast(self, mocker, exr_files):
+        """Test the first failed image cancelling the conversion."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+        error = subprocess.CalledProcessError(1, 'ocioconvert')
+
+        def _convert(command, **kwargs):
+            if command[1] == exr_files[0]:
+                raise error
+            time.sleep(0.01)
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        generate_video = mocker.patch.object(EncodeMovieFx, 'generate_video')
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[0], '-c', '4', '-b', 'ocioconvert', '-n']
+        )
+
+        # Test outstanding images left, exit status set and no video
+        with pytest.raises(SystemExit) as e:
+            encode_movie_fx.run()
+        assert e.value.code == 1
+        assert len(converted) < len(exr_files) // 2
+        assert not generate_video.called
+        assert not os.path.exists(encode_movie_fx.out_folder)
 
     def test_convert_images(self, exr_files, image_converter):
         """Test image type conversion and color correction."""
-        encode_movie_fx = EncodeMovieFx([exr_files[0]])
+        thread_count = 50
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[0], '-c', str(thread_count)]
+        )
         encode_movie_fx.parse_args()
         encode_movie_fx.parse_filename()
         encode_movie_fx.convert_images()
 
         # Test number of jobs started
-        assert image_converter.init_count == Settings.DEFAULT_THREAD_COUNT
-        assert image_converter.start_count == Settings.DEFAULT_THREAD_COUNT
-        assert image_converter.join_count == Settings.DEFAULT_THREAD_COUNT
+        assert image_converter.init_count == thread_count
+        assert image_converter.start_count == thread_count
+        assert image_converter.join_count == thread_count
 
         # Test out_dir created
         assert os.path.exists(encode_movie_fx.out_folder)
 
+        # Test all jobs share the same queue
+        queues = set(
+            id(args[1]) for args, kwargs in image_converter.init_args
+        )
+        assert len(queues) == 1
+        queue = image_converter.init_args[0][0][1]
+
+        # Test the queue holds every image followed by one None per job
         in_images, out_images = encode_movie_fx.get_image_lists()
-        in_buckets = list(encode_movie_fx.split_into_buckets(in_images))
-        out_buckets = list(encode_movie_fx.split_into_buckets(out_images))
+        items = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert items[:len(in_images)] == zip(in_images, out_images)
+        assert items[len(in_images):] == [None] * thread_count
 
-        # Test call args vs bucket lengths
-        assert len(image_converter.init_args) == len(in_buckets)
-        assert len(image_converter.init_args) == len(out_buckets)
+        # Test thread count is capped by the number of images
+        image_converter.reset()
+        encode_movie_fx.thread_count = len(exr_files) * 2
+        encode_movie_fx.convert_images()
+        assert image_converter.init_count == len(exr_files)
 
-        for call_args, in_bucket, out_bucket in zip(
-            image_converter.init_args,
-            in_buckets,
-            out_buckets
-        ):
-            args, kwargs = call_args
-            # Test correct buckets assigned to jobs
-            assert in_bucket in args
-            assert out_bucket in args
+    def test_convert_images_auto(self, mocker, exr_files, image_converter):
+        """Test conversion thread count sized from the machine."""
+        cores = 4
+        mocker.patch.object(encodeMovieFx, 'cpu_count', return_value=cores)
+        mocker.patch.object(
+            encodeMovieFx, 'available_memory', return_value=None
+        )
+
+        encode_movie_fx = EncodeMovieFx([exr_files[0]])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.convert_images()
+
+        # Test one thread started per core
+        assert image_converter.init_count == cores
+        for args, kwargs in image_converter.init_args:
+            assert isinstance(args[3], ThreadCountTuner)
+
+    def test_ocioconvert_backend(self, mocker, tmpdir):
+        """Test conversion with ocioconvert processes."""
+        check_call = mocker.patch.object(subprocess, 'check_call')
+        backend = OcioConvertBackend()
+
+        # Test conversion to file
+        backend.convert('in.exr', 'out.png')
+        args = check_call.call_args[0][0]
+        assert args == [
+            Settings.OCIO_CONVERT,
+            'in.exr', Settings.OCIO_IN_PROFILE,
+            'out.png', Settings.OCIO_OUT_PROFILE
+        ]
+
+        # Test conversion to raw pixels through a temporary ppm
+        def _convert(command, **kwargs):
+            with open(command[-1], 'wb') as ppm:
+                ppm.write('P6 1 1 255\nabc')
+
+        check_call.side_effect = _convert
+        out_image = str(tmpdir.join('out.ppm'))
+        assert backend.load('in.exr', out_image) == (1, 1, 'rgb24', 'abc')
+        assert check_call.call_args[0][0][0] == Settings.OIIOTOOL
+        assert not os.path.exists(out_image)
+
+        # Test images resized by oiiotool before the color correction
+        check_call.side_effect = None
+        OcioConvertBackend(0.25).convert('in.exr', 'out.png')
+        args = check_call.call_args[0][0]
+        assert args[:4] == [Settings.OIIOTOOL, 'in.exr', '--resize', '25%']
+        assert args.index('--resize') < args.index('--colorconvert')
+        assert args[-2:] == ['-o', 'out.png']
+        OcioConvertBackend((960, 540)).convert('in.exr', 'out.ppm')
+        args = check_call.call_args[0][0]
+        assert args[2:6] == ['--ch', 'R,G,B', '--resize', '960x540']
+
+        # Test images written uncompressed by oiiotool
+        OcioConvertBackend(None, 'tiff').convert('in.exr', 'out.tif')
+        args = check_call.call_args[0][0]
+        assert args[0] == Settings.OIIOTOOL
+        assert args[-8:] == [
+            '--ch', 'R,G,B', '--compression', 'none',
+            '-d', 'uint8', '-o', 'out.tif'
+        ]
+        OcioConvertBackend(None, 'png0').convert('in.exr', 'out.png')
+        args = check_call.call_args[0][0]
+        assert args[args.index('--attrib') + 1:][:2] == \
+            ['png:compressionLevel', '0']
+
+    def test_ocio_backend(self, mocker):
+        """Test in process conversion with OpenColorIO."""
+        ocio = mocker.patch.object(encodeMovieFx, 'OCIO')
+        oiio = mocker.patch.object(encodeMovieFx, 'oiio')
+        mocker.patch.object(encodeMovieFx, 'numpy', numpy)
+
+        # 2x1 RGBA image
+        in_pixels = numpy.array(
+            [[[0.0, 0.5, 1.0, 1.0], [2.0, -1.0, 0.25, 1.0]]],
+            dtype=numpy.float32
+        )
+        image_input = oiio.ImageInput.open.return_value
+        image_input.spec.return_value = mocker.Mock(
+            width=2, height=1, nchannels=4
+        )
+        image_input.read_image.return_value = in_pixels.ravel()
+
+        # OpenColorIO 1 processor applied on flat lists of floats
+        def _apply_rgb(pixels):
+            assert isinstance(pixels, list)
+            assert len(pixels) % 3 == 0
+            assert all(isinstance(value, float) for value in pixels)
+            return list(pixels)
+
+        processor = mocker.Mock(spec=['applyRGB'])
+        processor.applyRGB.side_effect = _apply_rgb
+        config = ocio.Config.CreateFromFile.return_value
+        config.getProcessor.return_value = processor
+
+        backend = OcioBackend()
+        ocio.Config.CreateFromFile.assert_called_once_with(
+            Settings.OCIO_CONFIG
+        )
+        config.getProcessor.assert_called_once_with(
+            Settings.OCIO_IN_PROFILE, Settings.OCIO_OUT_PROFILE
+        )
+        expected = numpy.array(
+            [[[0, 128, 255], [255, 0, 64]]], dtype=numpy.uint8
+        )
+
+        # Test conversion to raw pixels
+        assert backend.load('in.exr', None) == (
+            2, 1, 'rgb24', expected.tostring()
+        )
+        oiio.ImageInput.open.assert_called_with('in.exr')
+
+        # Test conversion to file
+        image_output = oiio.ImageOutput.create.return_value
+        backend.convert('in.exr', 'out.png')
+        oiio.ImageOutput.create.assert_called_with('out.png')
+        spec = oiio.ImageSpec.call_args[0]
+        assert spec == (2, 1, 3, oiio.UINT8)
+        written = image_output.write_image.call_args[0][0]
+        assert (written == expected).all()
+        assert image_output.close.called
+        assert not oiio.ImageSpec.return_value.attribute.called
+
+        # Test format attributes set on the spec
+        OcioBackend(None, 'png0').convert('in.exr', 'out.png')
+        oiio.ImageSpec.return_value.attribute.assert_called_with(
+            'png:compressionLevel', 0
+        )
+
+        # Test processor built once per process
+        OcioBackend()
+        assert ocio.Config.CreateFromFile.call_count == 1
+
+        # Test OpenColorIO 2 processor applied in place
+        mocker.patch.object(encodeMovieFx, '_PROCESSORS', {})
+        cpu_processor = mocker.Mock()
+        cpu_processor.applyRGB.side_effect = lambda pixels: None
+        config.getProcessor.return_value = mocker.Mock()
+        config.getProcessor.return_value.getDefaultCPUProcessor.\
+            return_value = cpu_processor
+        backend = OcioBackend()
+        assert backend.load('in.exr', None)[-1] == expected.tostring()
+        assert cpu_processor.applyRGB.called
+
+        # Test images resized before the color correction
+        backend = OcioBackend(0.5)
+        assert backend.load('in.exr', None)[:3] == (1, 1, 'rgb24')
+        assert cpu_processor.applyRGB.call_args[0][0].shape == (1, 1, 3)
+
+    def test_parse_scale(self):
+        """Test scales passed to the cli."""
+        assert parse_scale('1/2') == 0.5
+        assert parse_scale('1/4') == 0.25
+        assert parse_scale('0.75') == 0.75
+        assert parse_scale('1') is None
+        assert parse_scale('1920x1080') == (1920, 1080)
+        for text in ('0', '-1/2', '1/0', '0x1080', 'half', '1/2x', 'inf'):
+            with pytest.raises((ValueError, ZeroDivisionError)):
+                parse_scale(text)
+
+        assert scaled_size(4096, 2160, 0.5) == (2048, 1080)
+        assert scaled_size(4096, 2160, 0.25) == (1024, 540)
+        assert scaled_size(3, 1, 0.1) == (1, 1)
+        assert scaled_size(4096, 2160, (960, 540)) == (960, 540)
+
+    def test_resize_image(self):
+        """Test box filter resizing."""
+        pixels = numpy.arange(4 * 6 * 3, dtype=numpy.float32).reshape(
+            4, 6, 3
+        )
+
+        # Test integer factors average the pixels of every block
+        resized = resize_image(pixels, 3, 2)
+        assert resized.dtype == numpy.float32
+        expected = pixels.reshape(2, 2, 3, 2, 3).mean(axis=(1, 3))
+        assert numpy.allclose(resized, expected)
+        assert numpy.allclose(
+            resize_image(pixels, 1, 1), pixels.mean(axis=(0, 1))
+        )
+
+        # Test other sizes keep the average and constant images
+        resized = resize_image(pixels, 4, 3)
+        assert resized.shape == (3, 4, 3)
+        assert numpy.allclose(resized.mean(axis=(0, 1)),
+                              pixels.mean(axis=(0, 1)))
+        constant = numpy.full((5, 7, 3), 0.18, dtype=numpy.float32)
+        assert numpy.allclose(resize_image(constant, 3, 2), 0.18)
+        assert numpy.allclose(resize_image(constant, 9, 11), 0.18)
+
+        # Test same size untouched
+        assert resize_image(pixels, 6, 4) is pixels
+
+    def test_get_backend(self, mocker):
+        """Test backend selection."""
+        encode_movie_fx = EncodeMovieFx(['path/to/file.0010.exr'])
+        encode_movie_fx.parse_args()
+
+        # Test in process backend used when the modules exist
+        mocker.patch.object(encodeMovieFx, 'OCIO')
+        mocker.patch.object(encodeMovieFx, 'oiio')
+        mocker.patch.object(encodeMovieFx, 'numpy', numpy)
+        assert encode_movie_fx.get_backend() is OcioBackend
+
+        # Test fall back on ocioconvert
+        mocker.patch.object(encodeMovieFx, 'OCIO', None)
+        assert encode_movie_fx.get_backend() is OcioConvertBackend
+
+        # Test ocioconvert backend
+        encode_movie_fx.backend = Settings.OCIO_CONVERT_BACKEND
+        assert encode_movie_fx.get_backend() is OcioConvertBackend
+
+        # Test lut backend only needs OpenColorIO to bake the LUT
+        encode_movie_fx.backend = Settings.LUT_BACKEND
+        exists = mocker.patch.object(os.path, 'exists', return_value=False)
+        assert encode_movie_fx.get_backend() is OcioConvertBackend
+        exists.return_value = True
+        assert encode_movie_fx.get_backend() is LutBackend
+
+    def test_shaper(self):
+        """Test mapping of scene linear values on the LUT input range."""
+        pixels = numpy.array(
+            [0.0, 0.18, 1.0, Settings.LUT_SHAPER_MAX], dtype=numpy.float32
+        )
+        shaped = shaper(pixels)
+        assert shaped[0] == pytest.approx(0.0, abs=1e-6)
+        assert shaped[-1] == pytest.approx(1.0)
+        assert (numpy.diff(shaped) > 0).all()
+        assert inverse_shaper(shaped) == pytest.approx(pixels, abs=1e-5)
+
+        # Test values out of range clamped
+        assert shaper(numpy.array([-1.0, 1000.0])) == \
+            pytest.approx([0.0, 1.0])
+
+    def test_apply_lut(self):
+        """Test LUT interpolation."""
+        size = 5
+        axis = numpy.linspace(0.0, 1.0, size)
+        lattice = numpy.stack(
+            numpy.meshgrid(axis, axis, axis, indexing='ij'), axis=-1
+        )
+        random = numpy.random.RandomState(0)
+        pixels = inverse_shaper(random.rand(4, 3, 3)).astype(numpy.float32)
+
+        # Test a LUT linear in shaped space is exactly interpolated
+        for interpolation in ('trilinear', 'tetrahedral'):
+            result = apply_lut(lattice, pixels, interpolation)
+            assert result.shape == pixels.shape
+            assert result == pytest.approx(shaper(pixels), abs=1e-5)
+
+        # Test interpolation against a per pixel reference
+        lut = random.rand(size, size, size, 3)
+
+        def _reference(pixel, interpolation):
+            position = shaper(pixel) * (size - 1)
+            corner = numpy.minimum(position.astype(int), size - 2)
+            f = position - corner
+
+            def c(r, g, b):
+                return lut[corner[0] + r, corner[1] + g, corner[2] + b]
+
+            if interpolation == 'trilinear':
+                return sum(
+                    c(r, g, b) *
+                    (f[0] if r else 1 - f[0]) *
+                    (f[1] if g else 1 - f[1]) *
+                    (f[2] if b else 1 - f[2])
+                    for r in (0, 1) for g in (0, 1) for b in (0, 1)
+                )
+            if f[0] > f[1] > f[2]:
+                return (
+                    (1 - f[0]) * c(0, 0, 0) + (f[0] - f[1]) * c(1, 0, 0) +
+                    (f[1] - f[2]) * c(1, 1, 0) + f[2] * c(1, 1, 1)
+                )
+            if f[0] > f[2] > f[1]:
+                return (
+                    (1 - f[0]) * c(0, 0, 0) + (f[0] - f[2]) * c(1, 0, 0) +
+                    (f[2] - f[1]) * c(1, 0, 1) + f[1] * c(1, 1, 1)
+                )
+            if f[2] > f[0] > f[1]:
+                return (
+                    (1 - f[2]) * c(0, 0, 0) + (f[2] - f[0]) * c(0, 0, 1) +
+                    (f[0] - f[1]) * c(1, 0, 1) + f[1] * c(1, 1, 1)
+                )
+            if f[2] > f[1] > f[0]:
+                return (
+                    (1 - f[2]) * c(0, 0, 0) + (f[2] - f[1]) * c(0, 0, 1) +
+                    (f[1] - f[0]) * c(0, 1, 1) + f[0] * c(1, 1, 1)
+                )
+            if f[1] > f[2] > f[0]:
+                return (
+                    (1 - f[1]) * c(0, 0, 0) + (f[1] - f[2]) * c(0, 1, 0) +
+                    (f[2] - f[0]) * c(0, 1, 1) + f[0] * c(1, 1, 1)
+                )
+            return (
+                (1 - f[1]) * c(0, 0, 0) + (f[1] - f[0]) * c(0, 1, 0) +
+                (f[0] - f[2]) * c(1, 1, 0) + f[2] * c(1, 1, 1)
+            )
+
+        for interpolation in ('trilinear', 'tetrahedral'):
+            result = apply_lut(lut, pixels, interpolation).reshape(-1, 3)
+            for pixel, value in zip(pixels.reshape(-1, 3), result):
+                assert value == pytest.approx(
+                    _reference(pixel, interpolation), abs=1e-5
+                )
+
+        with pytest.raises(ValueError):
+            apply_lut(lut, pixels, 'cubic')
+
+    def test_load_lut(self, mocker, tmpdir):
+        """Test LUT baking and caching."""
+        mocker.patch.object(Settings, 'LUT_FOLDER', str(tmpdir.join('luts')))
+        mocker.patch.object(Settings, 'LUT_SIZE', 3)
+        mocker.patch.object(encodeMovieFx, '_LUTS', {})
+        mocker.patch.object(OcioBackend, '__init__', return_value=None)
+        transform = mocker.patch.object(
+            OcioBackend, 'transform', side_effect=lambda pixels: pixels * 2
+        )
+
+        # Test LUT baked on the lattice and cached on disk
+        lut = load_lut()
+        assert lut.shape == (3, 3, 3, 3)
+        assert lut[0, 1, 2] == pytest.approx(
+            inverse_shaper(numpy.array([0.0, 0.5, 1.0])) * 2, rel=1e-5
+        )
+        assert os.path.exists(lut_path())
+        assert transform.call_count == 1
+
+        # Test LUT loaded once per process
+        assert load_lut() is lut
+        assert transform.call_count == 1
+
+        # Test LUT loaded from disk by other processes
+        mocker.patch.object(encodeMovieFx, '_LUTS', {})
+        assert (load_lut() == lut).all()
+        assert transform.call_count == 1
+
+        # Test LUT path depends on the color and LUT settings
+        path = lut_path()
+        mocker.patch.object(Settings, 'OCIO_OUT_PROFILE', 'Output - Rec.709')
+        assert lut_path() != path
+        path = lut_path()
+        mocker.patch.object(Settings, 'LUT_SIZE', 5)
+        assert lut_path() != path
+
+    def test_cached_backend(self, mocker, tmpdir):
+        """Test conversions reused from the conversion cache."""
+        in_image = tmpdir.join('in.0001.exr')
+        in_image.write('exr')
+        in_image = str(in_image)
+        cache = ConversionCache(str(tmpdir.join('cache')), 2 ** 20, ('ocio',))
+
+        def _convert(in_image, out_image):
+            with open(out_image, 'w') as png:
+                png.write('png')
+
+        backend = mocker.Mock(timings={'convert': 1.0})
+        backend.convert.side_effect = _convert
+        backend.load.return_value = (1, 1, 'rgb24', 'abc')
+        cached_backend = CachedBackend(backend, cache)
+
+        # Test image converted then taken from the cache
+        timings = []
+        for index in range(2):
+            out_image = str(tmpdir.join('out{}.png'.format(index)))
+            cached_backend.convert(in_image, out_image)
+            with open(out_image) as png:
+                assert png.read() == 'png'
+            timings.append(cached_backend.timings)
+        assert backend.convert.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Test timings of the conversion and the cache
+        assert sorted(timings[0]) == ['cache', 'convert']
+        assert timings[0]['convert'] == 1.0
+        assert sorted(timings[1]) == ['cache']
+
+        # Test raw pixels cached apart from the files
+        for _ in range(2):
+            assert cached_backend.load(in_image, 'out.ppm') == \
+                (1, 1, 'rgb24', 'abc')
+        assert backend.load.call_count == 1
+        assert (cache.hits, cache.misses) == (2, 2)
+
+        # Test modified images converted again
+        os.utime(in_image, (0, 0))
+        cached_backend.convert(in_image, str(tmpdir.join('out.png')))
+        assert backend.convert.call_count == 2
+
+    def test_convert_images_cache(self, mocker, exr_files):
+        """Test conversion cache used across runs."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+
+        def _convert(command, **kwargs):
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
 
-    def test_generate_video(self, mocker):
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        evict = mocker.spy(ConversionCache, 'evict')
+
+        def _run(args):
+            encode_movie_fx = EncodeMovieFx(
+                [exr_files[0], '-c', '4', '-b', 'ocioconvert'] + args
+            )
+            encode_movie_fx.parse_args()
+            encode_movie_fx.parse_filename()
+            encode_movie_fx.convert_images()
+            shutil.rmtree(encode_movie_fx.out_folder)
+
+        # Test only new images converted on the next runs
+        _run([])
+        assert sorted(converted) == exr_files
+        assert evict.call_count == 1
+        with open(exr_files[3], 'w') as exr:
+            exr.write('rendered again')
+        del converted[:]
+        _run([])
+        assert converted == [exr_files[3]]
+
+        # Test cache disabled
+        del converted[:]
+        evict.reset_mock()
+        _run(['-n'])
+        assert sorted(converted) == exr_files
+        assert not evict.called
+
+    def test_convert_images_store(self, mocker, exr_files, tmpdir, capsys):
+        """Test shared store used by the encodings of any folder."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+
+        def _convert(command, **kwargs):
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        evict = mocker.spy(ConversionCache, 'evict')
+        # The same render published in another folder
+        copy = tmpdir.mkdir('copy')
+        for index, exr_file in enumerate(exr_files):
+            with open(exr_file, 'w') as exr:
+                exr.write('exr {}'.format(index))
+            shutil.copy(exr_file, str(copy))
+        store = str(tmpdir.join('store'))
+
+        def _run(path, args):
+            encode_movie_fx = EncodeMovieFx(
+                [path, '-c', '4', '-b', 'ocioconvert', '-x', store] + args
+            )
+            encode_movie_fx.parse_args()
+            encode_movie_fx.parse_filename()
+            encode_movie_fx.convert_images()
+            images = [
+                encode_movie_fx.out_image(index)
+                for index in range(len(exr_files))
+            ]
+            contents = []
+            for image in images:
+                with open(image) as png:
+                    contents.append(png.read())
+            shutil.rmtree(encode_movie_fx.out_folder)
+            return contents
+
+        # Test images converted once, taken from the store by the next
+        # encoding of the other folder
+        contents = _run(exr_files[0], [])
+        assert sorted(converted) == exr_files
+        assert evict.call_count == 2
+        del converted[:]
+        evict.reset_mock()
+        capsys.readouterr()
+        assert _run(
+            str(copy.join(os.path.basename(exr_files[0]))), []
+        ) == contents
+        assert not converted
+        out = capsys.readouterr()[0]
+        assert '100 of 100 images taken from the shared store' in out
+        # Test full store not walked again
+        assert evict.call_count == 1
+
+        # Test store disabled with the cache
+        _run(exr_files[0], ['-n'])
+        assert sorted(converted) == exr_files
+
+    def test_duplicates(self, mocker, exr_files, capsys):
+        """Test held frames converted once and linked."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+
+        def _convert(command, **kwargs):
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        # Frames 0 to 4 and 20 hold the same image, 5 to 9 another one, 30
+        # has the same size but another content
+        contents = dict(
+            [(index, 'hold') for index in range(5) + [20]] +
+            [(index, 'held') for index in range(5, 10)] + [(30, 'halt')]
+        )
+        for index, content in contents.items():
+            with open(exr_files[index], 'w') as exr:
+                exr.write(content)
+
+        # Test only the first image with a content hashed in
+        duplicates = find_duplicates(exr_files + ['missing.exr'], 4)
+        assert duplicates == dict(
+            [(index, 0) for index in range(1, 5) + [20]] +
+            [(index, 5) for index in range(6, 10)]
+        )
+        assert find_duplicates(exr_files, 1) == duplicates
+
+        # Test images with another end never hashed
+        mocker.patch.object(Settings, 'DEDUPE_SAMPLE_SIZE', 2)
+        hash_file = mocker.spy(encodeMovieFx, 'hash_file')
+        assert find_duplicates(exr_files, 4) == duplicates
+        hashed = [call[0][0] for call in hash_file.call_args_list]
+        assert sorted(hashed) == sorted(
+            exr_files[index] for index in range(10) + [20]
+        )
+
+        # Test duplicates linked to the converted image, and recorded in the
+        # journal
+        args = [exr_files[0], '-j', '-n', '-c', '4', '-b', 'ocioconvert']
+        encode_movie_fx = EncodeMovieFx(args + ['-D'])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        capsys.readouterr()
+        encode_movie_fx.convert_images()
+        assert '9 duplicate images linked' in capsys.readouterr()[0]
+        assert encode_movie_fx.duplicate_count == 9
+        assert sorted(converted) == sorted(
+            set(exr_files) - set(exr_files[index] for index in duplicates)
+        )
+        for index, original in duplicates.items():
+            assert os.path.samefile(
+                encode_movie_fx.out_image(index),
+                encode_movie_fx.out_image(original)
+            )
+        assert not encode_movie_fx.journal.missing_names([
+            encode_movie_fx.out_image(index)
+            for index in range(len(exr_files))
+        ])
+        encode_movie_fx.remove_out_folder()
+
+        # Test dedupe disabled by default
+        del converted[:]
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.convert_images()
+        assert sorted(converted) == exr_files
+        assert encode_movie_fx.duplicate_count == 0
+        encode_movie_fx.remove_out_folder()
+
+    def test_resume(self, mocker, exr_files):
+        """Test restarted job skipping the images it converted."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+        failing = set([exr_files[50]])
+        encoded = []
+
+        def _check_call(command, **kwargs):
+            if command[0] != Settings.OCIO_CONVERT:
+                encoded.append(command)
+                return
+            if command[1] in failing:
+                raise subprocess.CalledProcessError(1, command)
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+        mocker.patch.object(subprocess, 'check_output')
+        args = [exr_files[0], '-j', '-n', '-c', '4', '-b', 'ocioconvert']
+
+        # Test converted images and journal kept when the job fails
+        encode_movie_fx = EncodeMovieFx(args)
+        with pytest.raises(SystemExit) as error:
+            encode_movie_fx.run()
+        assert error.value.code == 1
+        journal_path = os.path.join(
+            encode_movie_fx.out_folder, Settings.JOURNAL_NAME
+        )
+        assert os.path.exists(journal_path)
+        assert not encoded
+        first_run = list(converted)
+        assert exr_files[50] not in first_run
+
+        # Test same folder used by the restarted job, other settings use
+        # another one
+        out_folder = encode_movie_fx.out_folder
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        assert encode_movie_fx.out_folder == out_folder
+        other = EncodeMovieFx(args + ['-S', '1/2'])
+        other.parse_args()
+        other.parse_filename()
+        assert other.out_folder != out_folder
+
+        # Test folder kept where a restart on another host finds it, unless
+        # a scratch folder is given and no previous run left a journal
+        assert out_folder.startswith(os.path.join(
+            encode_movie_fx.in_folder, Settings.TEMP_FOLDER
+        ))
+        other = EncodeMovieFx(args + ['-t', Settings.SCRATCH_FOLDER])
+        other.parse_args()
+        other.parse_filename()
+        assert other.out_folder == out_folder
+        other = EncodeMovieFx(
+            args + ['-t', Settings.SCRATCH_FOLDER, '-f', 'tiff']
+        )
+        other.parse_args()
+        other.parse_filename()
+        assert other.out_folder.startswith(Settings.SCRATCH_FOLDER)
+
+        # Test only the missing images converted, the video generated and
+        # the folder deleted once the journal is complete
+        failing.clear()
+        del converted[:]
+        encode_movie_fx.run()
+        assert sorted(converted) == sorted(
+            set(exr_files) - set(first_run)
+        )
+        assert len(encoded) == 2
+        assert not os.path.exists(out_folder)
+
+        # Test video not generated while images are missing from the journal
+        del encoded[:]
+        encode_movie_fx = EncodeMovieFx(args)
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.convert_images()
+        del encode_movie_fx.journal.entries[
+            os.path.basename(encode_movie_fx.out_image(10))
+        ]
+        with pytest.raises(ValueError):
+            encode_movie_fx.generate_video()
+        assert not encoded
+        encode_movie_fx.remove_out_folder()
+
+        # Test streamed images can't be resumed
+        for mode in ['-s', '-P']:
+            with pytest.raises(SystemExit) as error:
+                EncodeMovieFx(args + [mode]).parse_args()
+            assert error.value.code == 2
+
+        # Test color transform changes use another folder
+        job_key = encode_movie_fx.job_key()
+        mocker.patch.object(encodeMovieFx, 'config_time', return_value=123.0)
+        assert encode_movie_fx.job_key() != job_key
+
+    def test_watch(self, mocker, tmpdir):
+        """Test images converted as they are rendered."""
+        mocker.patch.object(Settings, 'WATCH_STABLE_DELAY', 0.05)
+        mocker.patch.object(Settings, 'WATCH_POLL_INTERVAL', 0.05)
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+
+        def _check_call(command, **kwargs):
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+        render = tmpdir.mkdir('render')
+
+        def _render(frames):
+            for frame in frames:
+                render.join('999_0010_test.{:04d}.exr'.format(frame)).write(
+                    'exr {}'.format(frame)
+                )
+                time.sleep(0.02)
+
+        encode_movie_fx = EncodeMovieFx([
+            str(render.join('999_0010_test.0001.exr')), '-w', '10',
+            '-b', 'ocioconvert', '-n', '-c', '2',
+        ])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        assert encode_movie_fx.watch_last == 10
+
+        # Test frames converted once each as they are written, until the
+        # range completes, the frames after the range are left out
+        _render([12])
+        renderer = threading.Thread(target=_render, args=(range(1, 11),))
+        renderer.start()
+        encode_movie_fx.watch_images()
+        renderer.join()
+        assert sorted(converted) == [
+            str(render.join('999_0010_test.{:04d}.exr'.format(frame)))
+            for frame in range(1, 11)
+        ]
+        assert encode_movie_fx.sequence.last == 10
+        encode_movie_fx.fill_gaps()
+        assert not os.path.exists(encode_movie_fx.out_image(11))
+        mocker.patch.object(subprocess, 'check_call')
+        encode_movie_fx.generate_video()
+        assert encode_movie_fx.frame_count == 10
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+        encode_movie_fx.remove_out_folder()
+
+        # Test watch given up without new images
+        mocker.patch.object(Settings, 'WATCH_TIMEOUT', 0.2)
+        encode_movie_fx = EncodeMovieFx([
+            str(render.join('999_0010_test.0001.exr')), '-w', '11',
+            '-b', 'ocioconvert', '-n',
+        ])
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        with pytest.raises(IOError) as error:
+            encode_movie_fx.watch_images()
+        assert '1 frames missing' in str(error.value)
+        encode_movie_fx.remove_out_folder()
+
+        # Test invalid ranges and modes
+        encode_movie_fx.watch_last = 0
+        with pytest.raises(ValueError):
+            encode_movie_fx.watch_images()
+        for args in (['-w', 'x'], ['-w', '10', '-s'], ['-w', '10', '-d', '0']):
+            with pytest.raises(SystemExit) as error:
+                EncodeMovieFx(
+                    [str(render.join('999_0010_test.0001.exr'))] + args
+                ).parse_args()
+            assert error.value.code == 2
+
+    def test_read_exr_size(self, tmpdir):
+        """Test reading the size of exr images from their header."""
+        exr = tmpdir.join('image.exr')
+        exr.write(exr_header(1998, 1080), mode='wb')
+        assert read_exr_size(str(exr)) == (1998, 1080)
+
+        # Test invalid images
+        for content in ('', 'P6 1 1 255\n', exr_header(4, 2)[:40]):
+            exr.write(content, mode='wb')
+            with pytest.raises(IOError):
+                read_exr_size(str(exr))
+
+    def test_read_ppm(self, tmpdir):
+        """Test reading raw pixels from ppm images."""
+        pixels = ''.join(chr(i) for i in range(6))
+        ppm = tmpdir.join('image.ppm')
+        ppm.write('P6\n# comment\n2 1\n255\n' + pixels, mode='wb')
+        assert read_ppm(str(ppm)) == (2, 1, 'rgb24', pixels)
+
+        # Test 16 bits images
+        ppm.write('P6 1 1 65535\n' + pixels, mode='wb')
+        assert read_ppm(str(ppm)) == (1, 1, 'rgb48be', pixels)
+
+        # Test images written by ppm_data
+        image = (2, 1, 'rgb24', pixels)
+        ppm.write(ppm_data(image), mode='wb')
+        assert read_ppm(str(ppm)) == image
+
+        # Test invalid images
+        ppm.write('P3 1 1 255\n0 0 0', mode='wb')
+        with pytest.raises(IOError):
+            read_ppm(str(ppm))
+
+    def test_frame_streamer(self, mocker):
+        """Test converted images piped to ffmpeg in frame order."""
+        popen = mocker.patch.object(subprocess, 'Popen')
+        popen.return_value.wait.return_value = 0
+        build_command = mocker.Mock(return_value=['ffmpeg'])
+
+        def _ppm(index, width=2):
+            return width, 1, 'rgb24', chr(index) * 3 * width
+
+        # Test images put out of order are piped in order
+        in_images = ['{}.exr'.format(i) for i in range(3)]
+        streamer = FrameStreamer(in_images, build_command)
+        streamer.start()
+        for index in (2, 0, 1):
+            streamer.put(in_images[index], _ppm(index))
+        streamer.join()
+        assert streamer.error is None
+        build_command.assert_called_once_with(2, 1, 'rgb24')
+        writes = [
+            call_args[0][0]
+            for call_args in popen.return_value.stdin.write.call_args_list
+        ]
+        assert writes == [chr(i) * 6 for i in range(3)]
+        assert popen.return_value.stdin.close.called
+
+        # Test conversion threads blocked when too far ahead
+        mocker.patch.object(Settings, 'STREAM_WINDOW', 1)
+        popen.reset_mock()
+        streamer = FrameStreamer(in_images, build_command)
+        putter = threading.Thread(
+            target=streamer.put, args=(in_images[1], _ppm(1))
+        )
+        putter.start()
+        putter.join(0.1)
+        assert putter.is_alive()
+        streamer.start()
+        streamer.put(in_images[0], _ppm(0))
+        putter.join(1)
+        assert not putter.is_alive()
+        streamer.put(in_images[2], _ppm(2))
+        streamer.join()
+        assert popen.return_value.stdin.write.call_count == 3
+
+        # Test images with a different size
+        popen.reset_mock()
+        streamer = FrameStreamer(in_images[:2], build_command)
+        streamer.start()
+        streamer.put(in_images[0], _ppm(0))
+        streamer.put(in_images[1], _ppm(1, width=4))
+        streamer.join()
+        assert isinstance(streamer.error, ValueError)
+        assert popen.return_value.terminate.called
+
+        # Test conversion errors stop the streaming
+        popen.reset_mock()
+        error = subprocess.CalledProcessError(1, 'ocioconvert')
+        streamer = FrameStreamer(in_images, build_command)
+        streamer.start()
+        streamer.fail(error)
+        streamer.join()
+        assert streamer.error is error
+        assert not popen.called
+        # Test conversion threads stopped by the next image handed over
+        with pytest.raises(subprocess.CalledProcessError):
+            streamer.put(in_images[0], _ppm(0))
+
+    def test_stream_video(self, mocker, exr_files):
+        """Test generating video by streaming images to ffmpeg."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+
+        # Mock call args aren't thread safe, commands are listed
+        commands = []
+
+        def _convert(command, **kwargs):
+            if 'lavfi' in command:
+                # Slate rendered by ffmpeg
+                return
+            with open(command[-1], 'wb') as ppm:
+                ppm.write('P6 1 1 255\n' + frame_number(command[1])[-3:])
+            commands.append(command)
+
+        check_call = mocker.patch.object(
+            subprocess, 'check_call', side_effect=_convert
+        )
+        popen = mocker.patch.object(subprocess, 'Popen')
+        popen.return_value.wait.return_value = 0
+        mocker.spy(shutil, 'rmtree')
+
+        first_frame = 10
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[first_frame], '-c', '4', '-s', '-b', 'ocioconvert']
+        )
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.stream_video()
+
+        # Test images converted to ppm from the current frame on
+        assert len(commands) == len(exr_files) - first_frame
+        for args in commands:
+            assert args[0] == Settings.OIIOTOOL
+            assert args[1] in exr_files[first_frame:]
+            assert args[-1].endswith(Settings.STREAM_IMAGE_EXTENSION)
+            assert not args[-1].startswith(encode_movie_fx.in_folder)
+
+        # Test ffmpeg command
+        args = popen.call_args[0][0]
+        assert Settings.FFMPEG in args
+        assert 'rawvideo' in args
+        assert 'rgb24' in args
+        assert '1x1' in args
+        assert encode_movie_fx.out_filepath in args
+
+        # Test images piped in order
+        writes = [
+            call_args[0][0]
+            for call_args in popen.return_value.stdin.write.call_args_list
+        ]
+        assert writes == [
+            frame_number(exr_file)[-3:] for exr_file in exr_files[first_frame:]
+        ]
+
+        # Test temporary folder deleted
+        assert shutil.rmtree.called
+        assert not os.path.exists(shutil.rmtree.call_args[0][0])
+
+        # Test conversion stopped when ffmpeg exits early
+        encode_movie_fx.use_cache = False
+        del commands[:]
+        piped = []
+
+        def _write(data):
+            if len(piped) == 5:
+                raise IOError(32, 'Broken pipe')
+            piped.append(data)
+
+        popen.return_value.stdin.write.side_effect = _write
+        with pytest.raises(IOError):
+            encode_movie_fx.stream_video()
+        assert len(commands) <= 5 + Settings.STREAM_WINDOW + 4
+        popen.return_value.stdin.write.side_effect = None
+
+        # Test conversion errors raised
+        check_call.side_effect = subprocess.CalledProcessError(1, 'oiiotool')
+        with pytest.raises(subprocess.CalledProcessError):
+            encode_movie_fx.stream_video()
+
+    def test_image_file_streamer(self, mocker, tmpdir):
+        """Test converted image files piped to ffmpeg in frame order."""
+        popen = mocker.patch.object(subprocess, 'Popen')
+        popen.return_value.wait.return_value = 0
+        build_command = mocker.Mock(return_value=['ffmpeg'])
+
+        in_images = ['{}.exr'.format(i) for i in range(3)]
+        out_images = []
+        for index in range(3):
+            out_image = tmpdir.join('{}.png'.format(index))
+            out_image.write(str(index))
+            out_images.append(str(out_image))
+
+        streamer = ImageFileStreamer(in_images, build_command)
+        assert not streamer.raw
+        streamer.start()
+        for index in (1, 2, 0):
+            streamer.put(in_images[index], out_images[index])
+        streamer.join()
+        assert streamer.error is None
+        build_command.assert_called_once_with()
+        writes = [
+            call_args[0][0]
+            for call_args in popen.return_value.stdin.write.call_args_list
+        ]
+        assert writes == ['0', '1', '2']
+
+        # Test image files left on disk
+        for out_image in out_images:
+            assert os.path.exists(out_image)
+
+    def test_pipeline_video(self, mocker, exr_files):
+        """Test generating video while converting images."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+
+        # Mock call args aren't thread safe, commands are listed
+        commands = []
+
+        def _convert(command, **kwargs):
+            if 'lavfi' in command:
+                # Slate rendered by ffmpeg
+                return
+            with open(command[3], 'wb') as png:
+                png.write(frame_number(command[1]))
+            commands.append(command)
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        popen = mocker.patch.object(subprocess, 'Popen')
+        popen.return_value.wait.return_value = 0
+
+        first_frame = 10
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[first_frame], '-c', '4', '-P', '-b', 'ocioconvert']
+        )
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.pipeline_video()
+
+        # Test images converted to the output folder
+        assert len(commands) == len(exr_files) - first_frame
+        for args in commands:
+            assert args[3].startswith(encode_movie_fx.out_folder)
+
+        # Test ffmpeg command
+        args = popen.call_args[0][0]
+        assert Settings.FFMPEG in args
+        assert 'image2pipe' in args
+        assert '-' in args
+        assert encode_movie_fx.out_filepath in args
+
+        # Test png decoder
+        assert args[args.index('-c:v') + 1] == 'png'
+
+        # Test image files piped in order
+        writes = [
+            call_args[0][0]
+            for call_args in popen.return_value.stdin.write.call_args_list
+        ]
+        assert writes == [
+            frame_number(exr_file) for exr_file in exr_files[first_frame:]
+        ]
+
+    def test_thread_count_tuner(self, mocker):
+        """Test thread count sizing and adaptation."""
+        mocker.patch.object(encodeMovieFx, 'cpu_count', return_value=4)
+        memory = mocker.patch.object(
+            encodeMovieFx, 'available_memory',
+            return_value=Settings.THREAD_MEMORY * 100
+        )
+        clock = mocker.patch.object(encodeMovieFx.time, 'time')
+        cpu_time = mocker.patch.object(encodeMovieFx, 'cpu_time')
+
+        # Test initial count and limits
+        clock.return_value = 0.0
+        cpu_time.return_value = 0.0
+        tuner = ThreadCountTuner(1000)
+        assert tuner.thread_count == 4
+        assert tuner.max_count == 4 * Settings.MAX_THREADS_PER_CORE
+        assert ThreadCountTuner(2).thread_count == 2
+        memory.return_value = Settings.THREAD_MEMORY * 3
+        assert ThreadCountTuner(1000).thread_count == 3
+        assert ThreadCountTuner(1000).max_count == 3
+
+        # Test nothing measured yet
+        assert tuner.update() == 0
+
+        # Test sizing from the cpu share, 4 images of 2s using 0.5s of cpu
+        # each (25%) need 4 times the core count
+        for _ in range(4):
+            tuner.record(2.0)
+        clock.return_value = 10.0
+        cpu_time.return_value = 2.0
+        assert tuner.update() == 12
+        assert tuner.thread_count == 16
+
+        # Test growth while the throughput rises
+        for _ in range(8):
+            tuner.record(2.0)
+        clock.return_value = 20.0
+        assert tuner.update() == 4
+        assert tuner.thread_count == 20
+
+        # Test last growth retired once the throughput drops
+        tuner.record(2.0)
+        clock.return_value = 30.0
+        assert tuner.update() == 0
+        assert tuner.settled
+        assert tuner.retire_count == 4
+        for _ in range(4):
+            assert tuner.should_retire()
+        assert not tuner.should_retire()
+        assert tuner.thread_count == 16
+
+        # Test no change once settled
+        for _ in range(100):
+            tuner.record(2.0)
+        clock.return_value = 40.0
+        assert tuner.update() == 0
+
+    def test_run_profile(self, mocker):
+        """Test the report built from the recorded timings."""
+        clock = mocker.patch.object(time, 'time', return_value=100.0)
+        profile = RunProfile()
+        profile.frame('worker-1', '/a/in.0001.exr', 101.0, 2.0, {
+            'read': 0.5, 'convert': 1.0, 'write': 0.5, 'queue_wait': 0.1,
+        })
+        profile.frame('worker-2', '/a/in.0002.exr', 101.0, 3.0, {
+            'cache': 3.0, 'sink_wait': 0.2,
+        })
+        profile.frame('worker-1', '/a/in.0003.exr', 103.0, 2.0, {
+            'read': 1.0, 'convert': 1.0,
+        })
+        profile.worker('worker-1', 100.0, 105.0)
+        profile.worker('worker-2', 100.0, 105.0)
+        profile.stage('convert', 5.0)
+        profile.stage('encode', 2.0)
+        profile.stage('encode', 1.0)
+        clock.return_value = 110.0
+
+        report = profile.report({'backend': 'ocio'})
+        assert report['backend'] == 'ocio'
+        assert report['frames'] == 3
+        assert report['elapsed'] == 10.0
+        assert report['frames_per_second'] == 0.3
+        assert report['stages'] == {'convert': 5.0, 'encode': 3.0}
+        assert report['utilisation'] == 0.7
+        assert [worker['utilisation'] for worker in report['workers']] == \
+            [0.8, 0.6]
+        assert [worker['frames'] for worker in report['workers']] == [2, 1]
+        assert report['totals'] == {
+            'read': 1.5, 'convert': 2.0, 'write': 0.5, 'cache': 3.0,
+            'queue_wait': 0.1, 'sink_wait': 0.2,
+        }
+        assert report['per_frame'][0]['image'] == 'in.0001.exr'
+        assert report['per_frame'][2]['start'] == 3.0
+
+    def test_profile(self, mocker, exr_files):
+        """Test the JSON report of a profiled run."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+
+        def _convert(command, **kwargs):
+            if command[0] == Settings.OCIO_CONVERT:
+                with open(command[3], 'wb') as png:
+                    png.write('')
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_convert)
+        mocker.patch.object(subprocess, 'check_output')
+
+        # Test no report unless asked for
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[0], '-c', '2', '-b', 'ocioconvert', '-n']
+        )
+        encode_movie_fx.run()
+        path = os.path.join(
+            encode_movie_fx.in_folder,
+            '{}{}'.format(encode_movie_fx.filename, Settings.PROFILE_SUFFIX)
+        )
+        assert not os.path.exists(path)
+
+        # Test report written next to the movie
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[0], '-c', '2', '-b', 'ocioconvert', '-n', '--profile']
+        )
+        encode_movie_fx.run()
+        with open(path) as report_file:
+            report = json.load(report_file)
+        assert report['movie'] == encode_movie_fx.out_filepath
+        assert report['mode'] == 'convert'
+        assert report['frames'] == len(exr_files)
+        assert sorted(report['stages']) == ['convert', 'encode']
+        assert len(report['workers']) == 2
+        assert sum(worker['frames'] for worker in report['workers']) == \
+            len(exr_files)
+        assert sorted(report['per_frame'][0]) == [
+            'convert', 'duration', 'image', 'queue_wait', 'sink_wait',
+            'start', 'worker',
+        ]
+
+    def test_generate_video(self, mocker, tmpdir):
         """Test generating video from files."""
         mocker.patch.object(
             EncodeMovieFx, 'get_title_from_user', return_value='test'
@@ -262,6 +1787,177 @@ class TestEncodeMovieFx:
         assert Settings.BITRATE
         assert encode_movie_fx.out_filepath in args
 
+        # Test gaps filled with the previous image
+        subprocess_mock.reset_mock()
+        folder = tmpdir.mkdir('exr')
+        for frame in (1, 2, 5, 6):
+            folder.join('999_0010_file.{:04d}.exr'.format(frame)).write('')
+        encode_movie_fx = EncodeMovieFx(
+            [str(folder.join('999_0010_file.0002.exr'))]
+        )
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        _, out_images = encode_movie_fx.get_image_lists()
+        os.makedirs(encode_movie_fx.out_folder)
+        for out_image in out_images:
+            with open(out_image, 'w') as png:
+                png.write(os.path.basename(out_image))
+        encode_movie_fx.generate_video()
+        out_folder = py.path.local(encode_movie_fx.out_folder)
+        for frame, content in (
+            (3, '999_0010_file.0002.png'), (4, '999_0010_file.0002.png')
+        ):
+            assert out_folder.join(
+                '999_0010_file.{:04d}.png'.format(frame)
+            ).read() == content
+        assert subprocess_mock.called
+
+    def test_slate_size(self, exr_files):
+        """Test slate as wide as the converted images."""
+        with open(exr_files[0], 'wb') as exr:
+            exr.write(exr_header(1998, 1080))
+        encode_movie_fx = EncodeMovieFx([exr_files[0]])
+        encode_movie_fx.parse_args()
+        assert encode_movie_fx.slate_size() == (1998, Settings.SLATE_SIZE[1])
+        for scale, width in (('1/2', 999), ('640x360', 640)):
+            encode_movie_fx = EncodeMovieFx([exr_files[0], '-S', scale])
+            encode_movie_fx.parse_args()
+            assert encode_movie_fx.slate_size()[0] == width
+
+    def test_outputs(self, mocker, exr_files):
+        """Test all outputs generated by a single ffmpeg process."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+        check_call = mocker.patch.object(subprocess, 'check_call')
+        encode_movie_fx = EncodeMovieFx(
+            [exr_files[50], '-o', 'mov,mp4,poster,contact_sheet']
+        )
+        encode_movie_fx.parse_args()
+        encode_movie_fx.parse_filename()
+        encode_movie_fx.get_image_lists()
+        encode_movie_fx.generate_video()
+        assert check_call.call_count == 2
+        args = check_call.call_args[0][0]
+
+        # Test ui drawn once and split between the outputs
+        graph = args[args.index('-filter_complex') + 1].split(';')
+        assert graph[0].startswith(encode_movie_fx.ffmpeg_filters())
+
+        # Test constant ui rendered once to the slate, overlaid, and only
+        # the frame number drawn on every frame
+        slate = check_call.call_args_list[0][0][0]
+        assert 'lavfi' in slate
+        assert slate[slate.index('-vf') + 1].count('drawtext') == 5
+        assert slate[-1] == encode_movie_fx.slate_path
+        assert args[args.index('-i', args.index('-i') + 1) + 1] == slate[-1]
+        # Unreadable images, the slate takes the default size
+        assert 's={}x{},'.format(*Settings.SLATE_SIZE) in ' '.join(slate)
+        assert 'overlay' in graph[0]
+        assert graph[0].count('drawtext') == 1
+        assert graph[0].endswith('split=4[ui0][ui1][ui2][ui3]')
+        assert graph[1] == '[ui0]null[out0]'
+        assert 'scale=trunc(iw*0.5/2)*2' in graph[2]
+        # 50 frames from the current frame on, the poster is the middle one
+        assert 'select=eq(n\\,25)' in graph[3]
+        assert 'select=not(mod(n\\,3))' in graph[4]
+        assert 'tile=6x4' in graph[4]
+
+        # Test output args and paths
+        paths = [
+            args[index + 1] for index, arg in enumerate(args) if arg == '-y'
+        ]
+        assert paths == [
+            os.path.join(encode_movie_fx.in_folder, name)
+            for name in (
+                '999_0010_test.mov', '999_0010_test.mp4',
+                '999_0010_test_poster.jpg', '999_0010_test_contact_sheet.jpg',
+            )
+        ]
+        assert encode_movie_fx.out_filepath == paths[0]
+        assert args[args.index('[out0]') + 1:args.index(paths[0])] == [
+            '-vcodec', Settings.CODEC, '-b:v', Settings.BITRATE, '-y'
+        ]
+        assert 'libx264' in args
+        assert args.count('-frames:v') == 2
+
+    def test_segments(self, mocker, tmpdir):
+        """Test videos encoded in parallel segments and joined."""
+        mocker.patch.object(
+            EncodeMovieFx, 'get_title_from_user', return_value='test'
+        )
+        mocker.patch.object(Settings, 'MIN_SEGMENT_FRAMES', 10)
+
+        # Mock call args aren't thread safe, commands are listed
+        commands = []
+        lists = []
+
+        def _check_call(command, **kwargs):
+            commands.append(command)
+            if 'concat' in command:
+                with open(command[command.index('-i') + 1]) as list_file:
+                    lists.append(list_file.read())
+
+        check_call = mocker.patch.object(
+            subprocess, 'check_call', side_effect=_check_call
+        )
+        folder = tmpdir.mkdir('exr')
+        for frame in xrange(1001, 1101):
+            folder.join('999_0010_test.{}.exr'.format(frame)).write('')
+
+        def _encode_movie_fx(args):
+            encode_movie_fx = EncodeMovieFx(
+                [str(folder.join('999_0010_test.1010.exr'))] + args
+            )
+            encode_movie_fx.parse_args()
+            encode_movie_fx.parse_filename()
+            encode_movie_fx.get_image_lists()
+            encode_movie_fx.frame_count = 91
+            return encode_movie_fx
+
+        # Test frames split in even segments, never too short
+        encode_movie_fx = _encode_movie_fx(['-g', '4'])
+        assert encode_movie_fx.get_segments() == [
+            ('1010', 23), ('1033', 23), ('1056', 23), ('1079', 22)
+        ]
+        encode_movie_fx = _encode_movie_fx(['-g', '20'])
+        assert len(encode_movie_fx.get_segments()) == 9
+        encode_movie_fx = _encode_movie_fx([])
+        assert encode_movie_fx.get_segments() == [('1010', 91)]
+
+        # Test outputs that can't be split
+        encode_movie_fx = _encode_movie_fx(['-g', '4', '-o', 'mov,mp4'])
+        assert encode_movie_fx.get_segments() == [('1010', 91)]
+
+        # Test segments encoded with their own frame numbers
+        encode_movie_fx = _encode_movie_fx(['-g', '3'])
+        os.makedirs(encode_movie_fx.out_folder)
+        encode_movie_fx.generate_video()
+        assert check_call.call_count == 5
+        # Test slate rendered once for all the segments
+        assert len([command for command in commands if 'lavfi' in command]) \
+            == 1
+        segments = sorted(
+            (command for command in commands if 'image2' in command),
+            key=lambda command: command[command.index('-start_number') + 1]
+        )
+        for command, (start, count) in zip(
+            segments, [('1010', 31), ('1041', 30), ('1071', 30)]
+        ):
+            assert command[command.index('-start_number') + 1] == start
+            graph = command[command.index('-filter_complex') + 1]
+            assert 'start_number={}'.format(start) in graph
+            assert command[command.index('-frames:v') + 1] == str(count)
+
+        # Test segments joined without encoding them again
+        join = commands[-1]
+        assert 'concat' in join
+        assert join[join.index('-c') + 1] == 'copy'
+        assert join[-1] == encode_movie_fx.get_out_filepath()
+        assert lists[0].splitlines() == [
+            "file '{}'".format(command[-1]) for command in segments
+        ]
+
     def test_run(self, mocker, exr_files, image_converter):
         """Test whole tool run operation."""
         mocker.patch.object(
@@ -294,3 +1990,25 @@ class TestEncodeMovieFx:
         args = subprocess_mocker.call_args[0][0]
         assert Settings.LINUX_OPEN_FILE in args
         assert encode_movie_fx.out_filepath in args
+
+        # Test stream mode
+        stream_video = mocker.patch.object(EncodeMovieFx, 'stream_video')
+        encode_movie_fx.convert_images.reset_mock()
+        encode_movie_fx.generate_video.reset_mock()
+        shutil.rmtree.reset_mock()
+        encode_movie_fx = EncodeMovieFx([exr_files[0], '-s'])
+        encode_movie_fx.run()
+        assert stream_video.called
+        assert not encode_movie_fx.convert_images.called
+        assert not encode_movie_fx.generate_video.called
+        assert shutil.rmtree.called
+
+        # Test pipeline mode
+        pipeline_video = mocker.patch.object(EncodeMovieFx, 'pipeline_video')
+        rmtree = mocker.patch.object(shutil, 'rmtree')
+        encode_movie_fx = EncodeMovieFx([exr_files[0], '-P'])
+        encode_movie_fx.run()
+        assert pipeline_video.called
+        assert not encode_movie_fx.convert_images.called
+        assert not encode_movie_fx.generate_video.called
+        assert rmtree.call_args[0][0] == encode_movie_fx.out_folder
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+import time
+import socket
+import pytest
+import subprocess
+import threading
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import EncodeMovieFx
+from nwave.effects.tools.encodeMovieFx.encodeWorker import EncodeWorker
+
+
+def free_port():
+    """Return a port no socket listens on."""
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def wait_for_coordinator(port, timeout=10.0):
+    """Wait for a coordinator to listen on a port."""
+    start = time.time()
+    while True:
+        try:
+            socket.create_connection(('localhost', port)).close()
+            return
+        except socket.error:
+            if time.time() - start > timeout:
+                raise
+            time.sleep(0.01)
+
+
+class TestEncodeWorker:
+    """Test suite for EncodeWorker class."""
+
+    def test_parse_args(self):
+        """Test worker cli argument parsing."""
+        worker = EncodeWorker(['render01:7510', '-c', '4'])
+        worker.parse_args()
+        assert worker.address == ('render01', 7510)
+        assert worker.thread_count == 4
+
+        worker = EncodeWorker(['-c', 'auto', 'render01:7510'])
+        worker.parse_args()
+        assert worker.thread_count == Settings.AUTO_THREAD_COUNT
+
+        # Test invalid args
+        for args in (
+            [], ['render01'], ['7510'], ['render01:port'],
+            ['render01:7510', 'render02:7510'], ['render01:7510', '-c', 'x'],
+            ['render01:7510', '-x'],
+        ):
+            with pytest.raises(SystemExit) as e:
+                EncodeWorker(args).parse_args()
+            assert e.value.code == 2
+
+    def test_distributed(self, mocker, exr_files):
+        """Test images converted by workers on localhost."""
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+        failing = set()
+
+        def _check_call(command, **kwargs):
+            if command[1] in failing:
+                raise subprocess.CalledProcessError(1, command)
+            with open(command[3], 'w') as png:
+                png.write(command[1])
+            converted.append(command[1])
+
+        mocker.patch.object(subprocess, 'check_call', side_effect=_check_call)
+
+        def _run(worker_count):
+            port = free_port()
+            encode_movie_fx = EncodeMovieFx([
+                exr_files[0], '-d', 'localhost:{}'.format(port),
+                '-b', 'ocioconvert', '-n',
+            ])
+            encode_movie_fx.parse_args()
+            encode_movie_fx.parse_filename()
+            errors = []
+            exit_codes = []
+
+            def _coordinate():
+                try:
+                    encode_movie_fx.convert_images()
+                except IOError as error:
+                    errors.append(error)
+
+            def _work():
+                try:
+                    EncodeWorker(
+                        ['localhost:{}'.format(port), '-c', '2']
+                    ).run()
+                except SystemExit as error:
+                    exit_codes.append(error.code)
+
+            coordinator = threading.Thread(target=_coordinate)
+            coordinator.start()
+            wait_for_coordinator(port)
+            workers = [
+                threading.Thread(target=_work) for _ in range(worker_count)
+            ]
+            for worker in workers:
+                worker.start()
+            coordinator.join()
+            for worker in workers:
+                worker.join()
+            return encode_movie_fx, errors, exit_codes
+
+        # Test images written next to the input images by the workers
+        encode_movie_fx, errors, exit_codes = _run(3)
+        assert not errors
+        assert not exit_codes
+        assert sorted(converted) == exr_files
+        assert os.path.dirname(encode_movie_fx.out_folder) == os.path.join(
+            os.path.dirname(exr_files[0]), Settings.TEMP_FOLDER
+        )
+        _, out_images = encode_movie_fx.get_image_lists()
+        assert all(os.path.exists(out_image) for out_image in out_images)
+        encode_movie_fx.remove_out_folder()
+
+        # Test conversion stopped on the first failure of a worker
+        failing.add(exr_files[10])
+        del converted[:]
+        encode_movie_fx, errors, exit_codes = _run(2)
+        assert len(errors) == 1
+        assert exr_files[10] in str(errors[0])
+        assert 1 in exit_codes
+        assert exr_files[10] not in converted
+        encode_movie_fx.remove_out_folder()
+
+        # Test streamed images can't be distributed
+        for args in (['-d', '7510', '-s'], ['-d', 'render01:7510', '-P']):
+            with pytest.raises(SystemExit) as e:
+                EncodeMovieFx([exr_files[0]] + args).parse_args()
+            assert e.value.code == 2
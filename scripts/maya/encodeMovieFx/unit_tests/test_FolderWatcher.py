@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import time
+import threading
+
+from nwave.effects.tools.encodeMovieFx import folderWatcher
+from nwave.effects.tools.encodeMovieFx.folderWatcher import FolderWatcher
+from nwave.effects.tools.encodeMovieFx.folderWatcher import Inotify
+
+
+class TestFolderWatcher:
+    """Test suite for FolderWatcher class."""
+
+    def test_complete_images(self, mocker, tmpdir):
+        """Test images reported once their size is stable."""
+        now = [1000.0]
+        mocker.patch.object(time, 'time', side_effect=lambda: now[0])
+        watcher = FolderWatcher(str(tmpdir), 'shot', 'exr', 5.0, 10.0)
+
+        image = tmpdir.join('shot.0002.exr')
+        image.write('ex')
+        tmpdir.join('shot.0001.exr').write('')
+        tmpdir.join('shot.0003.exr.tmp').write('exr')
+        tmpdir.join('other.0001.exr').write('exr')
+        assert watcher.complete_images() == []
+
+        # Test image still written
+        now[0] += 5.0
+        image.write('exr')
+        assert watcher.complete_images() == []
+        now[0] += 4.0
+        assert watcher.complete_images() == []
+
+        # Test image reported once, empty images never
+        now[0] += 1.0
+        assert [frame.name for frame in watcher.complete_images()] == \
+            ['shot.0002.exr']
+        now[0] += 5.0
+        assert watcher.complete_images() == []
+        watcher.close()
+
+    def test_wait(self, mocker, tmpdir):
+        """Test waiting for changes with inotify, or polling."""
+        watcher = FolderWatcher(str(tmpdir), 'shot', 'exr', 0.1, 10.0)
+        assert watcher.inotify is not None
+
+        # Test wait ended by a write
+        timer = threading.Timer(
+            0.1, lambda: tmpdir.join('shot.0001.exr').write('exr')
+        )
+        timer.start()
+        start = time.time()
+        watcher.wait()
+        assert time.time() - start < 5.0
+        timer.join()
+
+        # Test wait shortened while images are written
+        watcher.complete_images()
+        wait = mocker.spy(watcher.inotify, 'wait')
+        watcher.wait()
+        assert wait.call_args[0][0] == 0.1
+        watcher.close()
+
+        # Test polling without inotify
+        mocker.patch.object(
+            folderWatcher, 'Inotify', side_effect=OSError(38, 'missing')
+        )
+        sleep = mocker.patch.object(time, 'sleep')
+        watcher = FolderWatcher(str(tmpdir), 'shot', 'exr', 5.0, 10.0)
+        assert watcher.inotify is None
+        watcher.wait()
+        sleep.assert_called_once_with(10.0)
+        watcher.close()
+
+    def test_inotify(self, tmpdir):
+        """Test folder changes reported by inotify."""
+        inotify = Inotify(str(tmpdir))
+        assert not inotify.wait(0.0)
+        tmpdir.join('shot.0001.exr').write('exr')
+        assert inotify.wait(1.0)
+        # Test events dropped once reported
+        assert not inotify.wait(0.0)
+        inotify.close()
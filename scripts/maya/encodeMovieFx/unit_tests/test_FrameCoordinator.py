@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import socket
+import threading
+
+import pytest
+
+from nwave.effects.tools.encodeMovieFx.frameCoordinator import \
+    CoordinatorClient
+from nwave.effects.tools.encodeMovieFx.frameCoordinator import \
+    FrameCoordinator
+from nwave.effects.tools.encodeMovieFx.frameCoordinator import \
+    parse_address
+from nwave.effects.tools.encodeMovieFx.frameCoordinator import \
+    receive_message
+from nwave.effects.tools.encodeMovieFx.frameCoordinator import send_message
+
+
+def _address(coordinator):
+    """Return the address the workers of a coordinator connect to."""
+    host, port = coordinator.worker_address().rsplit(':', 1)
+    return host, int(port)
+
+
+class TestFrameCoordinator:
+    """Test suite for FrameCoordinator class."""
+
+    def test_parse_address(self):
+        """Test addresses passed to the cli."""
+        assert parse_address('render01:7510') == ('render01', 7510)
+        assert parse_address('7510') == ('', 7510)
+        assert parse_address('0', 'localhost') == ('localhost', 0)
+        for text in ['render01', 'render01:port', '70000']:
+            with pytest.raises(ValueError):
+                parse_address(text)
+
+    def test_workers(self, mocker):
+        """Test frames converted once by the workers."""
+        tasks = [
+            ('{}.exr'.format(i), '{}.png'.format(i)) for i in range(20)
+        ]
+        # Mock call counts aren't thread safe, converted images are listed
+        converted = []
+        sink = mocker.Mock()
+        sink.put.side_effect = lambda *task: converted.append(task)
+        coordinator = FrameCoordinator(
+            ('localhost', 0), tasks, {'backend': 'lut'}, sink
+        )
+        coordinator.start()
+        address = _address(coordinator)
+
+        # Test frames of a lost worker handed out again
+        sock = socket.create_connection(address)
+        reader = sock.makefile('rb')
+        writer = sock.makefile('wb')
+        assert receive_message(reader) == {'settings': {'backend': 'lut'}}
+        send_message(writer, {'claim': True})
+        assert receive_message(reader) == {'task': list(tasks[0])}
+        for opened in [writer, reader, sock]:
+            opened.close()
+
+        def _work():
+            client = CoordinatorClient(address)
+            assert client.settings() == {'backend': 'lut'}
+            while True:
+                task = client.get()
+                if task is None:
+                    break
+                client.put(*task)
+            client.close()
+
+        workers = [threading.Thread(target=_work) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        coordinator.wait()
+        for worker in workers:
+            worker.join()
+        assert sorted(converted) == sorted(tasks)
+
+    def test_failure(self):
+        """Test conversion stopped on the first failure."""
+        tasks = [('{}.exr'.format(i), '{}.png'.format(i)) for i in range(5)]
+        coordinator = FrameCoordinator(('localhost', 0), tasks, {})
+        coordinator.start()
+        client = CoordinatorClient(_address(coordinator))
+        in_image, _ = client.get()
+        client.fail(IOError('disk full'), in_image)
+
+        with pytest.raises(IOError) as error:
+            coordinator.wait()
+        assert in_image in str(error.value)
+        assert 'disk full' in str(error.value)
+        # Test no frame handed out once stopped
+        assert client.get() is None
+        client.close()
+
+        # Test nothing to wait for without frames
+        coordinator = FrameCoordinator(('localhost', 0), [], {})
+        coordinator.start()
+        coordinator.wait()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+
+from nwave.effects.tools.encodeMovieFx.frameJournal import FrameJournal
+
+
+class TestFrameJournal:
+    """Test suite for FrameJournal class."""
+
+    def test_journal(self, tmpdir):
+        """Test converted images recorded and checked across runs."""
+        in_images = []
+        out_images = []
+        for frame in xrange(1, 4):
+            in_image = tmpdir.join('in.{:04d}.exr'.format(frame))
+            in_image.write('exr')
+            out_image = tmpdir.join('out.{:04d}.png'.format(frame))
+            out_image.write('png{}'.format(frame))
+            in_images.append(str(in_image))
+            out_images.append(str(out_image))
+        path = str(tmpdir.join('journal.txt'))
+
+        # Test nothing converted without a journal file
+        journal = FrameJournal(path)
+        assert not os.path.exists(path)
+        assert journal.missing(in_images, out_images) == \
+            zip(in_images, out_images)
+        assert journal.missing_names(out_images) == \
+            [os.path.basename(image) for image in out_images]
+
+        # Test entries read by the next run
+        journal.put(in_images[0], out_images[0])
+        journal.put(in_images[1], out_images[1])
+        journal = FrameJournal(path)
+        assert journal.missing(in_images, out_images) == \
+            [(in_images[2], out_images[2])]
+        assert journal.missing_names(out_images) == ['out.0003.png']
+
+        # Test modified and incomplete images converted again
+        tmpdir.join('in.0001.exr').write('other exr')
+        tmpdir.join('out.0002.png').write('pn')
+        assert journal.missing(in_images, out_images) == \
+            zip(in_images, out_images)
+        # The journal still lists them
+        assert journal.missing_names(out_images) == ['out.0003.png']
+
+        # Test deleted images converted again
+        os.remove(out_images[1])
+        assert not journal.done(in_images[1], out_images[1])
+
+    def test_torn_line(self, tmpdir):
+        """Test lines left incomplete by a killed job ignored."""
+        in_image = tmpdir.join('in.0001.exr')
+        in_image.write('exr')
+        out_image = tmpdir.join('out.0001.png')
+        out_image.write('png')
+        path = tmpdir.join('journal.txt')
+
+        FrameJournal(str(path)).put(str(in_image), str(out_image))
+        line = path.read()
+        path.write(line + line[:len(line) // 2] + '\nout.0002.png\tx\ty\tz\n')
+
+        journal = FrameJournal(str(path))
+        assert journal.entries.keys() == ['out.0001.png']
+        assert journal.done(str(in_image), str(out_image))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import os
+
+from nwave.effects.tools.encodeMovieFx import imageSequence
+from nwave.effects.tools.encodeMovieFx.imageSequence import Frame
+from nwave.effects.tools.encodeMovieFx.imageSequence import ImageSequence
+from nwave.effects.tools.encodeMovieFx.imageSequence import parse_frame
+from nwave.effects.tools.encodeMovieFx.imageSequence import scan_folder
+from nwave.effects.tools.encodeMovieFx.imageSequence import find_sequence
+
+
+def _touch(folder, names):
+    for name in names:
+        folder.join(name).write('')
+
+
+class TestImageSequence:
+    """Test suite for the image sequence discovery."""
+
+    def test_parse_frame(self):
+        """Test image names parsed into frames."""
+        assert parse_frame('999_0010_test.0042.exr') == Frame(
+            '999_0010_test', 4, 42, 'exr', '999_0010_test.0042.exr'
+        )
+        assert parse_frame('a.b.7.png') == \
+            Frame('a.b', 1, 7, 'png', 'a.b.7.png')
+        assert parse_frame('test.exr') is None
+        assert parse_frame('test.v01.exr') is None
+        assert parse_frame('test.0001') is None
+        assert parse_frame('.0001.exr') is None
+
+    def test_image_sequence(self):
+        """Test frame order, padding, gaps and duplicates."""
+        names = [
+            'shot.1000.exr', 'shot.0999.exr', 'shot.0997.exr',
+            'shot.1003.exr', 'shot.998.exr', 'shot.0998.exr',
+        ]
+        sequence = ImageSequence(
+            'shot', 'exr', [parse_frame(name) for name in names]
+        )
+        assert sequence.padding == 4
+        assert [frame.frame for frame in sequence.frames] == \
+            [997, 998, 999, 1000, 1003]
+        assert sequence.first == 997
+        assert sequence.last == 1003
+
+        # Test duplicates with another padding left out
+        assert [frame.name for frame in sequence.frames][1] == \
+            'shot.0998.exr'
+        assert [frame.name for frame in sequence.duplicates] == \
+            ['shot.998.exr']
+
+        # Test gaps
+        assert sequence.gaps() == [(1001, 1002)]
+        sequence = ImageSequence(
+            'shot', 'exr', [parse_frame('shot.{}.exr'.format(i))
+                            for i in (1, 3, 6)]
+        )
+        assert sequence.gaps() == [(2, 2), (4, 5)]
+
+        # Test frames after a frame left out
+        assert sequence.until(6) is sequence
+        assert [frame.frame for frame in sequence.until(5).frames] == [1, 3]
+        assert sequence.until(0) is None
+
+    def test_scan_folder(self, mocker, tmpdir):
+        """Test sequences of a folder grouped apart and cached."""
+        folder = tmpdir.mkdir('shot')
+        _touch(folder, [
+            'shot_a.0001.exr', 'shot_a.0002.exr', 'shot_a.0001.png',
+            'shot_b.0001.exr', 'notes.txt',
+        ])
+        folder.mkdir('dir.0001.exr')
+        sequences = scan_folder(str(folder))
+        assert sorted(sequences) == [
+            ('shot_a', 'exr'), ('shot_a', 'png'), ('shot_b', 'exr'),
+        ]
+        assert len(sequences[('shot_a', 'exr')].frames) == 2
+        assert find_sequence(str(folder), 'shot_b', 'exr').first == 1
+        assert find_sequence(str(folder), 'shot_c', 'exr') is None
+
+        # Test listing cached until the folder is modified
+        mtime = os.stat(str(folder)).st_mtime - 60
+        os.utime(str(folder), (mtime, mtime))
+        list_folder = mocker.spy(imageSequence, 'list_folder')
+        sequences = scan_folder(str(folder))
+        assert scan_folder(str(folder)) is sequences
+        assert list_folder.call_count == 1
+        _touch(folder, ['shot_b.0002.exr'])
+        mtime -= 10
+        os.utime(str(folder), (mtime, mtime))
+        assert len(find_sequence(str(folder), 'shot_b', 'exr').frames) == 2
+        assert list_folder.call_count == 2
+
+        # Test recent listings not cached
+        _touch(folder, ['shot_b.0003.exr'])
+        scan_folder(str(folder))
+        scan_folder(str(folder))
+        assert list_folder.call_count == 4
+
+        # Test listing without scandir
+        mocker.patch.object(imageSequence, 'scandir', None)
+        assert len(find_sequence(str(folder), 'shot_b', 'exr').frames) == 3
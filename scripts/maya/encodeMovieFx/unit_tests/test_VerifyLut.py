@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""DOCSTRING."""
+
+import numpy
+import pytest
+import subprocess
+
+from nwave.effects.tools.encodeMovieFx.encodeMovieFx import Settings
+from nwave.effects.tools.encodeMovieFx import verifyLut
+from nwave.effects.tools.encodeMovieFx.verifyLut import VerifyLut
+
+
+class TestVerifyLut:
+    """Test suite for VerifyLut class."""
+
+    def test_run(self, mocker, capsys):
+        """Test LUT errors measured against the ocioconvert reference."""
+        # Test no args
+        with pytest.raises(SystemExit) as e:
+            VerifyLut([]).run()
+        assert e.value.code == 2
+
+        check_call = mocker.patch.object(subprocess, 'check_call')
+        mocker.patch.object(verifyLut.os, 'remove')
+        # LUT doubling the shaped values
+        size = 3
+        axis = numpy.linspace(0.0, 1.0, size)
+        lut = numpy.stack(
+            numpy.meshgrid(axis, axis, axis, indexing='ij'), axis=-1
+        ) * 2
+        mocker.patch.object(verifyLut, 'load_lut', return_value=lut)
+
+        def _read_image(path):
+            if path.endswith('in.exr') and path != 'in.exr':
+                # Reference conversion
+                return numpy.full((2, 2, 3), 0.5, dtype=numpy.float32)
+            # Input image, shaped value of 0 gives 0 with the LUT
+            return numpy.zeros((2, 2, 3), dtype=numpy.float32)
+
+        mocker.patch.object(verifyLut, 'read_image', side_effect=_read_image)
+
+        VerifyLut(['in.exr']).run()
+
+        # Test reference converted with ocioconvert
+        args = check_call.call_args[0][0]
+        assert args[0] == Settings.OCIO_CONVERT
+        assert args[1] == 'in.exr'
+
+        # Test errors reported for every interpolation
+        out, _ = capsys.readouterr()
+        for interpolation in VerifyLut.interpolations:
+            assert (
+                'in.exr: {} max error 0.50000 (128 code values), '
+                'mean error 0.500000'
+            ).format(interpolation) in out
+            assert '{}: max error 0.50000 (128 code values)'.format(
+                interpolation
+            ) in out
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+
+# -*- coding: utf-8 -*-
+"""Measure the error of the baked LUT against the ocioconvert reference."""
+
+import os
+import sys
+import shutil
+import tempfile
+
+import numpy
+
+from encodeMovieFx import OcioConvertBackend
+from encodeMovieFx import apply_lut
+from encodeMovieFx import load_lut
+from encodeMovieFx import read_image
+from encodeMovieFx import setup_environment
+from encodeMovieFx import to_8_bits
+
+
+class VerifyLut(object):
+    """Compare LUT conversions of images to their ocioconvert conversion."""
+
+    # The text printed if incorrect arguments are passed to the cli
+    cli_usage = (
+        'usage: '
+        'verifyLut.py '
+        'path/to/image.exr [path/to/image.exr ...]'
+    )
+
+    # The interpolations compared to the reference
+    interpolations = ['trilinear', 'tetrahedral']
+
+    def __init__(self, args):
+        """Initialize tool.
+
+        Parameters
+        -----------
+        args: list of str
+            The cli args passed to the script without the script name
+            (i.e. sys.argv[1:]).
+
+        """
+        setup_environment()
+        self.args = args
+
+    def run(self):
+        """Measure and print the errors of every image."""
+        if not self.args:
+            print VerifyLut.cli_usage
+            sys.exit(2)
+
+        lut = load_lut()
+        max_errors = dict((name, (0.0, 0)) for name in self.interpolations)
+        temp_folder = tempfile.mkdtemp(prefix='verifyLut_')
+        try:
+            for in_image in self.args:
+                errors = self.measure(lut, in_image, temp_folder)
+                for name in self.interpolations:
+                    max_error, mean_error, max_code_error = errors[name]
+                    print (
+                        '{}: {} max error {:.5f} ({} code values), '
+                        'mean error {:.6f}'
+                    ).format(
+                        in_image, name, max_error, max_code_error, mean_error
+                    )
+                    max_errors[name] = (
+                        max(max_errors[name][0], max_error),
+                        max(max_errors[name][1], max_code_error),
+                    )
+        finally:
+            shutil.rmtree(temp_folder)
+
+        for name in self.interpolations:
+            print '{}: max error {:.5f} ({} code values)'.format(
+                name, *max_errors[name]
+            )
+
+    def measure(self, lut, in_image, temp_folder):
+        """Measure the errors of the LUT conversions of an image.
+
+        Parameters
+        ----------
+        lut: numpy.ndarray
+            The baked LUT.
+        in_image: str
+            Path to the image.
+        temp_folder: str
+            Folder the reference conversion is written to.
+
+        Returns
+        -------
+        dict
+            The max error, mean error and max error in 8 bits code values
+            per interpolation, values are clipped to [0, 1] as in the
+            converted images.
+
+        """
+        reference_image = os.path.join(
+            temp_folder, os.path.basename(in_image)
+        )
+        OcioConvertBackend().convert(in_image, reference_image)
+        reference = numpy.clip(read_image(reference_image), 0.0, 1.0)
+        os.remove(reference_image)
+
+        pixels = read_image(in_image)
+        errors = {}
+        for name in self.interpolations:
+            values = numpy.clip(apply_lut(lut, pixels, name), 0.0, 1.0)
+            difference = numpy.abs(values - reference)
+            code_difference = numpy.abs(
+                to_8_bits(values).astype(numpy.int16) -
+                to_8_bits(reference).astype(numpy.int16)
+            )
+            errors[name] = (
+                float(difference.max()),
+                float(difference.mean()),
+                int(code_difference.max()),
+            )
+        return errors
+
+
+if __name__ == '__main__':
+    VerifyLut(sys.argv[1:]).run()